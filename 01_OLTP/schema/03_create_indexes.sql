@@ -12,6 +12,9 @@ CREATE INDEX idx_customer_order_date ON orders(customer_id, order_date DESC);
 -- Orders: Status and Date queries
 CREATE INDEX idx_status_order_date ON orders(order_status, order_date DESC);
 
+-- Orders: Change capture for incremental ETL (updated_at high-water mark)
+CREATE INDEX idx_updated_at ON orders(updated_at, order_id);
+
 -- Order Items: Product sales analysis
 CREATE INDEX idx_product_order_date ON order_items(product_id, order_id);
 
@@ -0,0 +1,104 @@
+-- =============================================
+-- OLTP Change Capture Script (Optional)
+-- Trigger-maintained change log consumed by the ETL for delta-only loads
+-- =============================================
+
+USE ecommerce_oltp;
+
+-- =============================================
+-- ETL_Change_Log - Changed Rows by Sequence Number
+-- =============================================
+-- One row per changed source row; the ETL reads it by change_id
+-- and deletes what it has processed
+CREATE TABLE IF NOT EXISTS etl_change_log (
+    change_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    table_name VARCHAR(30) NOT NULL,
+    row_id INT NOT NULL, -- Primary key of the changed row (product_id for inventory)
+    operation CHAR(1) NOT NULL, -- I = insert, U = update, D = delete
+    changed_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6),
+    INDEX idx_table_change (table_name, change_id)
+) ENGINE=InnoDB;
+
+-- =============================================
+-- Customers Triggers
+-- =============================================
+DROP TRIGGER IF EXISTS trg_customers_ai_change_log;
+CREATE TRIGGER trg_customers_ai_change_log AFTER INSERT ON customers
+FOR EACH ROW
+    INSERT INTO etl_change_log (table_name, row_id, operation)
+    VALUES ('customers', NEW.customer_id, 'I');
+
+DROP TRIGGER IF EXISTS trg_customers_au_change_log;
+CREATE TRIGGER trg_customers_au_change_log AFTER UPDATE ON customers
+FOR EACH ROW
+    INSERT INTO etl_change_log (table_name, row_id, operation)
+    VALUES ('customers', NEW.customer_id, 'U');
+
+DROP TRIGGER IF EXISTS trg_customers_ad_change_log;
+CREATE TRIGGER trg_customers_ad_change_log AFTER DELETE ON customers
+FOR EACH ROW
+    INSERT INTO etl_change_log (table_name, row_id, operation)
+    VALUES ('customers', OLD.customer_id, 'D');
+
+-- =============================================
+-- Suppliers Triggers
+-- =============================================
+DROP TRIGGER IF EXISTS trg_suppliers_ai_change_log;
+CREATE TRIGGER trg_suppliers_ai_change_log AFTER INSERT ON suppliers
+FOR EACH ROW
+    INSERT INTO etl_change_log (table_name, row_id, operation)
+    VALUES ('suppliers', NEW.supplier_id, 'I');
+
+DROP TRIGGER IF EXISTS trg_suppliers_au_change_log;
+CREATE TRIGGER trg_suppliers_au_change_log AFTER UPDATE ON suppliers
+FOR EACH ROW
+    INSERT INTO etl_change_log (table_name, row_id, operation)
+    VALUES ('suppliers', NEW.supplier_id, 'U');
+
+DROP TRIGGER IF EXISTS trg_suppliers_ad_change_log;
+CREATE TRIGGER trg_suppliers_ad_change_log AFTER DELETE ON suppliers
+FOR EACH ROW
+    INSERT INTO etl_change_log (table_name, row_id, operation)
+    VALUES ('suppliers', OLD.supplier_id, 'D');
+
+-- =============================================
+-- Products Triggers
+-- =============================================
+DROP TRIGGER IF EXISTS trg_products_ai_change_log;
+CREATE TRIGGER trg_products_ai_change_log AFTER INSERT ON products
+FOR EACH ROW
+    INSERT INTO etl_change_log (table_name, row_id, operation)
+    VALUES ('products', NEW.product_id, 'I');
+
+DROP TRIGGER IF EXISTS trg_products_au_change_log;
+CREATE TRIGGER trg_products_au_change_log AFTER UPDATE ON products
+FOR EACH ROW
+    INSERT INTO etl_change_log (table_name, row_id, operation)
+    VALUES ('products', NEW.product_id, 'U');
+
+DROP TRIGGER IF EXISTS trg_products_ad_change_log;
+CREATE TRIGGER trg_products_ad_change_log AFTER DELETE ON products
+FOR EACH ROW
+    INSERT INTO etl_change_log (table_name, row_id, operation)
+    VALUES ('products', OLD.product_id, 'D');
+
+-- =============================================
+-- Inventory Triggers
+-- =============================================
+DROP TRIGGER IF EXISTS trg_inventory_ai_change_log;
+CREATE TRIGGER trg_inventory_ai_change_log AFTER INSERT ON inventory
+FOR EACH ROW
+    INSERT INTO etl_change_log (table_name, row_id, operation)
+    VALUES ('inventory', NEW.product_id, 'I');
+
+DROP TRIGGER IF EXISTS trg_inventory_au_change_log;
+CREATE TRIGGER trg_inventory_au_change_log AFTER UPDATE ON inventory
+FOR EACH ROW
+    INSERT INTO etl_change_log (table_name, row_id, operation)
+    VALUES ('inventory', NEW.product_id, 'U');
+
+DROP TRIGGER IF EXISTS trg_inventory_ad_change_log;
+CREATE TRIGGER trg_inventory_ad_change_log AFTER DELETE ON inventory
+FOR EACH ROW
+    INSERT INTO etl_change_log (table_name, row_id, operation)
+    VALUES ('inventory', OLD.product_id, 'D');
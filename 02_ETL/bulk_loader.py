@@ -0,0 +1,95 @@
+"""
+Bulk Loader for the ETL Pipeline
+Stages transformed batches as tab-separated files and pushes them with LOAD DATA LOCAL INFILE
+"""
+
+import logging
+import os
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# MySQL LOAD DATA defaults: fields terminated by tab, escaped by backslash
+ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\0': '\\0',
+})
+
+
+def format_tsv_value(value) -> str:
+    """Format a single value for a LOAD DATA tab-separated file"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).translate(ESCAPES)
+
+
+class BulkLoader:
+    """Loads record batches into session-scoped staging tables via LOAD DATA LOCAL INFILE"""
+
+    def __init__(self, conn, staging_dir: Optional[str] = None):
+        """Initialize bulk loader against a data warehouse connection"""
+        self.conn = conn
+        self.staging_dir = staging_dir
+        self.staging_tables = set()
+
+        if staging_dir:
+            os.makedirs(staging_dir, exist_ok=True)
+
+    def ensure_staging_table(self, cursor, staging_table: str, source_table: str):
+        """Create a temporary staging table shaped like its target fact table"""
+        if staging_table in self.staging_tables:
+            return
+        # Temporary tables are private to this connection and do not
+        # commit the open transaction
+        cursor.execute(f"CREATE TEMPORARY TABLE IF NOT EXISTS {staging_table} LIKE {source_table}")
+        self.staging_tables.add(staging_table)
+
+    def write_staging_file(self, records: Sequence[tuple]) -> str:
+        """Write records to a tab-separated staging file and return its path"""
+        fd, path = tempfile.mkstemp(prefix='etl_stage_', suffix='.tsv', dir=self.staging_dir)
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+            for record in records:
+                f.write('\t'.join(format_tsv_value(value) for value in record))
+                f.write('\n')
+        return path
+
+    def load(self, cursor, staging_table: str, source_table: str,
+             columns: List[str], records: Sequence[tuple]) -> int:
+        """Replace the staging table contents with records; caller moves rows and commits"""
+        self.ensure_staging_table(cursor, staging_table, source_table)
+        cursor.execute(f"DELETE FROM {staging_table}")
+
+        if not records:
+            return 0
+
+        path = self.write_staging_file(records)
+        try:
+            cursor.execute(f"""
+                LOAD DATA LOCAL INFILE %s
+                INTO TABLE {staging_table}
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+                LINES TERMINATED BY '\\n'
+                ({', '.join(columns)})
+            """, (path.replace('\\', '/'),))
+            loaded = cursor.rowcount
+        finally:
+            os.remove(path)
+
+        if loaded != len(records):
+            logger.warning(f"Staged {loaded} of {len(records)} rows into {staging_table}")
+        return loaded
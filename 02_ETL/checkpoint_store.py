@@ -0,0 +1,108 @@
+"""
+Checkpoint Store for the ETL Pipeline
+Records runs and per-step, per-batch progress in the warehouse so a failed run
+can be resumed from its last committed batch
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore:
+    """Reads and writes the etl_run and etl_checkpoint control tables"""
+
+    def __init__(self, conn):
+        """Initialize store against a data warehouse connection"""
+        self.conn = conn
+
+    def start_run(self, resume: bool = False) -> Tuple[int, bool]:
+        """Start a new run, or with resume reopen the most recent unfinished one
+
+        Returns (run_id, resumed). A run left 'running' by a crashed process
+        counts as unfinished.
+        """
+        cursor = self.conn.cursor()
+        if resume:
+            cursor.execute("""
+                SELECT run_id, status FROM etl_run
+                ORDER BY run_id DESC
+                LIMIT 1
+            """)
+            last_run = cursor.fetchone()
+            if last_run and last_run[1] != 'success':
+                run_id = last_run[0]
+                cursor.execute("""
+                    UPDATE etl_run
+                    SET status = 'running', resumed_at = NOW(), finished_at = NULL, error_message = NULL
+                    WHERE run_id = %s
+                """, (run_id,))
+                self.conn.commit()
+                cursor.close()
+                logger.info(f"Resuming ETL run {run_id}")
+                return run_id, True
+            logger.info("No failed ETL run to resume, starting a new run")
+
+        cursor.execute("INSERT INTO etl_run (status) VALUES ('running')")
+        run_id = cursor.lastrowid
+        self.conn.commit()
+        cursor.close()
+        return run_id, False
+
+    def finish_run(self, run_id: int, status: str, error_message: Optional[str] = None):
+        """Mark a run as 'success' or 'failed'"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            UPDATE etl_run SET status = %s, finished_at = NOW(), error_message = %s
+            WHERE run_id = %s
+        """, (status, error_message, run_id))
+        self.conn.commit()
+        cursor.close()
+
+    def get_checkpoints(self, run_id: int) -> Dict[str, Dict]:
+        """Get {step_name: checkpoint} for every step a run has started"""
+        cursor = self.conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT step_name, status, position_ts, position_id, batches_committed, rows_committed
+            FROM etl_checkpoint
+            WHERE run_id = %s
+        """, (run_id,))
+        checkpoints = {row['step_name']: row for row in cursor.fetchall()}
+        cursor.close()
+        return checkpoints
+
+    def register_step(self, run_id: int, step_name: str):
+        """Record that a step has been planned, without touching existing progress"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            INSERT IGNORE INTO etl_checkpoint (run_id, step_name, status)
+            VALUES (%s, %s, 'running')
+        """, (run_id, step_name))
+        self.conn.commit()
+        cursor.close()
+
+    def save_batch(self, cursor, run_id: int, step_name: str, position_ts, position_id: int,
+                   batches_committed: int, rows_committed: int):
+        """Record a step's last committed batch (committed by the caller with its batch)"""
+        cursor.execute("""
+            INSERT INTO etl_checkpoint (
+                run_id, step_name, status, position_ts, position_id, batches_committed, rows_committed
+            ) VALUES (%s, %s, 'running', %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                position_ts = VALUES(position_ts),
+                position_id = VALUES(position_id),
+                batches_committed = VALUES(batches_committed),
+                rows_committed = VALUES(rows_committed)
+        """, (run_id, step_name, position_ts, position_id, batches_committed, rows_committed))
+
+    def complete_step(self, run_id: int, step_name: str):
+        """Mark a step as completed so a resumed run skips it"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            INSERT INTO etl_checkpoint (run_id, step_name, status)
+            VALUES (%s, %s, 'completed')
+            ON DUPLICATE KEY UPDATE status = 'completed'
+        """, (run_id, step_name))
+        self.conn.commit()
+        cursor.close()
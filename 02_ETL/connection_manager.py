@@ -0,0 +1,98 @@
+"""
+Connection Manager for the ETL Pipeline
+Hands out pooled source (OLTP) and target (Data Warehouse) connections and applies
+the session profiles used for extraction and bulk fact loads
+"""
+
+import logging
+from contextlib import contextmanager
+from typing import Dict
+
+from mysql.connector import pooling
+
+logger = logging.getLogger(__name__)
+
+# mysql.connector caps a pool at 32 connections
+MAX_POOL_SIZE = 32
+
+ISOLATION_LEVELS = ('READ UNCOMMITTED', 'READ COMMITTED', 'REPEATABLE READ', 'SERIALIZABLE')
+
+
+class ConnectionManager:
+    """Connection pools for the source and target databases of one ETL process"""
+
+    def __init__(self, config: Dict, pool_size: int = 4, allow_local_infile: bool = False):
+        """Initialize manager from the ETL configuration; pools are created on first use"""
+        self.config = config
+        self.settings = config.get('etl_settings', {})
+        self.pool_size = max(1, min(int(pool_size), MAX_POOL_SIZE))
+        self.allow_local_infile = allow_local_infile
+        self.pools: Dict[str, pooling.MySQLConnectionPool] = {}
+
+        self.bulk_settings = self.settings.get('bulk_load', {})
+        self.source_isolation_level = self.settings.get('source_isolation_level', 'READ COMMITTED')
+        if self.source_isolation_level not in ISOLATION_LEVELS:
+            raise ValueError(f"Unknown source_isolation_level: {self.source_isolation_level}")
+
+    def get_pool(self, name: str) -> pooling.MySQLConnectionPool:
+        """Get (creating on first use) the pool for 'source' or 'target'"""
+        if name not in self.pools:
+            db_config = self.config[f'{name}_database']
+            self.pools[name] = pooling.MySQLConnectionPool(
+                pool_name=f"etl_{name}",
+                pool_size=self.pool_size,
+                pool_reset_session=True,
+                host=db_config['host'],
+                port=db_config['port'],
+                database=db_config['database'],
+                user=db_config['user'],
+                password=db_config['password'],
+                allow_local_infile=self.allow_local_infile and name == 'target'
+            )
+            logger.info(f"Created {name} connection pool ({self.pool_size} connections)")
+        return self.pools[name]
+
+    def get_source_connection(self):
+        """Get a pooled OLTP connection with the extraction session profile applied"""
+        conn = self.get_pool('source').get_connection()
+        cursor = conn.cursor()
+        # Plain consistent reads without gap locks, and enough time for the
+        # client to drain long unbuffered result sets between batches
+        cursor.execute(f"SET SESSION TRANSACTION ISOLATION LEVEL {self.source_isolation_level}")
+        cursor.execute("SET SESSION net_write_timeout = %s",
+                       (int(self.settings.get('source_net_write_timeout', 600)),))
+        cursor.close()
+        return conn
+
+    def get_target_connection(self):
+        """Get a pooled Data Warehouse connection"""
+        return self.get_pool('target').get_connection()
+
+    @contextmanager
+    def bulk_load_session(self, conn):
+        """Relax integrity checks on a target connection for the duration of a fact load
+
+        Foreign keys are safe to skip because fact keys come from the dimension
+        lookups. Unique checks are only relaxed when bulk_load.relax_unique_checks
+        is set: InnoDB may then miss duplicates on secondary unique keys such as
+        uk_order_line, which the fact upserts rely on.
+        """
+        relaxed = []
+        if self.bulk_settings.get('relax_foreign_key_checks', True):
+            relaxed.append('foreign_key_checks')
+        if self.bulk_settings.get('relax_unique_checks', False):
+            relaxed.append('unique_checks')
+
+        cursor = conn.cursor()
+        for variable in relaxed:
+            cursor.execute(f"SET SESSION {variable} = 0")
+        cursor.close()
+        try:
+            yield
+        finally:
+            # Restore even on failure; pooled sessions are also reset on return
+            if relaxed and conn.is_connected():
+                cursor = conn.cursor()
+                for variable in relaxed:
+                    cursor.execute(f"SET SESSION {variable} = 1")
+                cursor.close()
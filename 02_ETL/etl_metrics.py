@@ -0,0 +1,234 @@
+"""
+ETL Metrics for the ETL Pipeline
+Records per-step timings, row counts, round trips and memory, and exports them
+as a JSON run report and a Prometheus text-format file
+"""
+
+import json
+import logging
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PHASES = ('extract', 'transform', 'load')
+
+
+def reset_peak_rss() -> bool:
+    """Reset this process's resident set size high-water mark (VmHWM); False where unsupported
+
+    Linux only: writing 5 to /proc/self/clear_refs restarts VmHWM from the
+    current RSS, so the next reading is the peak since this call.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Resident set size high-water mark (VmHWM) of this process since the last reset"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def session_questions(conn) -> Optional[int]:
+    """Number of statements the server has received on this connection's session"""
+    if conn is None:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SHOW SESSION STATUS LIKE 'Questions'")
+        row = cursor.fetchone()
+        cursor.close()
+        return int(row[1]) if row else None
+    except Exception as e:
+        logger.debug(f"Could not read session statement count: {e}")
+        return None
+
+
+class StepMetrics:
+    """Measurements for a single ETL step"""
+
+    def __init__(self, name: str):
+        """Initialize empty measurements for a step"""
+        self.name = name
+        self.status = 'running'
+        self.started_at = datetime.now()
+        self.wall_seconds = 0.0
+        self.phase_seconds = {phase: 0.0 for phase in PHASES}
+        self.rows_read = 0
+        self.rows_written = 0
+        self.round_trips = None
+        self.peak_memory_bytes = None
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rows written (or read, for steps that write nothing) per wall-clock second"""
+        rows = self.rows_written or self.rows_read
+        return rows / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        """Serialize the measurements for the JSON run report"""
+        return {
+            'step': self.name,
+            'status': self.status,
+            'started_at': self.started_at.isoformat(),
+            'wall_seconds': round(self.wall_seconds, 6),
+            'phase_seconds': {phase: round(seconds, 6) for phase, seconds in self.phase_seconds.items()},
+            'rows_read': self.rows_read,
+            'rows_written': self.rows_written,
+            'rows_per_second': round(self.rows_per_second, 2),
+            'round_trips': self.round_trips,
+            'peak_memory_bytes': self.peak_memory_bytes,
+        }
+
+
+class ETLMetrics:
+    """Collects StepMetrics for one ETL run"""
+
+    def __init__(self):
+        """Initialize an empty run"""
+        self.started_at = datetime.now()
+        self.run_id = self.started_at.strftime('%Y%m%d_%H%M%S')
+        self.steps: List[StepMetrics] = []
+        self.current: Optional[StepMetrics] = None
+
+    @contextmanager
+    def step(self, name: str, connections=()):
+        """Measure an ETL step; round trips are counted on the given connections"""
+        step = StepMetrics(name)
+        self.steps.append(step)
+        self.current = step
+
+        questions_before = [session_questions(conn) for conn in connections]
+        # Peak memory of this step alone: the RSS high-water mark restarted for
+        # the step where Linux allows it, otherwise traced Python allocations
+        rss_reset = reset_peak_rss()
+        traced = not rss_reset and not tracemalloc.is_tracing()
+        if traced:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            yield step
+            step.status = 'success'
+        except Exception:
+            step.status = 'failed'
+            raise
+        finally:
+            step.wall_seconds = time.perf_counter() - started
+            if rss_reset:
+                step.peak_memory_bytes = peak_rss_bytes()
+            elif traced:
+                step.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+            round_trips = 0
+            for conn, before in zip(connections, questions_before):
+                after = session_questions(conn)
+                if before is None or after is None:
+                    round_trips = None
+                    break
+                # The closing SHOW STATUS is itself counted
+                round_trips += after - before - 1
+            step.round_trips = round_trips
+
+            self.current = None
+            logger.info(
+                f"Step {name}: {step.wall_seconds:.2f}s, {step.rows_read} read, "
+                f"{step.rows_written} written, {step.rows_per_second:,.0f} rows/sec, "
+                f"{step.round_trips} round trips"
+            )
+
+    @contextmanager
+    def phase(self, name: str):
+        """Add the wall time of a block to the current step's extract/transform/load total"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase_time(name, time.perf_counter() - started)
+
+    def add_phase_time(self, name: str, seconds: float):
+        """Add already-measured seconds to the current step's extract/transform/load total"""
+        if self.current is not None:
+            self.current.phase_seconds[name] += seconds
+
+    def add_rows(self, read: int = 0, written: int = 0):
+        """Count rows read from the source and written to the warehouse by the current step"""
+        if self.current is not None:
+            self.current.rows_read += read
+            self.current.rows_written += written
+
+    def to_dict(self) -> Dict:
+        """Serialize the run for the JSON report"""
+        return {
+            'run_id': self.run_id,
+            'started_at': self.started_at.isoformat(),
+            'steps': [step.to_dict() for step in self.steps],
+        }
+
+    def write_json(self, path: str):
+        """Write the JSON run report"""
+        self._write_atomic(path, json.dumps(self.to_dict(), indent=2))
+        logger.info(f"ETL run report written to {path}")
+
+    def write_prometheus(self, path: str):
+        """Write metrics in Prometheus text exposition format (node exporter textfile collector)"""
+        lines = []
+
+        def metric(name: str, help_text: str, metric_type: str, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        metric('etl_step_duration_seconds', 'Wall-clock time of an ETL step', 'gauge',
+               [({'step': s.name}, s.wall_seconds) for s in self.steps])
+        metric('etl_step_phase_seconds', 'Wall-clock time of an ETL step phase', 'gauge',
+               [({'step': s.name, 'phase': phase}, seconds)
+                for s in self.steps for phase, seconds in s.phase_seconds.items()])
+        metric('etl_step_rows_read', 'Rows read from the source by an ETL step', 'gauge',
+               [({'step': s.name}, s.rows_read) for s in self.steps])
+        metric('etl_step_rows_written', 'Rows written to the warehouse by an ETL step', 'gauge',
+               [({'step': s.name}, s.rows_written) for s in self.steps])
+        metric('etl_step_rows_per_second', 'Rows processed per second by an ETL step', 'gauge',
+               [({'step': s.name}, s.rows_per_second) for s in self.steps])
+        metric('etl_step_round_trips', 'Database statements issued by an ETL step', 'gauge',
+               [({'step': s.name}, s.round_trips) for s in self.steps])
+        metric('etl_step_peak_memory_bytes', 'Peak memory during an ETL step (RSS high-water mark on Linux, '
+               'traced Python allocations elsewhere)', 'gauge',
+               [({'step': s.name}, s.peak_memory_bytes) for s in self.steps])
+        metric('etl_step_success', 'Whether an ETL step succeeded (1) or failed (0)', 'gauge',
+               [({'step': s.name}, 1 if s.status == 'success' else 0) for s in self.steps])
+        # No run_id label: a label per run would add a new series every run
+        metric('etl_run_start_timestamp_seconds', 'Start time of the last ETL run', 'gauge',
+               [({}, self.started_at.timestamp())])
+
+        self._write_atomic(path, '\n'.join(lines) + '\n')
+        logger.info(f"Prometheus metrics written to {path}")
+
+    def _write_atomic(self, path: str, content: str):
+        """Write a file via rename so collectors never read a partial file"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
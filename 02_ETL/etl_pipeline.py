@@ -3,13 +3,31 @@ ETL Pipeline for E-Commerce Analytics System
 Extracts data from OLTP database and loads into Star Schema Data Warehouse
 """
 
+import argparse
 import json
 import logging
-import mysql.connector
+import multiprocessing
+import re
 from mysql.connector import Error
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
 import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import transforms
+from bulk_loader import BulkLoader
+from change_log import ChangeLogReader
+from checkpoint_store import CheckpointStore
+from connection_manager import ConnectionManager
+from etl_metrics import ETLMetrics
+from key_cache import DimensionKeyCache
+from location_resolver import LocationResolver
+from parquet_export import DIMENSION_TABLES, ParquetExporter
+from sales_aggregates import SalesAggregates
 
 # Configure logging
 logging.basicConfig(
@@ -22,15 +40,133 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Fact table column lists shared by the executemany and LOAD DATA paths:
+# (insert columns, columns refreshed on duplicate key)
+FACT_COLUMNS = {
+    'fact_sales': (
+        ['date_key', 'customer_key', 'product_key', 'supplier_key', 'location_key',
+         'order_id', 'order_item_id', 'quantity', 'unit_price', 'discount_amount', 'discount_percent',
+         'line_total', 'cost_amount', 'profit_amount', 'profit_margin_percent',
+         'tax_amount', 'shipping_cost', 'order_total', 'order_status', 'payment_status',
+         'payment_method', 'order_date'],
+        ['date_key', 'customer_key', 'product_key', 'supplier_key', 'location_key',
+         'quantity', 'unit_price', 'discount_amount', 'discount_percent',
+         'line_total', 'cost_amount', 'profit_amount', 'profit_margin_percent',
+         'tax_amount', 'shipping_cost', 'order_total', 'order_status', 'payment_status',
+         'payment_method', 'order_date']
+    ),
+    'fact_inventory': (
+        ['date_key', 'product_key', 'supplier_key', 'location_key',
+         'product_id', 'quantity_on_hand', 'reorder_level', 'reorder_quantity',
+         'quantity_available', 'stock_value', 'is_low_stock', 'is_out_of_stock',
+         'is_overstocked', 'warehouse_location', 'last_restocked_date', 'snapshot_date',
+         'days_of_supply', 'units_sold_7d', 'units_sold_30d', 'units_sold_90d', 'inventory_turnover'],
+        ['quantity_on_hand', 'quantity_available', 'stock_value',
+         'is_low_stock', 'is_out_of_stock', 'is_overstocked',
+         'days_of_supply', 'units_sold_7d', 'units_sold_30d', 'units_sold_90d', 'inventory_turnover']
+    ),
+    'fact_inventory_transactions': (
+        ['date_key', 'product_key', 'supplier_key', 'location_key',
+         'transaction_id', 'reference_order_id', 'quantity_change', 'quantity_before',
+         'quantity_after', 'transaction_value', 'transaction_type', 'notes', 'transaction_date'],
+        ['date_key', 'product_key', 'supplier_key', 'location_key',
+         'reference_order_id', 'quantity_change', 'quantity_before', 'quantity_after',
+         'transaction_value', 'transaction_type', 'notes', 'transaction_date']
+    ),
+}
+
+# Dimensions looked up by fact loads: name -> (table, surrogate key, natural key)
+DIMENSION_KEYS = {
+    'customer': ('dim_customer', 'customer_key', 'customer_id'),
+    'product': ('dim_product', 'product_key', 'product_id'),
+    'supplier': ('dim_supplier', 'supplier_key', 'supplier_id'),
+}
+
+# Source attributes tracked for SCD Type 2 change detection
+CUSTOMER_HASH_COLUMNS = [
+    'first_name', 'last_name', 'email', 'phone', 'date_of_birth', 'gender',
+    'city', 'state', 'country', 'postal_code', 'registration_date', 'status'
+]
+PRODUCT_HASH_COLUMNS = [
+    'p.product_code', 'p.product_name', 'p.description', 'p.category_id', 'c.category_name',
+    'c.parent_category_id', 'pc.category_name', 'p.supplier_id', 's.supplier_name',
+    'p.unit_price', 'p.cost_price', 'p.weight_kg', 'p.dimensions', 'p.status'
+]
+
+
+# How fact_sales changes are applied:
+#   batch  - upsert and commit every batch (readers see the load progress)
+#   staged - stage and deduplicate the whole load, then apply it with one upsert
+#   swap   - rebuild the table in full beside the live one, then RENAME TABLE
+MERGE_MODES = ('batch', 'staged', 'swap')
+
+# How fact_inventory snapshots are written:
+#   full  - one row per product per day
+#   delta - a row only when a product's stock position changed since its last
+#           row; vw_inventory_daily rebuilds the full daily picture
+SNAPSHOT_MODES = ('full', 'delta')
+
+# Columns compared in delta snapshots (the stock position)
+SNAPSHOT_POSITION_COLUMNS = ['product_key', 'quantity_on_hand', 'reorder_level', 'reorder_quantity',
+                             'stock_value', 'warehouse_location']
+# DECIMAL(x, 2) columns among them, compared in hundredths
+SNAPSHOT_DECIMAL_COLUMNS = ('stock_value',)
+
+# Sales velocity columns; in delta mode they are refreshed on fact_inventory_current
+# for every loaded product, changed position or not
+INVENTORY_VELOCITY_COLUMNS = ['days_of_supply', 'units_sold_7d', 'units_sold_30d', 'units_sold_90d',
+                              'inventory_turnover']
+
+# Columns copied from fact_inventory into fact_inventory_current (latest row per product)
+INVENTORY_CURRENT_COLUMNS = ['inventory_key', *FACT_COLUMNS['fact_inventory'][0]]
+
+# Checkpoint step names of parallel Fact_Sales ranges: load_fact_sales[<first>-<last>]
+PARTITION_STEP_PREFIX = 'load_fact_sales['
+# Checkpoint holding the updated_at cutoff shared by every parallel Fact_Sales range
+SALES_CUTOFF_STEP = 'load_fact_sales:cutoff'
+
+
+def row_hash_sql(columns: List[str]) -> str:
+    """Build a NULL-safe MySQL expression hashing the given source columns"""
+    values = ', '.join(f"IFNULL({col}, '<null>')" for col in columns)
+    return f"MD5(CONCAT_WS('|', {values}))"
+
 
 class ETLPipeline:
     """Main ETL Pipeline Class"""
     
     def __init__(self, config_path: str = 'etl_config.json'):
         """Initialize ETL Pipeline with configuration"""
+        self.config_path = config_path
         self.config = self.load_config(config_path)
+        self.settings = self.config.get('etl_settings', {})
+        self.batch_size = int(self.settings.get('batch_size', 1000))
+        self.load_engine = self.settings.get('load_engine', 'executemany')
+        self.parallel_workers = int(self.settings.get('parallel_workers', 1))
+        self.merge_mode = self.settings.get('merge_mode', 'batch')
+        self.velocity_window = int(self.settings.get('sales_velocity_window_days', 30))
+        if self.velocity_window not in transforms.SALES_WINDOWS:
+            raise ValueError(f"sales_velocity_window_days must be one of {transforms.SALES_WINDOWS}")
+        if self.merge_mode not in MERGE_MODES:
+            raise ValueError(f"Unknown merge_mode: {self.merge_mode}")
+        self.snapshot_mode = self.settings.get('inventory_snapshot_mode', 'full')
+        if self.snapshot_mode not in SNAPSHOT_MODES:
+            raise ValueError(f"Unknown inventory_snapshot_mode: {self.snapshot_mode}")
+        # Fact loads stream larger batches under the bulk-load session profile
+        self.bulk_batch_size = int(self.settings.get('bulk_load', {}).get('batch_size', self.batch_size))
+        self.connections = None
         self.source_conn = None
         self.target_conn = None
+        self.location_resolver = None
+        self.key_caches = None
+        self.change_capture = bool(self.settings.get('change_capture', False))
+        self.change_log = None
+        self.bulk_loader = None
+        self.metrics = ETLMetrics()
+        self.checkpoints = None
+        self.run_id = None
+        # Checkpoints of the failed run being resumed, by step name
+        self.resume_points: Dict[str, Dict] = {}
         
     def load_config(self, config_path: str) -> Dict:
         """Load ETL configuration from JSON file"""
@@ -49,26 +185,19 @@ class ETLPipeline:
     def connect_databases(self):
         """Establish connections to source and target databases"""
         try:
+            if self.connections is None:
+                self.connections = ConnectionManager(
+                    self.config,
+                    pool_size=self.settings.get('pool_size', 4),
+                    allow_local_infile=self.load_engine == 'load_data'
+                )
+            
             # Source database connection (OLTP)
-            source_config = self.config['source_database']
-            self.source_conn = mysql.connector.connect(
-                host=source_config['host'],
-                port=source_config['port'],
-                database=source_config['database'],
-                user=source_config['user'],
-                password=source_config['password']
-            )
+            self.source_conn = self.connections.get_source_connection()
             logger.info("Connected to source database (OLTP)")
             
             # Target database connection (Data Warehouse)
-            target_config = self.config['target_database']
-            self.target_conn = mysql.connector.connect(
-                host=target_config['host'],
-                port=target_config['port'],
-                database=target_config['database'],
-                user=target_config['user'],
-                password=target_config['password']
-            )
+            self.target_conn = self.connections.get_target_connection()
             logger.info("Connected to target database (Data Warehouse)")
             
         except Error as e:
@@ -76,23 +205,57 @@ class ETLPipeline:
             raise
     
     def close_connections(self):
-        """Close database connections"""
+        """Return database connections to their pools"""
         if self.source_conn and self.source_conn.is_connected():
             self.source_conn.close()
             logger.info("Source database connection closed")
         if self.target_conn and self.target_conn.is_connected():
             self.target_conn.close()
             logger.info("Target database connection closed")
+        self.source_conn = None
+        self.target_conn = None
     
-    def populate_dim_date(self, start_date: str = '2020-01-01', end_date: str = '2025-12-31'):
-        """Populate Date Dimension table"""
+    def populate_dim_date(self, start_date: Optional[str] = None, end_date: Optional[str] = None):
+        """Populate Date Dimension table with any dates missing from the required range
+        
+        The range defaults to the order dates in the source (and today) plus
+        etl_settings.date_lookahead_days, so fact rows never miss their date_key.
+        """
         logger.info("Populating Dim_Date dimension...")
         
+        if start_date and end_date:
+            start = pd.Timestamp(start_date)
+            end = pd.Timestamp(end_date)
+        else:
+            start, end = self.get_required_date_range()
+        start_key = int(start.strftime('%Y%m%d'))
+        end_key = int(end.strftime('%Y%m%d'))
+        expected = (end - start).days + 1
+        
         cursor = self.target_conn.cursor()
         
-        start = datetime.strptime(start_date, '%Y-%m-%d')
-        end = datetime.strptime(end_date, '%Y-%m-%d')
-        current_date = start
+        # Steady state: the range is already complete, nothing to write
+        cursor.execute("""
+            SELECT COUNT(*) FROM dim_date
+            WHERE date_key BETWEEN %s AND %s
+        """, (start_key, end_key))
+        existing = cursor.fetchone()[0]
+        if existing >= expected:
+            logger.info(f"Dim_Date already covers {start.date()} to {end.date()}")
+            cursor.close()
+            return
+        
+        cursor.execute("""
+            SELECT date_key FROM dim_date
+            WHERE date_key BETWEEN %s AND %s
+        """, (start_key, end_key))
+        existing_keys = np.fromiter((row[0] for row in cursor.fetchall()), dtype=np.int64)
+        
+        with self.metrics.phase('transform'):
+            dates = pd.date_range(start, end, freq='D')
+            date_keys = (dates.year * 10000 + dates.month * 100 + dates.day).to_numpy(dtype=np.int64)
+            missing = dates[~np.isin(date_keys, existing_keys)]
+            records = transforms.date_dimension_rows(missing)
         
         insert_query = """
         INSERT INTO dim_date (
@@ -103,120 +266,88 @@ class ETLPipeline:
         ON DUPLICATE KEY UPDATE full_date = full_date
         """
         
-        records = []
-        while current_date <= end:
-            date_key = int(current_date.strftime('%Y%m%d'))
-            day_of_week = current_date.weekday() + 1  # Monday = 1, Sunday = 7
-            day_name = current_date.strftime('%A')
-            quarter = (current_date.month - 1) // 3 + 1
-            
-            records.append((
-                date_key,
-                current_date.date(),
-                day_of_week,
-                day_name,
-                current_date.day,
-                current_date.timetuple().tm_yday,
-                current_date.isocalendar()[1],
-                current_date.month,
-                current_date.strftime('%B'),
-                quarter,
-                f'Q{quarter}',
-                current_date.year,
-                day_of_week in [6, 7],  # Saturday or Sunday
-                False  # Can be enhanced with holiday logic
-            ))
-            
-            current_date += timedelta(days=1)
-        
-        cursor.executemany(insert_query, records)
-        self.target_conn.commit()
-        logger.info(f"Inserted {len(records)} records into Dim_Date")
+        with self.metrics.phase('load'):
+            for start_idx in range(0, len(records), self.batch_size):
+                cursor.executemany(insert_query, records[start_idx:start_idx + self.batch_size])
+            self.target_conn.commit()
+        self.metrics.add_rows(written=len(records))
+        logger.info(f"Inserted {len(records)} missing records into Dim_Date ({start.date()} to {end.date()})")
         cursor.close()
     
+    def get_required_date_range(self) -> tuple:
+        """Get the date range fact rows can reference: source order and stock movement dates
+        and today, plus look-ahead"""
+        cursor = self.source_conn.cursor()
+        cursor.execute("""
+            SELECT MIN(first_date), MAX(last_date) FROM (
+                SELECT MIN(order_date) AS first_date, MAX(order_date) AS last_date FROM orders
+                UNION ALL
+                SELECT MIN(transaction_date), MAX(transaction_date) FROM inventory_transactions
+            ) source_dates
+        """)
+        min_source_date, max_source_date = cursor.fetchone()
+        cursor.close()
+        
+        today = pd.Timestamp(datetime.now().date())
+        start = min(pd.Timestamp(min_source_date).normalize(), today) if min_source_date else today
+        end = max(pd.Timestamp(max_source_date).normalize(), today) if max_source_date else today
+        end += pd.Timedelta(days=int(self.settings.get('date_lookahead_days', 365)))
+        return start, end
+    
     def load_dim_customer(self):
         """Load Customer Dimension from OLTP"""
         logger.info("Loading Dim_Customer dimension...")
         
-        source_cursor = self.source_conn.cursor(dictionary=True)
+        source_cursor = self.source_conn.cursor()
         target_cursor = self.target_conn.cursor()
         
-        # Fetch customers from source
-        source_cursor.execute("""
+        # Fetch customers from source with a hash of their tracked attributes,
+        # only those in the change log when change capture is enabled
+        changed_ids, change_position = self.get_changed_ids('customers')
+        query = f"""
             SELECT 
                 customer_id, first_name, last_name, email, phone, date_of_birth,
-                gender, city, state, country, postal_code, registration_date, status
+                gender, city, state, country, postal_code, registration_date, status,
+                {row_hash_sql(CUSTOMER_HASH_COLUMNS)} as row_hash
             FROM customers
-        """)
+        """
+        if changed_ids is None:
+            customers = self.extract(source_cursor, query)
+        else:
+            customers = self.extract_ids(source_cursor, query, 'customer_id', changed_ids)
         
-        customers = source_cursor.fetchall()
+        # Only new and changed customers are transformed and written
+        versions, stale_keys = self.get_current_versions('dim_customer', 'customer_key', 'customer_id',
+                                                         changed_ids)
+        changed, expired_keys, new_count = self.diff_dimension_rows(
+            customers, source_cursor.column_names, 'customer_id', versions
+        )
         
         insert_query = """
         INSERT INTO dim_customer (
             customer_id, customer_full_name, first_name, last_name, email, phone,
             date_of_birth, age, age_group, gender, city, state, country, postal_code,
-            registration_date, customer_status, years_as_customer, is_active
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            customer_full_name = VALUES(customer_full_name),
-            email = VALUES(email),
-            city = VALUES(city),
-            state = VALUES(state),
-            country = VALUES(country),
-            customer_status = VALUES(customer_status),
-            is_active = VALUES(is_active)
+            registration_date, customer_status, years_as_customer, is_active,
+            row_hash, valid_from
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
         
-        records = []
-        today = datetime.now().date()
+        effective_at = datetime.now().replace(microsecond=0)
+        with self.metrics.phase('transform'):
+            columns = transforms.columns_of(changed, source_cursor.column_names)
+            records = [
+                record + (row_hash, effective_at)
+                for record, row_hash in zip(transforms.transform_customers(columns, effective_at.date()),
+                                            columns['row_hash'])
+            ]
         
-        for cust in customers:
-            full_name = f"{cust['first_name']} {cust['last_name']}"
-            age = None
-            age_group = None
-            
-            if cust['date_of_birth']:
-                age = (today - cust['date_of_birth']).days // 365
-                if age < 26:
-                    age_group = '18-25'
-                elif age < 36:
-                    age_group = '26-35'
-                elif age < 46:
-                    age_group = '36-45'
-                elif age < 56:
-                    age_group = '46-55'
-                else:
-                    age_group = '56+'
-            
-            years_as_customer = None
-            if cust['registration_date']:
-                reg_date = cust['registration_date'].date() if isinstance(cust['registration_date'], datetime) else cust['registration_date']
-                years_as_customer = (today - reg_date).days / 365.25
-            
-            records.append((
-                cust['customer_id'],
-                full_name,
-                cust['first_name'],
-                cust['last_name'],
-                cust['email'],
-                cust['phone'],
-                cust['date_of_birth'],
-                age,
-                age_group,
-                cust['gender'],
-                cust['city'],
-                cust['state'],
-                cust['country'],
-                cust['postal_code'],
-                cust['registration_date'],
-                cust['status'],
-                years_as_customer,
-                cust['status'] == 'Active'
-            ))
-        
-        target_cursor.executemany(insert_query, records)
-        self.target_conn.commit()
-        logger.info(f"Loaded {len(records)} customers into Dim_Customer")
+        self.write_scd_type2(target_cursor, 'dim_customer', 'customer_key', insert_query,
+                             records, expired_keys + stale_keys, effective_at)
+        self.save_change_position('customers', change_position, len(customers))
+        logger.info(
+            f"Dim_Customer: {new_count} new, {len(expired_keys)} changed, "
+            f"{len(customers) - len(changed)} unchanged customers"
+        )
         
         source_cursor.close()
         target_cursor.close()
@@ -228,69 +359,146 @@ class ETLPipeline:
         source_cursor = self.source_conn.cursor(dictionary=True)
         target_cursor = self.target_conn.cursor()
         
-        source_cursor.execute("""
+        products = self.extract(source_cursor, f"""
             SELECT 
                 p.product_id, p.product_code, p.product_name, p.description,
                 p.category_id, c.category_name, c.parent_category_id,
                 pc.category_name as parent_category_name,
                 p.supplier_id, s.supplier_name,
-                p.unit_price, p.cost_price, p.weight_kg, p.dimensions, p.status
+                p.unit_price, p.cost_price, p.weight_kg, p.dimensions, p.status,
+                {row_hash_sql(PRODUCT_HASH_COLUMNS)} as row_hash
             FROM products p
             LEFT JOIN categories c ON p.category_id = c.category_id
             LEFT JOIN categories pc ON c.parent_category_id = pc.category_id
             LEFT JOIN suppliers s ON p.supplier_id = s.supplier_id
         """)
         
-        products = source_cursor.fetchall()
+        # Only new and changed products are transformed and written
+        versions, stale_keys = self.get_current_versions('dim_product', 'product_key', 'product_id')
+        changed, expired_keys, new_count = self.diff_dimension_rows(
+            products, source_cursor.column_names, 'product_id', versions
+        )
         
         insert_query = """
         INSERT INTO dim_product (
             product_id, product_code, product_name, description, category_id, category_name,
             parent_category_id, parent_category_name, supplier_id, supplier_name,
             unit_price, cost_price, profit_margin, profit_margin_percent,
-            weight_kg, dimensions, product_status
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            product_name = VALUES(product_name),
-            unit_price = VALUES(unit_price),
-            cost_price = VALUES(cost_price),
-            profit_margin = VALUES(profit_margin),
-            profit_margin_percent = VALUES(profit_margin_percent),
-            product_status = VALUES(product_status)
+            weight_kg, dimensions, product_status, row_hash, valid_from
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
         
-        records = []
-        for prod in products:
-            profit_margin = prod['unit_price'] - prod['cost_price'] if prod['unit_price'] and prod['cost_price'] else 0
-            profit_margin_percent = (profit_margin / prod['unit_price'] * 100) if prod['unit_price'] and prod['unit_price'] > 0 else 0
-            
-            records.append((
-                prod['product_id'],
-                prod['product_code'],
-                prod['product_name'],
-                prod['description'],
-                prod['category_id'],
-                prod['category_name'],
-                prod['parent_category_id'],
-                prod['parent_category_name'],
-                prod['supplier_id'],
-                prod['supplier_name'],
-                prod['unit_price'],
-                prod['cost_price'],
-                profit_margin,
-                profit_margin_percent,
-                prod['weight_kg'],
-                prod['dimensions'],
-                prod['status']
-            ))
-        
-        target_cursor.executemany(insert_query, records)
-        self.target_conn.commit()
-        logger.info(f"Loaded {len(records)} products into Dim_Product")
+        effective_at = datetime.now().replace(microsecond=0)
+        with self.metrics.phase('transform'):
+            records = []
+            for prod in changed:
+                profit_margin = prod['unit_price'] - prod['cost_price'] if prod['unit_price'] and prod['cost_price'] else 0
+                profit_margin_percent = (profit_margin / prod['unit_price'] * 100) if prod['unit_price'] and prod['unit_price'] > 0 else 0
+                
+                records.append((
+                    prod['product_id'],
+                    prod['product_code'],
+                    prod['product_name'],
+                    prod['description'],
+                    prod['category_id'],
+                    prod['category_name'],
+                    prod['parent_category_id'],
+                    prod['parent_category_name'],
+                    prod['supplier_id'],
+                    prod['supplier_name'],
+                    prod['unit_price'],
+                    prod['cost_price'],
+                    profit_margin,
+                    profit_margin_percent,
+                    prod['weight_kg'],
+                    prod['dimensions'],
+                    prod['status'],
+                    prod['row_hash'],
+                    effective_at
+                ))
+        
+        self.write_scd_type2(target_cursor, 'dim_product', 'product_key', insert_query,
+                             records, expired_keys + stale_keys, effective_at)
+        logger.info(
+            f"Dim_Product: {new_count} new, {len(expired_keys)} changed, "
+            f"{len(products) - len(changed)} unchanged products"
+        )
         
         source_cursor.close()
         target_cursor.close()
     
+    def get_current_versions(self, table: str, key_column: str, id_column: str,
+                             ids: Optional[List] = None) -> tuple:
+        """Get the current SCD Type 2 version of each natural key, or only of ids
+        
+        Returns ({natural_id: (surrogate_key, row_hash)}, stale_keys) where stale_keys
+        are older rows still flagged current for the same natural key.
+        """
+        cursor = self.target_conn.cursor()
+        query = f"SELECT {id_column}, {key_column}, row_hash FROM {table} WHERE is_current = TRUE"
+        if ids is None:
+            cursor.execute(f"{query} ORDER BY {key_column}")
+            rows = cursor.fetchall()
+        else:
+            rows = []
+            for start in range(0, len(ids), self.batch_size):
+                chunk = ids[start:start + self.batch_size]
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f"{query} AND {id_column} IN ({placeholders})", tuple(chunk))
+                rows += cursor.fetchall()
+            rows.sort(key=lambda row: row[1])
+        
+        versions = {}
+        stale_keys = []
+        for natural_id, key, row_hash in rows:
+            if natural_id in versions:
+                stale_keys.append(versions[natural_id][0])
+            versions[natural_id] = (key, row_hash)
+        
+        cursor.close()
+        return versions, stale_keys
+    
+    def diff_dimension_rows(self, rows: List, column_names, id_column: str, versions: Dict) -> tuple:
+        """Compare source row hashes with current versions
+        
+        Returns (rows to write, surrogate keys to expire, number of new natural keys).
+        Rows may be tuples (indexed through column_names) or dicts.
+        """
+        if rows and isinstance(rows[0], dict):
+            id_field, hash_field = id_column, 'row_hash'
+        else:
+            id_field, hash_field = column_names.index(id_column), column_names.index('row_hash')
+        
+        changed = []
+        expired_keys = []
+        new_count = 0
+        for row in rows:
+            version = versions.get(row[id_field])
+            if version is None:
+                new_count += 1
+                changed.append(row)
+            elif version[1] != row[hash_field]:
+                expired_keys.append(version[0])
+                changed.append(row)
+        
+        return changed, expired_keys, new_count
+    
+    def write_scd_type2(self, cursor, table: str, key_column: str, insert_query: str,
+                        records: List[tuple], expired_keys: List[int], effective_at: datetime):
+        """Expire superseded dimension versions and insert their replacements in one transaction"""
+        with self.metrics.phase('load'):
+            for start in range(0, len(expired_keys), self.batch_size):
+                keys = expired_keys[start:start + self.batch_size]
+                placeholders = ', '.join(['%s'] * len(keys))
+                cursor.execute(f"""
+                    UPDATE {table} SET is_current = FALSE, valid_to = %s
+                    WHERE {key_column} IN ({placeholders})
+                """, (effective_at, *keys))
+            if records:
+                cursor.executemany(insert_query, records)
+            self.target_conn.commit()
+        self.metrics.add_rows(written=len(records))
+    
     def load_dim_supplier(self):
         """Load Supplier Dimension from OLTP"""
         logger.info("Loading Dim_Supplier dimension...")
@@ -298,13 +506,16 @@ class ETLPipeline:
         source_cursor = self.source_conn.cursor(dictionary=True)
         target_cursor = self.target_conn.cursor()
         
-        source_cursor.execute("""
+        changed_ids, change_position = self.get_changed_ids('suppliers')
+        query = """
             SELECT supplier_id, supplier_name, contact_person, email, phone,
                    city, state, country, postal_code
             FROM suppliers
-        """)
-        
-        suppliers = source_cursor.fetchall()
+        """
+        if changed_ids is None:
+            suppliers = self.extract(source_cursor, query)
+        else:
+            suppliers = self.extract_ids(source_cursor, query, 'supplier_id', changed_ids)
         
         insert_query = """
         INSERT INTO dim_supplier (
@@ -318,12 +529,16 @@ class ETLPipeline:
             phone = VALUES(phone)
         """
         
-        records = [(s['supplier_id'], s['supplier_name'], s['contact_person'],
-                   s['email'], s['phone'], s['city'], s['state'],
-                   s['country'], s['postal_code']) for s in suppliers]
+        with self.metrics.phase('transform'):
+            records = [(s['supplier_id'], s['supplier_name'], s['contact_person'],
+                       s['email'], s['phone'], s['city'], s['state'],
+                       s['country'], s['postal_code']) for s in suppliers]
         
-        target_cursor.executemany(insert_query, records)
-        self.target_conn.commit()
+        with self.metrics.phase('load'):
+            target_cursor.executemany(insert_query, records)
+            self.target_conn.commit()
+        self.metrics.add_rows(written=len(records))
+        self.save_change_position('suppliers', change_position, len(records))
         logger.info(f"Loaded {len(records)} suppliers into Dim_Supplier")
         
         source_cursor.close()
@@ -334,75 +549,109 @@ class ETLPipeline:
         logger.info("Loading Dim_Location dimension...")
         
         source_cursor = self.source_conn.cursor(dictionary=True)
-        target_cursor = self.target_conn.cursor()
         
         # Get unique locations from orders (shipping addresses)
-        source_cursor.execute("""
+        locations = self.extract(source_cursor, """
             SELECT DISTINCT
                 shipping_country as country,
                 shipping_state as state,
                 shipping_city as city,
-                shipping_postal_code as postal_code,
-                'Shipping' as location_type
+                shipping_postal_code as postal_code
             FROM orders
             WHERE shipping_country IS NOT NULL
         """)
         
-        locations = source_cursor.fetchall()
-        
-        insert_query = """
-        INSERT INTO dim_location (
-            country, state, city, postal_code, location_type, region
-        ) VALUES (%s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE country = country
-        """
-        
-        # Simple region mapping (can be enhanced)
-        region_map = {
-            'CA': 'West', 'OR': 'West', 'WA': 'West',
-            'NY': 'East', 'MA': 'East', 'PA': 'East',
-            'TX': 'South', 'FL': 'South', 'GA': 'South',
-            'IL': 'Central', 'OH': 'Central', 'MI': 'Central'
-        }
-        
-        records = []
-        for loc in locations:
-            region = region_map.get(loc['state'], 'Other')
-            records.append((
-                loc['country'],
-                loc['state'],
-                loc['city'],
-                loc['postal_code'],
-                loc['location_type'],
-                region
-            ))
-        
-        target_cursor.executemany(insert_query, records)
-        self.target_conn.commit()
-        logger.info(f"Loaded {len(records)} locations into Dim_Location")
+        resolver = self.get_location_resolver()
+        with self.metrics.phase('load'):
+            created = resolver.ensure(
+                (loc['country'], loc['state'], loc['city'], loc['postal_code'])
+                for loc in locations
+            )
+        self.metrics.add_rows(written=created)
+        logger.info(f"Loaded {created} new locations into Dim_Location ({len(locations)} distinct in source)")
         
         source_cursor.close()
-        target_cursor.close()
     
     def load_fact_sales(self, incremental: bool = True):
         """Load Sales Fact Table from OLTP"""
         logger.info("Loading Fact_Sales fact table...")
         
-        source_cursor = self.source_conn.cursor(dictionary=True)
+        # A rebuild always starts from scratch
+        rebuild = self.merge_mode == 'swap'
+        
+        # Resume from the persisted (updated_at, order_item_id) high-water mark
+        watermark = (None, 0)
+        if incremental and not rebuild:
+            watermark = self.get_watermark('fact_sales')
+            if watermark[0]:
+                logger.info(f"Incremental load: Loading order lines changed after {watermark}")
+        
+        into_table = self.prepare_rebuild_table('fact_sales') if rebuild else 'fact_sales'
+        
+        if self.parallel_workers > 1:
+            result = self.load_fact_sales_parallel(watermark, into_table)
+        else:
+            # A resumed run carries on after its last committed batch
+            checkpoint = self.resume_points.get('load_fact_sales')
+            if checkpoint and checkpoint['position_ts']:
+                watermark = (checkpoint['position_ts'], checkpoint['position_id'])
+                logger.info(f"Resuming Fact_Sales after batch {checkpoint['batches_committed']} at {watermark}")
+            result = self.load_sales_range(watermark, into_table=into_table, track_watermark=not rebuild,
+                                           checkpoint_step='load_fact_sales')
+        
+        if rebuild:
+            self.swap_rebuilt_table('fact_sales', into_table)
+        
+        # Parallel loads and rebuilds only publish the watermark once their rows are live
+        if (rebuild or self.parallel_workers > 1) and result['watermark']:
+            cursor = self.target_conn.cursor()
+            self.save_watermark(cursor, 'fact_sales', *result['watermark'], result['rows'])
+            self.target_conn.commit()
+            cursor.close()
+    
+    def load_sales_range(self, watermark: tuple, order_range: Optional[tuple] = None,
+                         track_watermark: bool = True, checkpoint_step: Optional[str] = None,
+                         into_table: str = 'fact_sales', cutoff: Optional[datetime] = None) -> Dict:
+        """Extract, transform and load sales lines changed after a watermark and up to a cutoff
+        
+        cutoff is the newest updated_at to load (see get_sales_cutoff, used when it
+        is not given). order_range optionally limits extraction to an inclusive
+        (first, last) order_id range. With track_watermark the persisted watermark advances with every batch;
+        otherwise the caller receives the last (updated_at, order_item_id) processed.
+        With checkpoint_step every batch is also checkpointed for the current run.
+        into_table is fact_sales or its rebuild table. In staged merge mode batches
+        only go to a staging table, and progress is recorded when it is merged.
+        """
+        source_cursor = self.source_conn.cursor(buffered=False)
         target_cursor = self.target_conn.cursor()
         
-        # Get last loaded order date if incremental
-        last_date = None
-        if incremental:
-            target_cursor.execute("SELECT MAX(order_date) as last_date FROM fact_sales")
-            result = target_cursor.fetchone()
-            if result and result[0]:
-                last_date = result[0]
-                logger.info(f"Incremental load: Loading orders after {last_date}")
+        staged = self.merge_mode == 'staged'
+        write_table = into_table
+        if staged:
+            write_table = f"stg_merge_{into_table}"
+            self.prepare_staging_table(target_cursor, write_table, 'fact_sales')
+        
+        if cutoff is None:
+            cutoff = self.get_sales_cutoff()
+        watermark_ts, watermark_id = watermark
+        change_filter = " AND o.updated_at <= %s"
+        params = (cutoff,)
+        if watermark_ts:
+            change_filter += """
+            AND (o.updated_at > %s
+                 OR (o.updated_at = %s AND oi.order_item_id > %s))
+            """
+            params += (watermark_ts, watermark_ts, watermark_id)
+        if order_range:
+            change_filter += " AND o.order_id BETWEEN %s AND %s"
+            params += tuple(order_range)
         
-        # Build query
-        date_filter = f"AND o.order_date > '{last_date}'" if last_date else ""
+        # Get dimension key lookups before the source result set is opened
+        dim_lookups = self.get_dimension_lookups()
         
+        # Unbuffered cursor: rows stay on the server until fetched, so only
+        # one batch is held in memory at a time
+        extract_started = time.perf_counter()
         source_cursor.execute(f"""
             SELECT 
                 o.order_id, oi.order_item_id, o.order_date, o.order_status,
@@ -410,79 +659,302 @@ class ETLPipeline:
                 oi.product_id, oi.quantity, oi.unit_price, oi.discount_percent, oi.line_total,
                 o.customer_id,
                 o.shipping_country, o.shipping_state, o.shipping_city, o.shipping_postal_code,
-                p.cost_price, p.supplier_id
+                p.cost_price, p.supplier_id, o.updated_at
             FROM orders o
             INNER JOIN order_items oi ON o.order_id = oi.order_id
             INNER JOIN products p ON oi.product_id = p.product_id
-            WHERE 1=1 {date_filter}
-            ORDER BY o.order_date
-        """)
-        
-        sales = source_cursor.fetchall()
+            WHERE 1=1 {change_filter}
+            ORDER BY o.updated_at, oi.order_item_id
+        """, params)
+        self.metrics.add_phase_time('extract', time.perf_counter() - extract_started)
         
-        # Get dimension key mappings
-        dim_maps = self.get_dimension_mappings()
-        
-        insert_query = """
-        INSERT INTO fact_sales (
+        # Upsert on uk_order_line so changed orders replace their fact rows
+        # (in a staging table this also deduplicates repeated order lines)
+        insert_query = f"""
+        INSERT INTO {write_table} (
             date_key, customer_key, product_key, supplier_key, location_key,
             order_id, order_item_id, quantity, unit_price, discount_amount, discount_percent,
             line_total, cost_amount, profit_amount, profit_margin_percent,
             tax_amount, shipping_cost, order_total, order_status, payment_status,
             payment_method, order_date
         ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            date_key = VALUES(date_key),
+            customer_key = VALUES(customer_key),
+            product_key = VALUES(product_key),
+            supplier_key = VALUES(supplier_key),
+            location_key = VALUES(location_key),
+            quantity = VALUES(quantity),
+            unit_price = VALUES(unit_price),
+            discount_amount = VALUES(discount_amount),
+            discount_percent = VALUES(discount_percent),
+            line_total = VALUES(line_total),
+            cost_amount = VALUES(cost_amount),
+            profit_amount = VALUES(profit_amount),
+            profit_margin_percent = VALUES(profit_margin_percent),
+            tax_amount = VALUES(tax_amount),
+            shipping_cost = VALUES(shipping_cost),
+            order_total = VALUES(order_total),
+            order_status = VALUES(order_status),
+            payment_status = VALUES(payment_status),
+            payment_method = VALUES(payment_method),
+            order_date = VALUES(order_date)
         """
         
-        records = []
-        for sale in sales:
-            order_date = sale['order_date']
-            date_key = int(order_date.strftime('%Y%m%d'))
-            
-            # Get dimension keys
-            customer_key = dim_maps['customer'].get(sale['customer_id'])
-            product_key = dim_maps['product'].get(sale['product_id'])
-            supplier_key = dim_maps['supplier'].get(sale['supplier_id'])
-            
-            # Get location key
-            location_key = self.get_location_key(
-                sale['shipping_country'],
-                sale['shipping_state'],
-                sale['shipping_city'],
-                sale['shipping_postal_code']
-            )
+        total_loaded = 0
+        batch_count = 0
+        last_mark = None
+        load_seconds = 0.0
+        started = time.perf_counter()
+        column_names = source_cursor.column_names
+        updated_at_idx = column_names.index('updated_at')
+        order_item_idx = column_names.index('order_item_id')
+        with self.connections.bulk_load_session(self.target_conn):
+            for batch in self.iter_batches(source_cursor, self.bulk_batch_size):
+                with self.metrics.phase('transform'):
+                    records = self.transform_sales_batch(batch, column_names, dim_lookups)
+                
+                load_started = time.perf_counter()
+                self.write_fact_batch(target_cursor, 'fact_sales', insert_query, records, write_table)
+                
+                # Advance the watermark in the same transaction as the batch
+                # (staged loads advance it with the merge instead)
+                last_row = batch[-1]
+                last_mark = (last_row[updated_at_idx], last_row[order_item_idx])
+                if not staged:
+                    self.save_sales_progress(target_cursor, last_mark, batch_count + 1,
+                                             total_loaded + len(records), track_watermark, checkpoint_step)
+                self.target_conn.commit()
+                batch_load_seconds = time.perf_counter() - load_started
+                load_seconds += batch_load_seconds
+                self.metrics.add_phase_time('load', batch_load_seconds)
+                self.metrics.add_rows(written=len(records))
+                
+                total_loaded += len(records)
+                batch_count += 1
+                logger.debug(f"Committed sales batch {batch_count} ({total_loaded} rows so far)")
             
-            # Calculate measures
-            cost_amount = sale['quantity'] * sale['cost_price']
-            discount_amount = sale['line_total'] * (sale['discount_percent'] / 100)
-            profit_amount = sale['line_total'] - cost_amount
-            profit_margin_percent = (profit_amount / sale['line_total'] * 100) if sale['line_total'] > 0 else 0
-            
-            records.append((
-                date_key, customer_key, product_key, supplier_key, location_key,
-                sale['order_id'], sale['order_item_id'], sale['quantity'],
-                sale['unit_price'], discount_amount, sale['discount_percent'],
-                sale['line_total'], cost_amount, profit_amount, profit_margin_percent,
-                sale['tax_amount'], sale['shipping_cost'], sale['total_amount'],
-                sale['order_status'], sale['payment_status'], sale['payment_method'],
-                order_date
-            ))
-        
-        target_cursor.executemany(insert_query, records)
-        self.target_conn.commit()
-        logger.info(f"Loaded {len(records)} sales records into Fact_Sales")
+            if staged and last_mark:
+                # One set-based upsert makes the whole load visible at once
+                load_started = time.perf_counter()
+                self.merge_staged_fact(target_cursor, 'fact_sales', write_table, into_table)
+                self.save_sales_progress(target_cursor, last_mark, batch_count, total_loaded,
+                                         track_watermark, checkpoint_step)
+                self.target_conn.commit()
+                merge_seconds = time.perf_counter() - load_started
+                load_seconds += merge_seconds
+                self.metrics.add_phase_time('load', merge_seconds)
+                logger.info(f"Merged {total_loaded} staged sales records into {into_table}")
+        
+        label = f"Fact_Sales orders {order_range[0]}-{order_range[1]}" if order_range else "Fact_Sales"
+        logger.info(f"Loaded {total_loaded} sales records into {label} in {batch_count} batches")
+        self.log_throughput(label, total_loaded, time.perf_counter() - started, load_seconds)
         
         source_cursor.close()
         target_cursor.close()
+        return {'rows': total_loaded, 'batches': batch_count, 'watermark': last_mark}
+    
+    def get_sales_cutoff(self) -> datetime:
+        """Newest orders.updated_at a sales load may read, sales_lag_seconds before the source's clock
+        
+        updated_at has one-second resolution and is stamped before commit, so an
+        order committed after a batch was read can carry an updated_at at or
+        below the saved watermark; staying sales_lag_seconds behind leaves such
+        orders for the next run instead of skipping them.
+        """
+        cursor = self.source_conn.cursor()
+        cursor.execute("SELECT NOW() - INTERVAL %s SECOND",
+                       (int(self.settings.get('sales_lag_seconds', 5)),))
+        cutoff = cursor.fetchone()[0]
+        cursor.close()
+        return cutoff
+    
+    def save_sales_progress(self, cursor, last_mark: tuple, batches: int, rows: int,
+                            track_watermark: bool, checkpoint_step: Optional[str]):
+        """Record the watermark and run checkpoint of committed sales rows (caller commits)"""
+        if track_watermark:
+            self.save_watermark(cursor, 'fact_sales', *last_mark, rows)
+        if checkpoint_step and self.run_id is not None:
+            # A resumed step continues the counts of its earlier attempts
+            resumed = self.resume_points.get(checkpoint_step) or {}
+            self.checkpoints.save_batch(
+                cursor, self.run_id, checkpoint_step, *last_mark,
+                resumed.get('batches_committed', 0) + batches, resumed.get('rows_committed', 0) + rows
+            )
+    
+    def load_fact_sales_parallel(self, watermark: tuple, into_table: str = 'fact_sales') -> Dict:
+        """Load Sales Fact Table with a process pool, one order_id range per task
+        
+        Every range loads up to the same updated_at cutoff, pinned here before the
+        workers start, and the cutoff is returned as the new watermark; the caller
+        persists it once every range has succeeded. (Per-range marks cannot be
+        combined: a range whose query started earlier can miss rows stamped below
+        another range's later mark.)
+        """
+        # A resumed run reuses the ranges it planned, so range checkpoints still apply
+        resumed_ranges = sorted(
+            parse_partition_step(name) for name in self.resume_points
+            if name.startswith(PARTITION_STEP_PREFIX)
+        )
+        
+        # A resumed run keeps the cutoff its completed ranges were loaded with
+        cutoff_checkpoint = self.resume_points.get(SALES_CUTOFF_STEP)
+        if cutoff_checkpoint and cutoff_checkpoint['position_ts']:
+            cutoff = cutoff_checkpoint['position_ts']
+        else:
+            cutoff = self.get_sales_cutoff()
+            if self.run_id is not None:
+                cursor = self.target_conn.cursor()
+                self.checkpoints.save_batch(cursor, self.run_id, SALES_CUTOFF_STEP, cutoff, 0, 0, 0)
+                self.target_conn.commit()
+                cursor.close()
+        
+        order_ranges = resumed_ranges or self.get_order_id_ranges(self.parallel_workers * 4, watermark, cutoff)
+        if not order_ranges:
+            logger.info("No orders to load into Fact_Sales")
+            return {'rows': 0, 'watermark': (cutoff, 0)}
+        if self.run_id is not None and not resumed_ranges:
+            for order_range in order_ranges:
+                self.checkpoints.register_step(self.run_id, partition_step(order_range))
+        
+        # Completed ranges are skipped; interrupted ranges continue after their last batch
+        pending = []
+        for order_range in order_ranges:
+            checkpoint = self.resume_points.get(partition_step(order_range))
+            position = None
+            if checkpoint and checkpoint['position_ts']:
+                position = (checkpoint['position_ts'], checkpoint['position_id'])
+            if checkpoint and checkpoint['status'] == 'completed':
+                continue
+            pending.append((order_range, position or watermark))
+        
+        logger.info(
+            f"Parallel load: {len(pending)} of {len(order_ranges)} order_id ranges "
+            f"across {self.parallel_workers} workers, up to updated_at {cutoff}"
+        )
+        started = time.perf_counter()
+        
+        # Spawned workers open their own source and target connections
+        results = []
+        with ProcessPoolExecutor(max_workers=self.parallel_workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [
+                executor.submit(load_sales_partition, self.config_path, order_range, range_watermark,
+                                self.run_id, into_table, cutoff)
+                for order_range, range_watermark in pending
+            ]
+            for future in as_completed(futures):
+                results.append(future.result())
+        
+        total_loaded = sum(result['rows'] for result in results)
+        # Worker phases overlap, so only row totals are attributed to this step
+        self.metrics.add_rows(read=sum(result['rows'] for result in results), written=total_loaded)
+        failures = [result for result in results if result['error']]
+        elapsed = time.perf_counter() - started
+        rate = total_loaded / elapsed if elapsed > 0 else 0
+        logger.info(f"Loaded {total_loaded} sales records into Fact_Sales ({rate:,.0f} rows/sec across workers)")
+        
+        if failures:
+            for failure in failures:
+                logger.error(f"Sales partition {failure['range']} failed: {failure['error']}")
+            # Leave the watermark where it was so the next run retries every range
+            raise RuntimeError(f"{len(failures)} of {len(order_ranges)} sales partitions failed")
+        
+        # Rows stamped exactly at the cutoff are upserted again by the next run, which is harmless
+        return {'rows': total_loaded, 'watermark': (cutoff, 0)}
+    
+    def get_order_id_ranges(self, partitions: int, watermark: tuple, cutoff: datetime) -> List[tuple]:
+        """Split the orders to load into contiguous order_id ranges holding equal numbers of them
+        
+        Only orders changed after the watermark and up to the cutoff are counted,
+        so an incremental run, whose changes sit mostly in the newest order_ids,
+        still gives every worker a similar share.
+        """
+        conditions = ["updated_at <= %s"]
+        params = [partitions, cutoff]
+        if watermark[0]:
+            conditions.append("updated_at >= %s")
+            params.append(watermark[0])
+        
+        cursor = self.source_conn.cursor()
+        cursor.execute(f"""
+            SELECT MIN(order_id), MAX(order_id) FROM (
+                SELECT order_id, NTILE(%s) OVER (ORDER BY order_id) AS tile
+                FROM orders
+                WHERE {' AND '.join(conditions)}
+            ) tiles
+            GROUP BY tile
+            ORDER BY tile
+        """, tuple(params))
+        bounds = cursor.fetchall()
+        cursor.close()
+        
+        if not bounds:
+            return []
+        # Each range runs up to the next one's first order, so no order_id falls between ranges
+        ranges = [(first, next_bounds[0] - 1) for (first, _), next_bounds in zip(bounds, bounds[1:])]
+        return ranges + [tuple(bounds[-1])]
+    
+    def transform_sales_batch(self, rows: List[tuple], column_names: List[str], dim_lookups: Dict) -> List[tuple]:
+        """Transform a batch of extracted sales rows into fact_sales records"""
+        columns = transforms.columns_of(rows, column_names)
+        
+        # Create any unseen shipping addresses for the whole batch up front
+        addresses = list(zip(
+            columns['shipping_country'], columns['shipping_state'],
+            columns['shipping_city'], columns['shipping_postal_code']
+        ))
+        resolver = self.get_location_resolver()
+        resolver.ensure(addresses)
+        location_keys = list(map(resolver.get, addresses))
+        
+        return transforms.transform_sales(columns, dim_lookups, location_keys)
+    
+    def extract(self, cursor, query: str, params: tuple = ()) -> List:
+        """Run a source query and fetch all rows, recording them as the step's extract phase"""
+        with self.metrics.phase('extract'):
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        self.metrics.add_rows(read=len(rows))
+        return rows
+    
+    def extract_ids(self, cursor, query: str, id_column: str, ids: List) -> List:
+        """Run a source query for the given ids only, in batch_size chunks"""
+        rows = []
+        for start in range(0, len(ids), self.batch_size):
+            chunk = ids[start:start + self.batch_size]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            rows += self.extract(cursor, f"{query} WHERE {id_column} IN ({placeholders})", tuple(chunk))
+        return rows
+    
+    def iter_batches(self, cursor, batch_size: Optional[int] = None) -> Iterator[List]:
+        """Yield rows from an executed cursor in chunks of batch_size"""
+        batch_size = batch_size or self.batch_size
+        while True:
+            with self.metrics.phase('extract'):
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            self.metrics.add_rows(read=len(rows))
+            yield rows
     
     def load_fact_inventory(self):
         """Load Inventory Fact Table from OLTP"""
         logger.info("Loading Fact_Inventory fact table...")
+        started = time.perf_counter()
         
-        source_cursor = self.source_conn.cursor(dictionary=True)
+        source_cursor = self.source_conn.cursor()
         target_cursor = self.target_conn.cursor()
         
-        # Get current inventory snapshot
-        source_cursor.execute("""
+        today = datetime.now().date()
+        
+        # Stock and product cost changes both alter a product's snapshot row
+        inventory_ids, inventory_position = self.get_changed_ids('inventory')
+        product_ids, product_position = self.get_changed_ids('products')
+        
+        # Get current inventory snapshot; once today's snapshot exists, only
+        # products in the change log need refreshing
+        query = """
             SELECT 
                 i.product_id, i.quantity_on_hand, i.reorder_level, i.reorder_quantity,
                 i.last_restocked_date, i.warehouse_location,
@@ -491,105 +963,586 @@ class ETLPipeline:
             FROM inventory i
             INNER JOIN products p ON i.product_id = p.product_id
             LEFT JOIN categories c ON p.category_id = c.category_id
-        """)
-        
-        inventory = source_cursor.fetchall()
+        """
+        target_cursor.execute("SELECT 1 FROM fact_inventory WHERE date_key = %s LIMIT 1",
+                              (int(today.strftime('%Y%m%d')),))
+        has_snapshot = target_cursor.fetchone() is not None
+        if inventory_ids is None or product_ids is None or not has_snapshot:
+            inventory = self.extract(source_cursor, query)
+        else:
+            inventory = self.extract_ids(source_cursor, query, 'i.product_id',
+                                         sorted(set(inventory_ids) | set(product_ids)))
         
-        dim_maps = self.get_dimension_mappings()
-        today = datetime.now().date()
-        date_key = int(today.strftime('%Y%m%d'))
+        dim_lookups = self.get_dimension_lookups()
         
         insert_query = """
         INSERT INTO fact_inventory (
             date_key, product_key, supplier_key, location_key,
             product_id, quantity_on_hand, reorder_level, reorder_quantity,
             quantity_available, stock_value, is_low_stock, is_out_of_stock,
-            is_overstocked, warehouse_location, last_restocked_date, snapshot_date
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            is_overstocked, warehouse_location, last_restocked_date, snapshot_date,
+            days_of_supply, units_sold_7d, units_sold_30d, units_sold_90d, inventory_turnover
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         ON DUPLICATE KEY UPDATE
             quantity_on_hand = VALUES(quantity_on_hand),
             quantity_available = VALUES(quantity_available),
             stock_value = VALUES(stock_value),
             is_low_stock = VALUES(is_low_stock),
             is_out_of_stock = VALUES(is_out_of_stock),
-            is_overstocked = VALUES(is_overstocked)
+            is_overstocked = VALUES(is_overstocked),
+            days_of_supply = VALUES(days_of_supply),
+            units_sold_7d = VALUES(units_sold_7d),
+            units_sold_30d = VALUES(units_sold_30d),
+            units_sold_90d = VALUES(units_sold_90d),
+            inventory_turnover = VALUES(inventory_turnover)
         """
         
-        records = []
-        for inv in inventory:
-            product_key = dim_maps['product'].get(inv['product_id'])
-            supplier_key = dim_maps['supplier'].get(inv['supplier_id'])
-            location_key = 1  # Default warehouse location key
-            
-            quantity_available = inv['quantity_on_hand']  # Can subtract reserved quantity
-            stock_value = inv['quantity_on_hand'] * inv['cost_price']
-            is_low_stock = inv['quantity_on_hand'] <= inv['reorder_level']
-            is_out_of_stock = inv['quantity_on_hand'] == 0
-            is_overstocked = inv['quantity_on_hand'] > (inv['reorder_level'] * 3)
-            
-            records.append((
-                date_key, product_key, supplier_key, location_key,
-                inv['product_id'], inv['quantity_on_hand'], inv['reorder_level'],
-                inv['reorder_quantity'], quantity_available, stock_value,
-                is_low_stock, is_out_of_stock, is_overstocked,
-                inv['warehouse_location'], inv['last_restocked_date'], today
-            ))
-        
-        target_cursor.executemany(insert_query, records)
-        self.target_conn.commit()
+        columns = transforms.columns_of(inventory, source_cursor.column_names)
+        with self.metrics.phase('extract'):
+            columns.update(self.get_units_sold(columns['product_id'], today))
+        
+        with self.metrics.phase('transform'):
+            records = transforms.transform_inventory(columns, dim_lookups, today, self.velocity_window)
+        
+        loaded = records
+        if self.snapshot_mode == 'delta':
+            with self.metrics.phase('extract'):
+                # Catch up on rows written while the pipeline ran in full mode
+                self.refresh_inventory_current(target_cursor, int(today.strftime('%Y%m%d')))
+                self.target_conn.commit()
+                latest = self.get_latest_positions()
+            with self.metrics.phase('transform'):
+                unchanged = len(records)
+                records = self.filter_changed_positions(records, latest)
+                unchanged -= len(records)
+            logger.info(f"Delta snapshot: {len(records)} changed positions, {unchanged} unchanged skipped")
+        
+        load_started = time.perf_counter()
+        with self.connections.bulk_load_session(self.target_conn):
+            self.write_fact_batch(target_cursor, 'fact_inventory', insert_query, records)
+            if self.snapshot_mode == 'delta':
+                self.refresh_inventory_current(target_cursor, int(today.strftime('%Y%m%d')))
+                self.refresh_inventory_velocity(target_cursor, loaded)
+            self.target_conn.commit()
+        load_seconds = time.perf_counter() - load_started
+        self.metrics.add_phase_time('load', load_seconds)
+        self.metrics.add_rows(written=len(records))
+        self.save_change_position('inventory', inventory_position, len(records))
+        self.save_change_position('products', product_position, len(records))
         logger.info(f"Loaded {len(records)} inventory records into Fact_Inventory")
+        self.log_throughput('Fact_Inventory', len(records), time.perf_counter() - started, load_seconds)
         
         source_cursor.close()
         target_cursor.close()
     
-    def get_dimension_mappings(self) -> Dict:
-        """Get dimension key mappings for lookups"""
+    def refresh_inventory_current(self, cursor, today_key: int):
+        """Copy fact_inventory rows written since the last refresh into fact_inventory_current (caller commits)
+        
+        Rows are applied in date_key order, so each product ends up with its
+        newest row. The first refresh copies the whole history once.
+        """
+        _, from_date_key = self.get_watermark('fact_inventory_current')
+        columns = ', '.join(INVENTORY_CURRENT_COLUMNS)
+        updates = ',\n                '.join(f"{column} = VALUES({column})"
+                                           for column in INVENTORY_CURRENT_COLUMNS if column != 'product_id')
+        cursor.execute(f"""
+            INSERT INTO fact_inventory_current ({columns})
+            SELECT {columns} FROM fact_inventory
+            WHERE date_key >= %s
+            ORDER BY date_key
+            ON DUPLICATE KEY UPDATE
+                {updates}
+        """, (from_date_key,))
+        rows = cursor.rowcount
+        self.save_watermark(cursor, 'fact_inventory_current', datetime.now(), today_key, rows)
+        logger.info(f"Refreshed fact_inventory_current from date_key {from_date_key} ({rows} rows affected)")
+    
+    def refresh_inventory_velocity(self, cursor, records: List[tuple]):
+        """Write the sales velocity of every loaded product onto fact_inventory_current (caller commits)
+        
+        Delta snapshots skip products whose stock position is unchanged, so
+        their latest fact_inventory row keeps the velocity of the day it was
+        written; fact_inventory_current always carries today's figures.
+        """
+        if not records:
+            return
+        columns = FACT_COLUMNS['fact_inventory'][0]
+        positions = [columns.index(column) for column in ['product_id', *INVENTORY_VELOCITY_COLUMNS]]
+        rows = [tuple(record[position] for position in positions) for record in records]
+        
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS inventory_velocity")
+        cursor.execute("""
+            CREATE TEMPORARY TABLE inventory_velocity (
+                product_id INT PRIMARY KEY,
+                days_of_supply INT,
+                units_sold_7d INT,
+                units_sold_30d INT,
+                units_sold_90d INT,
+                inventory_turnover DECIMAL(10, 2)
+            )
+        """)
+        insert_query = f"""
+            INSERT INTO inventory_velocity (product_id, {', '.join(INVENTORY_VELOCITY_COLUMNS)})
+            VALUES ({', '.join(['%s'] * len(positions))})
+        """
+        for start_idx in range(0, len(rows), self.batch_size):
+            cursor.executemany(insert_query, rows[start_idx:start_idx + self.batch_size])
+        updates = ',\n                '.join(f"fic.{column} = v.{column}" for column in INVENTORY_VELOCITY_COLUMNS)
+        cursor.execute(f"""
+            UPDATE fact_inventory_current fic
+            INNER JOIN inventory_velocity v ON fic.product_id = v.product_id
+            SET {updates}
+        """)
+        logger.info(f"Refreshed sales velocity of {cursor.rowcount} products in fact_inventory_current")
+        cursor.execute("DROP TEMPORARY TABLE inventory_velocity")
+    
+    def get_latest_positions(self) -> pd.DataFrame:
+        """Get the stock position of each product's latest row from fact_inventory_current, indexed by product_id"""
         cursor = self.target_conn.cursor()
-        mappings = {}
+        cursor.execute(f"""
+            SELECT product_id, {', '.join(SNAPSHOT_POSITION_COLUMNS)}
+            FROM fact_inventory_current
+        """)
+        latest = pd.DataFrame(cursor.fetchall(), columns=['product_id', *SNAPSHOT_POSITION_COLUMNS])
+        cursor.close()
+        return latest.set_index('product_id')
+    
+    def filter_changed_positions(self, records: List[tuple], latest: pd.DataFrame) -> List[tuple]:
+        """Keep inventory records of new products and of products whose stock position changed
         
-        # Customer mapping
-        cursor.execute("SELECT customer_key, customer_id FROM dim_customer WHERE is_current = TRUE")
-        mappings['customer'] = {row[1]: row[0] for row in cursor.fetchall()}
+        Re-running on the same day compares against that day's own rows, so
+        only positions that moved since the earlier run are rewritten.
+        """
+        if not records:
+            return records
+        columns = FACT_COLUMNS['fact_inventory'][0]
+        current = pd.DataFrame.from_records(records, columns=columns).set_index('product_id')
+        current = current[SNAPSHOT_POSITION_COLUMNS]
+        latest = latest.reindex(current.index)
         
-        # Product mapping
-        cursor.execute("SELECT product_key, product_id FROM dim_product WHERE is_current = TRUE")
-        mappings['product'] = {row[1]: row[0] for row in cursor.fetchall()}
+        changed = latest['product_key'].isna().to_numpy().copy()
+        for column in SNAPSHOT_POSITION_COLUMNS:
+            new_values, old_values = current[column], latest[column]
+            if column in SNAPSHOT_DECIMAL_COLUMNS:
+                # DECIMAL from the warehouse vs float from the transform: compare in hundredths
+                new_values = (new_values.astype(float) * 100).round()
+                old_values = (old_values.astype(float) * 100).round()
+            differs = (new_values != old_values) & ~(new_values.isna() & old_values.isna())
+            changed |= differs.to_numpy()
+        return [record for record, keep in zip(records, changed) if keep]
+    
+    def get_units_sold(self, product_ids: tuple, today: date) -> Dict[str, tuple]:
+        """Sum units sold per product over every trailing sales window in one grouped pass
         
-        # Supplier mapping
-        cursor.execute("SELECT supplier_key, supplier_id FROM dim_supplier WHERE is_current = TRUE")
-        mappings['supplier'] = {row[1]: row[0] for row in cursor.fetchall()}
+        Returns units_sold_<n>d columns aligned with product_ids (0 without sales).
+        """
+        window_starts = [today - timedelta(days=window) for window in transforms.SALES_WINDOWS]
+        window_sums = ', '.join(
+            f"SUM(CASE WHEN fs.order_date >= %s THEN fs.quantity ELSE 0 END) AS units_sold_{window}d"
+            for window in transforms.SALES_WINDOWS
+        )
         
+        # Sales of every SCD version of a product count towards it
+        cursor = self.target_conn.cursor()
+        cursor.execute(f"""
+            SELECT dp.product_id, {window_sums}
+            FROM fact_sales fs
+            INNER JOIN dim_product dp ON fs.product_key = dp.product_key
+            WHERE fs.order_date >= %s
+            GROUP BY dp.product_id
+        """, (*window_starts, min(window_starts)))
+        names = [f'units_sold_{window}d' for window in transforms.SALES_WINDOWS]
+        units_sold = pd.DataFrame(cursor.fetchall(), columns=['product_id', *names]).set_index('product_id')
         cursor.close()
-        return mappings
+        
+        aligned = units_sold.reindex(list(product_ids), fill_value=0)
+        return {name: tuple(aligned[name].astype(np.int64).tolist()) for name in names}
     
-    def get_location_key(self, country: str, state: str, city: str, postal_code: str) -> int:
-        """Get location key or create if not exists"""
-        cursor = self.target_conn.cursor()
+    def load_fact_inventory_transactions(self, incremental: bool = True):
+        """Load Inventory Transactions Fact Table from OLTP, streaming by transaction_id"""
+        logger.info("Loading Fact_Inventory_Transactions fact table...")
+        started = time.perf_counter()
         
+        watermark_id = 0
+        if incremental:
+            _, watermark_id = self.get_watermark('fact_inventory_transactions')
+            if watermark_id:
+                logger.info(f"Incremental load: Loading inventory transactions after {watermark_id}")
+        
+        # Stop short of the newest movements: a lower transaction_id may still
+        # be uncommitted, and must not fall behind the watermark
+        cursor = self.source_conn.cursor()
         cursor.execute("""
-            SELECT location_key FROM dim_location
-            WHERE country = %s AND state = %s AND city = %s AND postal_code = %s
-            LIMIT 1
-        """, (country, state, city, postal_code))
+            SELECT COALESCE(MAX(transaction_id), 0) FROM inventory_transactions
+            WHERE transaction_date <= NOW() - INTERVAL %s SECOND
+        """, (int(self.settings.get('stream_lag_seconds', 5)),))
+        upper_id = cursor.fetchone()[0]
+        cursor.close()
+        
+        # Get dimension key lookups before the source result set is opened
+        dim_lookups = self.get_dimension_lookups()
+        
+        source_cursor = self.source_conn.cursor(buffered=False)
+        target_cursor = self.target_conn.cursor()
+        
+        extract_started = time.perf_counter()
+        source_cursor.execute("""
+            SELECT 
+                t.transaction_id, t.product_id, t.transaction_type, t.quantity_change,
+                t.quantity_after, t.reference_order_id, t.notes, t.transaction_date,
+                p.supplier_id, p.cost_price
+            FROM inventory_transactions t
+            INNER JOIN products p ON t.product_id = p.product_id
+            WHERE t.transaction_id > %s AND t.transaction_id <= %s
+            ORDER BY t.transaction_id
+        """, (watermark_id, upper_id))
+        self.metrics.add_phase_time('extract', time.perf_counter() - extract_started)
+        
+        # Upsert on uk_transaction so reloads replace their fact rows
+        insert_query = """
+        INSERT INTO fact_inventory_transactions (
+            date_key, product_key, supplier_key, location_key,
+            transaction_id, reference_order_id, quantity_change, quantity_before,
+            quantity_after, transaction_value, transaction_type, notes, transaction_date
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            date_key = VALUES(date_key),
+            product_key = VALUES(product_key),
+            supplier_key = VALUES(supplier_key),
+            location_key = VALUES(location_key),
+            reference_order_id = VALUES(reference_order_id),
+            quantity_change = VALUES(quantity_change),
+            quantity_before = VALUES(quantity_before),
+            quantity_after = VALUES(quantity_after),
+            transaction_value = VALUES(transaction_value),
+            transaction_type = VALUES(transaction_type),
+            notes = VALUES(notes),
+            transaction_date = VALUES(transaction_date)
+        """
+        
+        total_loaded = 0
+        batch_count = 0
+        load_seconds = 0.0
+        column_names = source_cursor.column_names
+        transaction_idx = column_names.index('transaction_id')
+        with self.connections.bulk_load_session(self.target_conn):
+            for batch in self.iter_batches(source_cursor, self.bulk_batch_size):
+                with self.metrics.phase('transform'):
+                    columns = transforms.columns_of(batch, column_names)
+                    records = transforms.transform_inventory_transactions(columns, dim_lookups)
+                
+                load_started = time.perf_counter()
+                self.write_fact_batch(target_cursor, 'fact_inventory_transactions', insert_query, records)
+                # Advance the watermark in the same transaction as the batch
+                self.save_watermark(target_cursor, 'fact_inventory_transactions', None,
+                                    batch[-1][transaction_idx], total_loaded + len(records))
+                self.target_conn.commit()
+                batch_load_seconds = time.perf_counter() - load_started
+                load_seconds += batch_load_seconds
+                self.metrics.add_phase_time('load', batch_load_seconds)
+                self.metrics.add_rows(written=len(records))
+                
+                total_loaded += len(records)
+                batch_count += 1
+        
+        logger.info(
+            f"Loaded {total_loaded} inventory transactions into Fact_Inventory_Transactions "
+            f"in {batch_count} batches"
+        )
+        self.log_throughput('Fact_Inventory_Transactions', total_loaded, time.perf_counter() - started, load_seconds)
+        
+        source_cursor.close()
+        target_cursor.close()
+    
+    def write_fact_batch(self, cursor, fact_table: str, insert_query: str, records: List[tuple],
+                         into_table: Optional[str] = None):
+        """Write a transformed fact batch with the configured load engine
+        
+        into_table defaults to fact_table; it may be a staging or rebuild table of the same shape.
+        """
+        if self.load_engine == 'load_data':
+            self.bulk_load_fact(cursor, fact_table, records, into_table)
+        else:
+            cursor.executemany(insert_query, records)
+    
+    def bulk_load_fact(self, cursor, fact_table: str, records: List[tuple], into_table: Optional[str] = None):
+        """Stage records with LOAD DATA LOCAL INFILE and move them with one INSERT ... SELECT"""
+        if self.bulk_loader is None:
+            self.bulk_loader = BulkLoader(self.target_conn, self.settings.get('staging_dir'))
+        
+        columns, _ = FACT_COLUMNS[fact_table]
+        staging_table = f"stg_{fact_table}"
+        self.bulk_loader.load(cursor, staging_table, fact_table, columns, records)
+        self.merge_staged_fact(cursor, fact_table, staging_table, into_table or fact_table)
+    
+    def merge_staged_fact(self, cursor, fact_table: str, staging_table: str, into_table: str):
+        """Upsert every row of a staging table into a fact table with one INSERT ... SELECT"""
+        columns, update_columns = FACT_COLUMNS[fact_table]
+        column_list = ', '.join(columns)
+        updates = ', '.join(f"{col} = VALUES({col})" for col in update_columns)
+        cursor.execute(f"""
+            INSERT INTO {into_table} ({column_list})
+            SELECT {column_list} FROM {staging_table}
+            ON DUPLICATE KEY UPDATE {updates}
+        """)
+    
+    def prepare_staging_table(self, cursor, staging_table: str, fact_table: str):
+        """Create or empty a session temporary table shaped like a fact table, unique keys included"""
+        cursor.execute(f"CREATE TEMPORARY TABLE IF NOT EXISTS {staging_table} LIKE {fact_table}")
+        cursor.execute(f"DELETE FROM {staging_table}")
+    
+    def prepare_rebuild_table(self, fact_table: str) -> str:
+        """Create an empty copy of a fact table to rebuild it in, and return its name
+        
+        A resumed run keeps the partly built table its checkpoints refer to.
+        """
+        rebuild_table = f"{fact_table}_rebuild"
+        if any(checkpoint['position_ts'] for checkpoint in self.resume_points.values()):
+            logger.info(f"Resuming rebuild of {fact_table} in {rebuild_table}")
+            return rebuild_table
+        
+        cursor = self.target_conn.cursor()
+        cursor.execute(f"SHOW CREATE TABLE {fact_table}")
+        ddl = cursor.fetchone()[1]
+        # CREATE TABLE ... LIKE drops foreign keys, so copy the full definition;
+        # constraint names are left for MySQL to generate, since they must be unique
+        ddl = ddl.replace(f"CREATE TABLE `{fact_table}`", f"CREATE TABLE `{rebuild_table}`", 1)
+        ddl = re.sub(r"CONSTRAINT `[^`]+` FOREIGN KEY", "FOREIGN KEY", ddl)
+        cursor.execute(f"DROP TABLE IF EXISTS {rebuild_table}")
+        cursor.execute(ddl)
+        cursor.close()
+        logger.info(f"Rebuilding {fact_table} in {rebuild_table}")
+        return rebuild_table
+    
+    def swap_rebuilt_table(self, fact_table: str, rebuild_table: str):
+        """Atomically replace a fact table with its rebuilt copy"""
+        old_table = f"{fact_table}_old"
+        cursor = self.target_conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {old_table}")
+        # One RENAME TABLE statement: readers see either the old or the new table
+        cursor.execute(f"RENAME TABLE {fact_table} TO {old_table}, {rebuild_table} TO {fact_table}")
+        cursor.execute(f"DROP TABLE {old_table}")
+        cursor.close()
+        logger.info(f"Swapped rebuilt {rebuild_table} into {fact_table}")
+    
+    def refresh_sales_aggregates(self, rebuild: bool = False):
+        """Bring the fact_sales aggregate tables up to date
+        
+        Only days with fact_sales rows changed since the last refresh are
+        recomputed; the first refresh, or rebuild, recomputes everything.
+        """
+        logger.info("Refreshing sales aggregates...")
+        changed_since, _ = self.get_watermark('sales_aggregates')
+        
+        # Rows committed from here on are picked up by the next refresh
+        cursor = self.target_conn.cursor()
+        cursor.execute("SELECT NOW()")
+        refreshed_at = cursor.fetchone()[0]
+        
+        aggregates = SalesAggregates(self.target_conn)
+        with self.metrics.phase('load'):
+            if rebuild or changed_since is None:
+                written = aggregates.rebuild()
+            else:
+                written = aggregates.refresh(changed_since)
+        rows = sum(written.values())
+        self.metrics.add_rows(written=rows)
+        
+        self.save_watermark(cursor, 'sales_aggregates', refreshed_at, 0, rows)
+        self.target_conn.commit()
+        cursor.close()
+    
+    def export_parquet(self):
+        """Export the star schema to Parquet, rewriting only fact partitions touched since the last export
+        
+        fact_sales partitions are found from rows updated since the last export;
+        fact_inventory snapshots are only ever written for the load date, so its
+        partitions are those from the last exported date_key on. Partitions of
+        months left without rows are removed, and months whose row count no
+        longer matches their partition are rewritten.
+        """
+        export_settings = self.config.get('parquet_export', {})
+        logger.info("Exporting star schema to Parquet...")
+        exporter = ParquetExporter(
+            self.target_conn,
+            export_settings.get('output_dir', '../exports/parquet'),
+            export_settings.get('compression', 'zstd'),
+            int(export_settings.get('row_group_size', 131072))
+        )
         
+        sales_since, _ = self.get_watermark('parquet_fact_sales')
+        _, inventory_from = self.get_watermark('parquet_fact_inventory')
+        cursor = self.target_conn.cursor()
+        cursor.execute("SELECT NOW(), (SELECT COALESCE(MAX(date_key), 0) FROM fact_inventory)")
+        exported_at, inventory_to = cursor.fetchone()
+        
+        rows = 0
+        with self.metrics.phase('load'):
+            for table in DIMENSION_TABLES:
+                rows += exporter.export_dimension(table)
+            sales_months = sorted(set(exporter.changed_months('fact_sales', sales_since))
+                                  | set(exporter.reconcile_months('fact_sales')))
+            for month_key in sales_months:
+                rows += exporter.export_fact_month('fact_sales', month_key)
+            inventory_months = sorted(set(exporter.months_from('fact_inventory', inventory_from))
+                                      | set(exporter.reconcile_months('fact_inventory')))
+            for month_key in inventory_months:
+                rows += exporter.export_fact_month('fact_inventory', month_key)
+        self.metrics.add_rows(written=rows)
+        
+        self.save_watermark(cursor, 'parquet_fact_sales', exported_at, 0, rows)
+        self.save_watermark(cursor, 'parquet_fact_inventory', exported_at, inventory_to, rows)
+        self.target_conn.commit()
+        cursor.close()
+        logger.info(f"Exported {len(sales_months)} fact_sales and {len(inventory_months)} "
+                    f"fact_inventory partitions to Parquet")
+    
+    def log_throughput(self, table_name: str, rows: int, elapsed: float, load_seconds: float):
+        """Log rows per second for a fact load so the load engines can be compared"""
+        overall_rate = rows / elapsed if elapsed > 0 else 0
+        load_rate = rows / load_seconds if load_seconds > 0 else 0
+        logger.info(
+            f"{table_name} throughput ({self.load_engine}): {overall_rate:,.0f} rows/sec overall, "
+            f"{load_rate:,.0f} rows/sec in load ({load_seconds:.2f}s of {elapsed:.2f}s)"
+        )
+    
+    def get_dimension_lookups(self) -> Dict[str, DimensionKeyCache]:
+        """Get the per-run dimension key caches, refreshed with keys created since last use"""
+        if self.key_caches is None:
+            cache_dir = self.settings.get('key_cache_dir')
+            self.key_caches = {
+                name: DimensionKeyCache(self.target_conn, table, key_column, id_column, cache_dir)
+                for name, (table, key_column, id_column) in DIMENSION_KEYS.items()
+            }
+        for cache in self.key_caches.values():
+            cache.refresh()
+        return self.key_caches
+    
+    def get_watermark(self, source_name: str) -> tuple:
+        """Get the persisted (watermark_ts, watermark_id) for a source"""
+        cursor = self.target_conn.cursor()
+        cursor.execute("""
+            SELECT watermark_ts, watermark_id FROM etl_state
+            WHERE source_name = %s
+        """, (source_name,))
         result = cursor.fetchone()
+        cursor.close()
+        
         if result:
-            return result[0]
+            return result[0], result[1]
+        return None, 0
+    
+    def save_watermark(self, cursor, source_name: str, watermark_ts, watermark_id: int, rows_processed: int):
+        """Record a source's high-water mark (committed by the caller with its batch)"""
+        cursor.execute("""
+            INSERT INTO etl_state (source_name, watermark_ts, watermark_id, rows_processed, last_run_at)
+            VALUES (%s, %s, %s, %s, NOW())
+            ON DUPLICATE KEY UPDATE
+                watermark_ts = VALUES(watermark_ts),
+                watermark_id = VALUES(watermark_id),
+                rows_processed = VALUES(rows_processed),
+                last_run_at = VALUES(last_run_at)
+        """, (source_name, watermark_ts, watermark_id, rows_processed))
+    
+    def get_change_log(self) -> Optional[ChangeLogReader]:
+        """Get the source change log reader, or None when change capture is off or not installed"""
+        if not self.change_capture:
+            return None
+        if self.change_log is None:
+            change_log = ChangeLogReader(self.source_conn, int(self.settings.get('change_log_lag_seconds', 5)))
+            if not change_log.is_installed():
+                logger.warning("change_capture is enabled but etl_change_log is not installed; using full scans")
+                self.change_capture = False
+                return None
+            self.change_log = change_log
+        return self.change_log
+    
+    def get_changed_ids(self, source_table: str) -> Tuple[Optional[List[int]], int]:
+        """Get the ids of source rows changed since the last consumed change log position
         
-        # Create new location
-        region_map = {'CA': 'West', 'NY': 'East', 'TX': 'South', 'IL': 'Central'}
-        region = region_map.get(state, 'Other')
+        Returns (row_ids, new_position). row_ids is None when the table must be
+        scanned in full: change capture is off, or the table has no position yet.
+        """
+        change_log = self.get_change_log()
+        if change_log is None:
+            return None, 0
         
-        cursor.execute("""
-            INSERT INTO dim_location (country, state, city, postal_code, location_type, region)
-            VALUES (%s, %s, %s, %s, 'Shipping', %s)
-        """, (country, state, city, postal_code, region))
+        position_ts, position = self.get_watermark(f"changelog:{source_table}")
+        if position_ts is None:
+            # Taken before the full scan, so changes made during it are replayed
+            return None, change_log.latest_id()
         
+        row_ids, new_position = change_log.get_changes(source_table, position)
+        logger.info(f"Change log: {len(row_ids)} changed {source_table} rows")
+        return row_ids, new_position
+    
+    def save_change_position(self, source_table: str, position: int, rows_processed: int):
+        """Record a consumed change log position, then trim the consumed changes"""
+        if self.get_change_log() is None:
+            return
+        cursor = self.target_conn.cursor()
+        self.save_watermark(cursor, f"changelog:{source_table}", datetime.now(), position, rows_processed)
         self.target_conn.commit()
-        return cursor.lastrowid
+        cursor.close()
+        self.change_log.trim(source_table, position)
+    
+    def get_location_resolver(self) -> LocationResolver:
+        """Get the per-run location resolver, loading dim_location on first use"""
+        if self.location_resolver is None:
+            self.location_resolver = LocationResolver(self.target_conn)
+            self.location_resolver.load()
+        return self.location_resolver
+    
+    def run_step(self, step, *args, **kwargs):
+        """Run one pipeline step under its own metrics and checkpoint its completion"""
+        name = step.__name__
+        checkpoint = self.resume_points.get(name)
+        if checkpoint and checkpoint['status'] == 'completed':
+            logger.info(f"Skipping {name}: already completed in run {self.run_id}")
+            return None
+        
+        with self.metrics.step(name, (self.source_conn, self.target_conn)):
+            result = step(*args, **kwargs)
+        if self.run_id is not None:
+            self.checkpoints.complete_step(self.run_id, name)
+        return result
     
-    def run_full_etl(self):
-        """Execute full ETL process"""
+    def write_metrics(self):
+        """Write the run's step metrics to the configured JSON report and Prometheus file"""
+        if not self.metrics.steps:
+            return
+        metrics_config = self.config.get('metrics', {})
+        try:
+            report_dir = metrics_config.get('report_dir')
+            if report_dir:
+                self.metrics.write_json(f"{report_dir}/etl_run_{self.metrics.run_id}.json")
+            prometheus_file = metrics_config.get('prometheus_textfile')
+            if prometheus_file:
+                self.metrics.write_prometheus(prometheus_file)
+        except OSError as e:
+            # Never fail (or mask the failure of) a run because of its report
+            logger.error(f"Could not write ETL metrics: {e}")
+    
+    def record_failed_run(self, error: Exception):
+        """Mark the current run as failed so it can be resumed"""
+        if self.run_id is None:
+            return
+        try:
+            # Discard the uncommitted batch; committed batches stay checkpointed
+            self.target_conn.rollback()
+            self.checkpoints.finish_run(self.run_id, 'failed', str(error))
+            logger.info(f"Run {self.run_id} can be resumed with --resume")
+        except Error as db_error:
+            # The run stays 'running', which --resume also treats as unfinished
+            logger.error(f"Could not record failure of run {self.run_id}: {db_error}")
+    
+    def run_full_etl(self, resume: bool = False, rebuild_aggregates: bool = False):
+        """Execute full ETL process
+        
+        With resume, the most recent failed run is continued: completed steps are
+        skipped and fact loads carry on after their last committed batch.
+        With rebuild_aggregates, the sales aggregates are recomputed in full.
+        """
         try:
             logger.info("=" * 60)
             logger.info("Starting Full ETL Process")
@@ -597,31 +1550,93 @@ class ETLPipeline:
             
             self.connect_databases()
             
+            self.checkpoints = CheckpointStore(self.target_conn)
+            self.run_id, resumed = self.checkpoints.start_run(resume)
+            if resumed:
+                self.resume_points = self.checkpoints.get_checkpoints(self.run_id)
+            
             # Step 1: Populate Date Dimension
-            self.populate_dim_date()
+            self.run_step(self.populate_dim_date)
             
             # Step 2: Load Dimensions
-            self.load_dim_customer()
-            self.load_dim_product()
-            self.load_dim_supplier()
-            self.load_dim_location()
+            self.run_step(self.load_dim_customer)
+            self.run_step(self.load_dim_product)
+            self.run_step(self.load_dim_supplier)
+            self.run_step(self.load_dim_location)
             
             # Step 3: Load Facts
-            self.load_fact_sales(incremental=False)
-            self.load_fact_inventory()
+            self.run_step(self.load_fact_sales, incremental=self.settings.get('incremental_load', True))
+            self.run_step(self.load_fact_inventory)
+            self.run_step(self.load_fact_inventory_transactions,
+                          incremental=self.settings.get('incremental_load', True))
+            
+            # Step 4: Refresh Aggregates
+            self.run_step(self.refresh_sales_aggregates, rebuild=rebuild_aggregates)
             
+            # Step 5: Export to Parquet
+            if self.config.get('parquet_export', {}).get('enabled', False):
+                self.run_step(self.export_parquet)
+            
+            self.checkpoints.finish_run(self.run_id, 'success')
             logger.info("=" * 60)
-            logger.info("ETL Process Completed Successfully")
+            logger.info(f"ETL Process Completed Successfully (run {self.run_id})")
             logger.info("=" * 60)
             
         except Exception as e:
             logger.error(f"ETL Process Failed: {e}", exc_info=True)
+            self.record_failed_run(e)
             raise
         finally:
+            self.write_metrics()
             self.close_connections()
 
 
+def partition_step(order_range: tuple) -> str:
+    """Checkpoint step name of a parallel Fact_Sales order_id range"""
+    return f"{PARTITION_STEP_PREFIX}{order_range[0]}-{order_range[1]}]"
+
+
+def parse_partition_step(step_name: str) -> tuple:
+    """Recover the order_id range from a partition checkpoint step name"""
+    first, last = step_name[len(PARTITION_STEP_PREFIX):-1].split('-')
+    return int(first), int(last)
+
+
+def load_sales_partition(config_path: str, order_range: tuple, watermark: tuple,
+                         run_id: Optional[int] = None, into_table: str = 'fact_sales',
+                         cutoff: Optional[datetime] = None) -> Dict:
+    """Process pool worker: load one order_id range of Fact_Sales on its own connections"""
+    pipeline = ETLPipeline(config_path)
+    try:
+        pipeline.connect_databases()
+        step_name = None
+        if run_id is not None:
+            step_name = partition_step(order_range)
+            pipeline.run_id = run_id
+            pipeline.checkpoints = CheckpointStore(pipeline.target_conn)
+            pipeline.resume_points = pipeline.checkpoints.get_checkpoints(run_id)
+        result = pipeline.load_sales_range(watermark, order_range, track_watermark=False,
+                                           checkpoint_step=step_name, into_table=into_table, cutoff=cutoff)
+        if step_name:
+            pipeline.checkpoints.complete_step(run_id, step_name)
+        result.update(range=order_range, error=None)
+        return result
+    except Exception as e:
+        logger.error(f"Sales partition {order_range} failed: {e}", exc_info=True)
+        return {'range': order_range, 'rows': 0, 'batches': 0, 'watermark': None, 'error': str(e)}
+    finally:
+        pipeline.close_connections()
+
+
 if __name__ == "__main__":
-    pipeline = ETLPipeline()
-    pipeline.run_full_etl()
+    parser = argparse.ArgumentParser(description="E-Commerce ETL pipeline")
+    parser.add_argument('--config', default='etl_config.json', help="ETL configuration file")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue the last failed run from its last committed batch")
+    parser.add_argument('--rebuild-aggregates', action='store_true',
+                        help="Recompute the sales aggregate tables from all of fact_sales")
+    args = parser.parse_args()
+    
+    pipeline = ETLPipeline(args.config)
+    pipeline.run_full_etl(resume=args.resume, rebuild_aggregates=args.rebuild_aggregates)
 
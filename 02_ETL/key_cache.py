@@ -0,0 +1,128 @@
+"""
+Dimension Key Cache for the ETL Pipeline
+Keeps natural key -> surrogate key mappings as sorted int64 arrays, refreshed
+incrementally and optionally persisted as memory-mapped files between runs
+"""
+
+import logging
+import os
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class DimensionKeyCache:
+    """Current surrogate keys of one dimension, looked up by binary search"""
+
+    def __init__(self, conn, table: str, key_column: str, id_column: str,
+                 cache_dir: Optional[str] = None):
+        """Initialize an empty cache for a dimension table"""
+        self.conn = conn
+        self.table = table
+        self.key_column = key_column
+        self.id_column = id_column
+        self.cache_path = os.path.join(cache_dir, f"{table}_keys.npy") if cache_dir else None
+        # Sorted natural ids and the surrogate key of each id's current version
+        self.natural_ids = np.empty(0, dtype=np.int64)
+        self.surrogate_keys = np.empty(0, dtype=np.int64)
+        self.max_key = 0
+        self.loaded = False
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def refresh(self) -> int:
+        """Merge in current versions created since the last seen surrogate key"""
+        if not self.loaded:
+            self.load_file()
+            self.loaded = True
+
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT MAX({self.key_column}) FROM {self.table}")
+        table_max_key = cursor.fetchone()[0] or 0
+        if table_max_key < self.max_key:
+            # The dimension was truncated or reloaded; the cached keys are stale
+            logger.warning(f"{self.table} key cache is ahead of the table, rebuilding")
+            self.natural_ids = np.empty(0, dtype=np.int64)
+            self.surrogate_keys = np.empty(0, dtype=np.int64)
+            self.max_key = 0
+
+        cursor.execute(f"""
+            SELECT {self.id_column}, {self.key_column} FROM {self.table}
+            WHERE is_current = TRUE AND {self.key_column} > %s
+        """, (self.max_key,))
+        rows = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 2)
+        cursor.close()
+
+        if len(rows):
+            self.merge(rows[:, 0], rows[:, 1])
+            self.save_file()
+        logger.info(f"{self.table} key cache: {len(rows)} new keys, {len(self.natural_ids)} cached")
+        return len(rows)
+
+    def merge(self, natural_ids: np.ndarray, surrogate_keys: np.ndarray):
+        """Add mappings, keeping the newest (highest) surrogate key per natural id"""
+        natural_ids = np.concatenate([self.natural_ids, natural_ids])
+        surrogate_keys = np.concatenate([self.surrogate_keys, surrogate_keys])
+
+        # Sort by natural id, then surrogate key; the last entry of each id wins
+        order = np.lexsort((surrogate_keys, natural_ids))
+        natural_ids = natural_ids[order]
+        surrogate_keys = surrogate_keys[order]
+        is_last = np.append(natural_ids[1:] != natural_ids[:-1], True)
+
+        self.natural_ids = natural_ids[is_last]
+        self.surrogate_keys = surrogate_keys[is_last]
+        self.max_key = max(self.max_key, int(surrogate_keys.max()))
+
+    def lookup(self, ids: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+        """Look up surrogate keys for a column of natural ids
+
+        Returns (keys, found); keys are undefined where found is False.
+        """
+        try:
+            natural_ids = np.asarray(ids, dtype=np.int64)
+            valid = np.ones(len(natural_ids), dtype=bool)
+        except (TypeError, ValueError):
+            # NULL natural ids never match
+            values = pd.to_numeric(pd.Series(ids, dtype=object)).to_numpy(dtype=np.float64)
+            valid = ~np.isnan(values)
+            natural_ids = np.where(valid, values, 0).astype(np.int64)
+
+        if not len(self.natural_ids):
+            return np.zeros(len(natural_ids), dtype=np.int64), np.zeros(len(natural_ids), dtype=bool)
+
+        positions = np.searchsorted(self.natural_ids, natural_ids)
+        positions = np.minimum(positions, len(self.natural_ids) - 1)
+        found = valid & (self.natural_ids[positions] == natural_ids)
+        return self.surrogate_keys[positions], found
+
+    def load_file(self):
+        """Start warm from the memory-mapped cache file of a previous run, if any"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            arrays = np.load(self.cache_path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable key cache {self.cache_path}: {e}")
+            return
+        if arrays.ndim != 2 or arrays.shape[0] != 2:
+            logger.warning(f"Ignoring malformed key cache {self.cache_path}")
+            return
+
+        self.natural_ids = arrays[0]
+        self.surrogate_keys = arrays[1]
+        self.max_key = int(self.surrogate_keys.max()) if len(self.surrogate_keys) else 0
+        logger.info(f"Loaded {len(self.natural_ids)} {self.table} keys from {self.cache_path}")
+
+    def save_file(self):
+        """Persist the cache as one (2, n) int64 array for memory-mapped loading"""
+        if not self.cache_path:
+            return
+        # Parallel workers may save concurrently; each writes its own temp file
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, np.stack([self.natural_ids, self.surrogate_keys]))
+        os.replace(tmp_path, self.cache_path)
@@ -0,0 +1,101 @@
+"""
+Location Key Resolver for the ETL Pipeline
+Caches dim_location surrogate keys in memory and creates missing locations in bulk
+"""
+
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Simple region mapping (can be enhanced)
+REGION_MAP = {
+    'CA': 'West', 'OR': 'West', 'WA': 'West',
+    'NY': 'East', 'MA': 'East', 'PA': 'East',
+    'TX': 'South', 'FL': 'South', 'GA': 'South',
+    'IL': 'Central', 'OH': 'Central', 'MI': 'Central'
+}
+
+# (country, state, city, postal_code)
+Address = Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]
+
+# Addresses looked up per statement when reading back created locations
+LOOKUP_BATCH_SIZE = 500
+
+
+class LocationResolver:
+    """In-memory dim_location lookup keyed by (country, state, city, postal_code)"""
+
+    def __init__(self, conn, location_type: str = 'Shipping'):
+        """Initialize resolver against a data warehouse connection"""
+        self.conn = conn
+        self.location_type = location_type
+        self.keys: Dict[Address, int] = {}
+
+    def load(self):
+        """Load all known locations of this type in one query"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT location_key, country, state, city, postal_code
+            FROM dim_location
+            WHERE location_type = %s
+            ORDER BY location_key
+        """, (self.location_type,))
+
+        self.keys = {}
+        self._add_rows(cursor.fetchall())
+        cursor.close()
+        logger.info(f"Location resolver loaded {len(self.keys)} locations")
+
+    def ensure(self, addresses: Iterable[Address]) -> int:
+        """Create any unseen addresses with one bulk insert and cache their keys
+
+        Returns the number of locations actually created (not those another
+        writer had already created).
+        """
+        missing = {address for address in addresses if address not in self.keys}
+        if not missing:
+            return 0
+
+        cursor = self.conn.cursor()
+        records = [
+            (country, state, city, postal_code, self.location_type, REGION_MAP.get(state, 'Other'))
+            for country, state, city, postal_code in missing
+        ]
+        # IGNORE: another worker may have created the same location concurrently
+        cursor.executemany("""
+            INSERT IGNORE INTO dim_location (country, state, city, postal_code, location_type, region)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, records)
+        created = cursor.rowcount
+        self.conn.commit()
+
+        # Read the requested addresses back by their natural columns: an ignored
+        # duplicate may have been committed by another writer under any key
+        missing = sorted(missing, key=repr)
+        for start in range(0, len(missing), LOOKUP_BATCH_SIZE):
+            chunk = missing[start:start + LOOKUP_BATCH_SIZE]
+            matches = ' OR '.join(
+                ['(country <=> %s AND state <=> %s AND city <=> %s AND postal_code <=> %s)'] * len(chunk))
+            cursor.execute(f"""
+                SELECT location_key, country, state, city, postal_code
+                FROM dim_location
+                WHERE location_type = %s AND ({matches})
+                ORDER BY location_key
+            """, (self.location_type, *(value for address in chunk for value in address)))
+            self._add_rows(cursor.fetchall())
+        cursor.close()
+
+        logger.debug(f"Created {created} new locations")
+        return created
+
+    def get(self, address: Address) -> Optional[int]:
+        """Return the cached location key for an address"""
+        return self.keys.get(address)
+
+    def _add_rows(self, rows):
+        """Merge (location_key, country, state, city, postal_code) rows into the cache"""
+        for row in rows:
+            address = tuple(row[1:])
+            # Keep the first key seen for duplicate addresses
+            self.keys.setdefault(address, row[0])
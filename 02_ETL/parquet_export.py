@@ -0,0 +1,188 @@
+"""
+Parquet Export for the ETL Pipeline
+Writes the star schema to Parquet files: dimensions as one file each, facts
+partitioned by year and month of date_key, rewriting only the touched partitions
+"""
+
+import glob
+import logging
+import os
+import re
+import shutil
+from typing import Dict, List, Optional, Tuple
+
+from mysql.connector import FieldType
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+DIMENSION_TABLES = ('dim_date', 'dim_customer', 'dim_product', 'dim_supplier', 'dim_location')
+
+# MySQL column types by Parquet type; anything else is exported as a string
+INTEGER_TYPES = (FieldType.TINY, FieldType.SHORT, FieldType.INT24, FieldType.LONG,
+                 FieldType.LONGLONG, FieldType.YEAR)
+DECIMAL_TYPES = (FieldType.DECIMAL, FieldType.NEWDECIMAL)
+FLOAT_TYPES = (FieldType.FLOAT, FieldType.DOUBLE)
+DATE_TYPES = (FieldType.DATE, FieldType.NEWDATE)
+TIMESTAMP_TYPES = (FieldType.DATETIME, FieldType.TIMESTAMP)
+
+
+# Partition directory names written by partition_path
+PARTITION_PATTERN = re.compile(r'year=(\d+)[\\/]month=(\d+)$')
+
+
+def arrow_type(type_code: int, decimal: Optional[Tuple[int, int]] = None):
+    """Parquet column type of a MySQL column type
+
+    DECIMAL columns keep their exact values as decimal128 with the column's
+    (precision, scale); float64 only when those are unknown.
+    """
+    if type_code in INTEGER_TYPES:
+        return pa.int64()
+    if type_code in DECIMAL_TYPES:
+        return pa.decimal128(*decimal) if decimal else pa.float64()
+    if type_code in FLOAT_TYPES:
+        return pa.float64()
+    if type_code in DATE_TYPES:
+        return pa.date32()
+    if type_code in TIMESTAMP_TYPES:
+        return pa.timestamp('us')
+    return pa.string()
+
+
+def partition_path(output_dir: str, table: str, month_key: int) -> str:
+    """Directory of a fact table's year/month partition (Hive-style, e.g. year=2024/month=01)"""
+    return os.path.join(output_dir, table, f"year={month_key // 100}", f"month={month_key % 100:02d}")
+
+
+class ParquetExporter:
+    """Exports warehouse tables to a directory of Parquet files"""
+
+    def __init__(self, conn, output_dir: str, compression: str = 'zstd', row_group_size: int = 131072):
+        """Initialize exporter against a data warehouse connection"""
+        if pq is None:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+        self.conn = conn
+        self.output_dir = output_dir
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.decimal_columns = {}
+
+    def export_dimension(self, table: str) -> int:
+        """Rewrite a dimension table's file in full (dimensions carry no change timestamp)"""
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT * FROM {table}")
+        rows = self.write(cursor, os.path.join(self.output_dir, table), f"{table}.parquet", table)
+        cursor.close()
+        return rows
+
+    def export_fact_month(self, table: str, month_key: int) -> int:
+        """Rewrite one year/month partition of a fact table from its date_key range"""
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT * FROM {table}
+            WHERE date_key BETWEEN %s AND %s
+        """, (month_key * 100, month_key * 100 + 99))
+        rows = self.write(cursor, partition_path(self.output_dir, table, month_key), 'part-0.parquet', table)
+        cursor.close()
+        return rows
+
+    def changed_months(self, table: str, changed_since) -> List[int]:
+        """Months (YYYYMM) holding rows updated since a time; every month when changed_since is None"""
+        cursor = self.conn.cursor()
+        if changed_since is None:
+            cursor.execute(f"SELECT DISTINCT date_key DIV 100 FROM {table}")
+        else:
+            cursor.execute(f"""
+                SELECT DISTINCT date_key DIV 100 FROM {table}
+                WHERE updated_at >= %s
+            """, (changed_since,))
+        months = sorted(row[0] for row in cursor.fetchall())
+        cursor.close()
+        return months
+
+    def months_from(self, table: str, from_date_key: int) -> List[int]:
+        """Months (YYYYMM) holding rows dated on or after a date_key"""
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT DISTINCT date_key DIV 100 FROM {table}
+            WHERE date_key >= %s
+        """, (from_date_key,))
+        months = sorted(row[0] for row in cursor.fetchall())
+        cursor.close()
+        return months
+
+    def reconcile_months(self, table: str) -> List[int]:
+        """Remove partitions of months no longer in a fact table; return months whose row count differs
+
+        Upserts can move rows to another month and rows can be deleted. The
+        months they leave are not found from updated_at, so exported
+        partitions are checked against per-month row counts (read from the
+        Parquet footers).
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT date_key DIV 100, COUNT(*) FROM {table} GROUP BY date_key DIV 100")
+        counts = dict(cursor.fetchall())
+        cursor.close()
+
+        stale = []
+        for directory in glob.glob(os.path.join(self.output_dir, table, 'year=*', 'month=*')):
+            match = PARTITION_PATTERN.search(directory)
+            if not match:
+                continue
+            month_key = int(match.group(1)) * 100 + int(match.group(2))
+            if month_key not in counts:
+                shutil.rmtree(directory)
+                logger.info(f"Removed partition {directory}: no {table} rows left in {month_key}")
+                year_directory = os.path.dirname(directory)
+                if not os.listdir(year_directory):
+                    os.rmdir(year_directory)
+                continue
+            path = os.path.join(directory, 'part-0.parquet')
+            if not os.path.exists(path) or pq.read_metadata(path).num_rows != counts[month_key]:
+                stale.append(month_key)
+        return sorted(stale)
+
+    def decimal_types(self, table: str) -> Dict[str, Tuple[int, int]]:
+        """(precision, scale) of a table's DECIMAL columns (the connector does not report them)"""
+        if table not in self.decimal_columns:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                SELECT column_name, numeric_precision, numeric_scale
+                FROM information_schema.columns
+                WHERE table_schema = DATABASE() AND table_name = %s AND data_type = 'decimal'
+            """, (table,))
+            self.decimal_columns[table] = {name: (int(precision), int(scale))
+                                           for name, precision, scale in cursor.fetchall()}
+            cursor.close()
+        return self.decimal_columns[table]
+
+    def write(self, cursor, directory: str, file_name: str, table: str) -> int:
+        """Write a query result to a Parquet file, replacing it atomically"""
+        rows = cursor.fetchall()
+        decimals = self.decimal_types(table)
+        schema = pa.schema([(column[0], arrow_type(column[1], decimals.get(column[0])))
+                            for column in cursor.description])
+        values = list(zip(*rows)) if rows else [()] * len(schema)
+
+        arrays = []
+        for field, column in zip(schema, values):
+            if pa.types.is_floating(field.type):
+                column = [None if value is None else float(value) for value in column]
+            arrays.append(pa.array(column, type=field.type))
+        table = pa.Table.from_arrays(arrays, schema=schema)
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, file_name)
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path, compression=self.compression,
+                       row_group_size=self.row_group_size, write_statistics=True)
+        os.replace(tmp_path, path)
+        logger.info(f"Exported {len(rows)} rows to {path}")
+        return len(rows)
@@ -0,0 +1,170 @@
+"""
+Sales Aggregates for the ETL Pipeline
+Maintains the daily x product, daily x location and monthly x category rollups of
+fact_sales (03_DataWarehouse/schema/06_create_aggregates.sql)
+"""
+
+import logging
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Group-by query of each aggregate, filled from fact_sales; {join} restricts it to dirty days
+DAILY_AGGREGATES = {
+    'agg_sales_daily_product': """
+        INSERT INTO agg_sales_daily_product (
+            date_key, product_key, order_lines, total_quantity,
+            total_revenue, total_cost, total_profit, total_discount
+        )
+        SELECT
+            fs.date_key, fs.product_key, COUNT(*), SUM(fs.quantity),
+            SUM(fs.line_total), SUM(fs.cost_amount), SUM(fs.profit_amount),
+            SUM(COALESCE(fs.discount_amount, 0))
+        FROM fact_sales fs
+        {join}
+        GROUP BY fs.date_key, fs.product_key
+    """,
+    'agg_sales_daily_location': """
+        INSERT INTO agg_sales_daily_location (
+            date_key, location_key, order_count, order_lines, total_quantity,
+            total_revenue, total_cost, total_profit, profit_margin_sum, profit_margin_lines
+        )
+        SELECT
+            fs.date_key, fs.location_key, COUNT(DISTINCT fs.order_id), COUNT(*), SUM(fs.quantity),
+            SUM(fs.line_total), SUM(fs.cost_amount), SUM(fs.profit_amount),
+            COALESCE(SUM(fs.profit_margin_percent), 0), COUNT(fs.profit_margin_percent)
+        FROM fact_sales fs
+        {join}
+        GROUP BY fs.date_key, fs.location_key
+    """,
+}
+
+# Dimension key of each daily aggregate. An upsert that moves a fact row to another
+# date_key leaves its old day counting it; that day is found through this key
+DAILY_AGGREGATE_KEYS = {
+    'agg_sales_daily_product': 'product_key',
+    'agg_sales_daily_location': 'location_key',
+}
+
+# Monthly rollup, filled from agg_sales_daily_product; {join} restricts it to dirty months
+MONTHLY_CATEGORY_AGGREGATE = """
+    INSERT INTO agg_sales_monthly_category (
+        month_key, category_name, order_lines, total_quantity,
+        total_revenue, total_cost, total_profit
+    )
+    SELECT
+        a.date_key DIV 100, COALESCE(dp.category_name, 'Uncategorized'),
+        SUM(a.order_lines), SUM(a.total_quantity),
+        SUM(a.total_revenue), SUM(a.total_cost), SUM(a.total_profit)
+    FROM agg_sales_daily_product a
+    INNER JOIN dim_product dp ON a.product_key = dp.product_key
+    {join}
+    GROUP BY a.date_key DIV 100, COALESCE(dp.category_name, 'Uncategorized')
+"""
+
+
+class SalesAggregates:
+    """Rebuilds or incrementally refreshes the fact_sales aggregate tables"""
+
+    def __init__(self, conn):
+        """Initialize against a data warehouse connection"""
+        self.conn = conn
+
+    def rebuild(self) -> Dict[str, int]:
+        """Recompute every aggregate row from fact_sales in one transaction
+
+        Returns {table: rows written}.
+        """
+        cursor = self.conn.cursor()
+        written = {}
+        for table, query in DAILY_AGGREGATES.items():
+            cursor.execute(f"DELETE FROM {table}")
+            cursor.execute(query.format(join=''))
+            written[table] = cursor.rowcount
+        cursor.execute("DELETE FROM agg_sales_monthly_category")
+        cursor.execute(MONTHLY_CATEGORY_AGGREGATE.format(join=''))
+        written['agg_sales_monthly_category'] = cursor.rowcount
+        self.conn.commit()
+        cursor.close()
+        logger.info(f"Rebuilt sales aggregates: {written}")
+        return written
+
+    def refresh(self, changed_since) -> Dict[str, int]:
+        """Recompute only the days and months holding fact_sales rows changed since a time
+
+        Fact upserts can change existing order lines, so the touched groups are
+        recomputed rather than incremented; the work is proportional to the
+        dirty days' fact rows and aggregate rows. An upsert can also move a row
+        to another date_key, which leaves its old day counting it. After the
+        changed days are recomputed, each changed product and location key is
+        checked: if its aggregate line count no longer matches fact_sales, the
+        days where the two disagree are recomputed as well. A row whose date,
+        product and location all changed at once is only corrected by a
+        rebuild. Returns {table: rows written}.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS agg_dirty_dates")
+        cursor.execute("""
+            CREATE TEMPORARY TABLE agg_dirty_dates (date_key INT PRIMARY KEY)
+            SELECT DISTINCT date_key FROM fact_sales WHERE updated_at >= %s
+        """, (changed_since,))
+        dirty_days = cursor.rowcount
+        written = {table: 0 for table in (*DAILY_AGGREGATES, 'agg_sales_monthly_category')}
+        if dirty_days:
+            self.recompute_days(cursor, 'agg_dirty_dates', written)
+
+            # Days still counting rows that moved to another date_key
+            cursor.execute("DROP TEMPORARY TABLE IF EXISTS agg_stale_dates")
+            cursor.execute("CREATE TEMPORARY TABLE agg_stale_dates (date_key INT PRIMARY KEY)")
+            for table, key in DAILY_AGGREGATE_KEYS.items():
+                cursor.execute(f"""
+                    INSERT IGNORE INTO agg_stale_dates (date_key)
+                    SELECT a.date_key
+                    FROM {table} a
+                    INNER JOIN (
+                        SELECT k.{key}
+                        FROM (SELECT DISTINCT {key} FROM fact_sales WHERE updated_at >= %s) k
+                        WHERE (SELECT COALESCE(SUM(a2.order_lines), 0) FROM {table} a2 WHERE a2.{key} = k.{key})
+                           <> (SELECT COUNT(*) FROM fact_sales fs WHERE fs.{key} = k.{key})
+                    ) stale ON a.{key} = stale.{key}
+                    WHERE a.order_lines <> (
+                        SELECT COUNT(*) FROM fact_sales fs
+                        WHERE fs.date_key = a.date_key AND fs.{key} = a.{key}
+                    )
+                """, (changed_since,))
+            cursor.execute("SELECT COUNT(*) FROM agg_stale_dates")
+            stale_days = cursor.fetchone()[0]
+            if stale_days:
+                logger.info(f"Recomputing {stale_days} days left stale by fact rows that moved to another date")
+                self.recompute_days(cursor, 'agg_stale_dates', written)
+                cursor.execute("INSERT IGNORE INTO agg_dirty_dates (date_key) SELECT date_key FROM agg_stale_dates")
+                dirty_days += stale_days
+            cursor.execute("DROP TEMPORARY TABLE agg_stale_dates")
+
+            # A month is recomputed in full from its daily rows
+            cursor.execute("DROP TEMPORARY TABLE IF EXISTS agg_dirty_months")
+            cursor.execute("""
+                CREATE TEMPORARY TABLE agg_dirty_months (month_key INT PRIMARY KEY)
+                SELECT DISTINCT date_key DIV 100 AS month_key FROM agg_dirty_dates
+            """)
+            cursor.execute("""
+                DELETE a FROM agg_sales_monthly_category a
+                INNER JOIN agg_dirty_months m ON a.month_key = m.month_key
+            """)
+            cursor.execute(MONTHLY_CATEGORY_AGGREGATE.format(
+                join="INNER JOIN agg_dirty_months m "
+                     "ON a.date_key BETWEEN m.month_key * 100 AND m.month_key * 100 + 99"))
+            written['agg_sales_monthly_category'] = cursor.rowcount
+            cursor.execute("DROP TEMPORARY TABLE agg_dirty_months")
+        cursor.execute("DROP TEMPORARY TABLE agg_dirty_dates")
+        self.conn.commit()
+        cursor.close()
+        logger.info(f"Refreshed sales aggregates for {dirty_days} changed days: {written}")
+        return written
+
+    def recompute_days(self, cursor, dates_table: str, written: Dict[str, int]):
+        """Replace the daily aggregate rows of the days listed in a temporary table, adding to written"""
+        for table, query in DAILY_AGGREGATES.items():
+            cursor.execute(f"DELETE a FROM {table} a INNER JOIN {dates_table} d ON a.date_key = d.date_key")
+            cursor.execute(query.format(join=f"INNER JOIN {dates_table} d ON fs.date_key = d.date_key"))
+            written[table] += cursor.rowcount
@@ -0,0 +1,231 @@
+"""
+Columnar Transforms for the ETL Pipeline
+Computes fact and dimension attributes for a whole extracted batch with NumPy/pandas
+
+Money columns are handled as int64 cents and rounded half away from zero, which is
+what MySQL does when the row-at-a-time Decimal results are stored in DECIMAL(_, 2)
+columns, so both paths write identical values.
+"""
+
+from datetime import date
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from key_cache import DimensionKeyCache
+
+# Trailing sales windows (days) stored on fact_inventory as units_sold_<n>d
+SALES_WINDOWS = (7, 30, 90)
+
+# Upper bounds (exclusive) and labels for customer age groups
+AGE_GROUPS = [(26, '18-25'), (36, '26-35'), (46, '36-45'), (56, '46-55')]
+OLDEST_AGE_GROUP = '56+'
+
+
+def columns_of(rows: Sequence[tuple], column_names: Sequence[str]) -> Dict[str, tuple]:
+    """Pivot cursor rows into a dict of column name -> tuple of values"""
+    if not rows:
+        return {name: () for name in column_names}
+    return dict(zip(column_names, zip(*rows)))
+
+
+def to_cents(values: Sequence, fill: float = 0.0) -> np.ndarray:
+    """Convert DECIMAL(_, 2) values to int64 cents (NULL -> fill)"""
+    floats = np.array(values, dtype=np.float64)
+    floats[np.isnan(floats)] = fill
+    return np.rint(floats * 100).astype(np.int64)
+
+
+def from_cents(cents: np.ndarray) -> list:
+    """Convert int64 cents back to Python floats with exactly two decimals"""
+    return (cents / 100).tolist()
+
+
+def round_div(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Integer division rounded half away from zero (denominator > 0)"""
+    quotient = (np.abs(numerator) * 2 + denominator) // (denominator * 2)
+    return np.sign(numerator) * quotient
+
+
+def to_days(values: Sequence) -> np.ndarray:
+    """Convert date/datetime values to datetime64[D] (NULL -> NaT)"""
+    return pd.to_datetime(pd.Series(values, dtype=object)).to_numpy(dtype='datetime64[D]')
+
+
+def date_keys(values: Sequence) -> np.ndarray:
+    """Compute YYYYMMDD date keys for a column of dates"""
+    index = pd.DatetimeIndex(pd.to_datetime(pd.Series(values, dtype=object)))
+    return (index.year * 10000 + index.month * 100 + index.day).to_numpy(dtype=np.int64)
+
+
+def with_nulls(values: np.ndarray, valid: np.ndarray) -> list:
+    """Convert an array to a Python list, replacing invalid positions with None"""
+    if valid.all():
+        return values.tolist()
+    return np.where(valid, values.astype(object), None).tolist()
+
+
+def map_keys(ids: Sequence, cache: DimensionKeyCache) -> list:
+    """Map natural keys to surrogate keys for a whole column (missing -> None)"""
+    keys, found = cache.lookup(ids)
+    return with_nulls(keys, found)
+
+
+def age_groups(ages: np.ndarray, valid: np.ndarray) -> list:
+    """Bucket ages into the dim_customer age groups"""
+    conditions = [ages < upper for upper, _ in AGE_GROUPS]
+    labels = np.select(conditions, [label for _, label in AGE_GROUPS], default=OLDEST_AGE_GROUP)
+    return with_nulls(labels, valid)
+
+
+def date_dimension_rows(dates: pd.DatetimeIndex) -> List[tuple]:
+    """Build dim_date records for a set of calendar dates"""
+    day_of_week = dates.dayofweek + 1  # Monday = 1, Sunday = 7
+    quarter = dates.quarter
+
+    return list(zip(
+        (dates.year * 10000 + dates.month * 100 + dates.day).tolist(),
+        dates.date.tolist(),
+        day_of_week.tolist(),
+        dates.day_name().tolist(),
+        dates.day.tolist(),
+        dates.dayofyear.tolist(),
+        dates.isocalendar().week.astype(np.int64).tolist(),
+        dates.month.tolist(),
+        dates.month_name().tolist(),
+        quarter.tolist(),
+        ('Q' + pd.Index(quarter).astype(str)).tolist(),
+        dates.year.tolist(),
+        (day_of_week >= 6).tolist(),  # Saturday or Sunday
+        [False] * len(dates)  # Can be enhanced with holiday logic
+    ))
+
+
+def transform_sales(cols: Dict[str, tuple], lookups: Dict[str, DimensionKeyCache], location_keys: list) -> List[tuple]:
+    """Transform a columnar sales batch into fact_sales records"""
+    quantity = np.asarray(cols['quantity'], dtype=np.int64)
+    cost_price = to_cents(cols['cost_price'])
+    line_total = to_cents(cols['line_total'])
+    discount_percent = to_cents(cols['discount_percent'])
+
+    cost_amount = quantity * cost_price
+    # line_total * discount_percent / 100, in cents
+    discount_amount = round_div(line_total * discount_percent, np.full_like(line_total, 10000))
+    profit_amount = line_total - cost_amount
+    # profit / line_total * 100, in hundredths of a percent
+    has_revenue = line_total > 0
+    profit_margin = np.where(
+        has_revenue,
+        round_div(profit_amount * 10000, np.where(has_revenue, line_total, 1)),
+        0
+    )
+
+    return list(zip(
+        date_keys(cols['order_date']).tolist(),
+        map_keys(cols['customer_id'], lookups['customer']),
+        map_keys(cols['product_id'], lookups['product']),
+        map_keys(cols['supplier_id'], lookups['supplier']),
+        location_keys,
+        cols['order_id'], cols['order_item_id'], cols['quantity'],
+        cols['unit_price'], from_cents(discount_amount), cols['discount_percent'],
+        cols['line_total'], from_cents(cost_amount), from_cents(profit_amount), from_cents(profit_margin),
+        cols['tax_amount'], cols['shipping_cost'], cols['total_amount'],
+        cols['order_status'], cols['payment_status'], cols['payment_method'],
+        cols['order_date']
+    ))
+
+
+def sales_velocity(quantity_on_hand: np.ndarray, units_sold: np.ndarray, window_days: int) -> tuple:
+    """Compute (days_of_supply, inventory_turnover) lists from units sold in a trailing window
+
+    Both are NULL for products without sales; turnover is also NULL without stock.
+    """
+    avg_daily_sales = units_sold / window_days
+    has_sales = units_sold > 0
+    has_stock = quantity_on_hand > 0
+    safe_sales = np.where(has_sales, avg_daily_sales, 1.0)
+    safe_stock = np.where(has_stock, quantity_on_hand, 1)
+
+    days_of_supply = np.floor(quantity_on_hand / safe_sales).astype(np.int64)
+    # Annualized, rounded half away from zero to DECIMAL(10, 2)
+    turnover_cents = round_div(units_sold * 365 * 100, safe_stock * window_days)
+    return (
+        with_nulls(days_of_supply, has_sales),
+        with_nulls(turnover_cents / 100, has_sales & has_stock)
+    )
+
+
+def transform_inventory(cols: Dict[str, tuple], lookups: Dict[str, DimensionKeyCache], today: date,
+                        velocity_window: int = 30) -> List[tuple]:
+    """Transform a columnar inventory batch into fact_inventory records
+
+    cols carries units_sold_<n>d for every window in SALES_WINDOWS;
+    days_of_supply and inventory_turnover use the velocity_window one.
+    """
+    count = len(cols['product_id'])
+    date_key = int(today.strftime('%Y%m%d'))
+    quantity_on_hand = np.asarray(cols['quantity_on_hand'], dtype=np.int64)
+    reorder_level = np.asarray(cols['reorder_level'], dtype=np.int64)
+    stock_value = quantity_on_hand * to_cents(cols['cost_price'])
+    units_sold = {window: np.asarray(cols[f'units_sold_{window}d'], dtype=np.int64) for window in SALES_WINDOWS}
+    days_of_supply, inventory_turnover = sales_velocity(quantity_on_hand, units_sold[velocity_window],
+                                                        velocity_window)
+
+    return list(zip(
+        [date_key] * count,
+        map_keys(cols['product_id'], lookups['product']),
+        map_keys(cols['supplier_id'], lookups['supplier']),
+        [1] * count,  # Default warehouse location key
+        cols['product_id'], cols['quantity_on_hand'], cols['reorder_level'],
+        cols['reorder_quantity'], cols['quantity_on_hand'], from_cents(stock_value),
+        (quantity_on_hand <= reorder_level).tolist(),
+        (quantity_on_hand == 0).tolist(),
+        (quantity_on_hand > reorder_level * 3).tolist(),
+        cols['warehouse_location'], cols['last_restocked_date'], [today] * count,
+        days_of_supply, *(units_sold[window].tolist() for window in SALES_WINDOWS), inventory_turnover
+    ))
+
+
+def transform_inventory_transactions(cols: Dict[str, tuple], lookups: Dict[str, DimensionKeyCache]) -> List[tuple]:
+    """Transform a columnar inventory transaction batch into fact_inventory_transactions records"""
+    count = len(cols['transaction_id'])
+    quantity_change = np.asarray(cols['quantity_change'], dtype=np.int64)
+    quantity_after = np.asarray(cols['quantity_after'], dtype=np.int64)
+    transaction_value = quantity_change * to_cents(cols['cost_price'])
+
+    return list(zip(
+        date_keys(cols['transaction_date']).tolist(),
+        map_keys(cols['product_id'], lookups['product']),
+        map_keys(cols['supplier_id'], lookups['supplier']),
+        [1] * count,  # Default warehouse location key
+        cols['transaction_id'], cols['reference_order_id'], cols['quantity_change'],
+        (quantity_after - quantity_change).tolist(), cols['quantity_after'],
+        from_cents(transaction_value),
+        cols['transaction_type'], cols['notes'], cols['transaction_date']
+    ))
+
+
+def transform_customers(cols: Dict[str, tuple], today: date) -> List[tuple]:
+    """Transform a columnar customer batch into dim_customer records"""
+    today_day = np.datetime64(today, 'D')
+
+    date_of_birth = to_days(cols['date_of_birth'])
+    has_birth_date = ~np.isnat(date_of_birth)
+    age = (today_day - date_of_birth).astype('timedelta64[D]').astype(np.int64) // 365
+
+    registration_date = to_days(cols['registration_date'])
+    has_registration = ~np.isnat(registration_date)
+    years_as_customer = (today_day - registration_date).astype('timedelta64[D]').astype(np.int64) / 365.25
+
+    full_name = list(map('{} {}'.format, cols['first_name'], cols['last_name']))
+    is_active = (pd.Series(cols['status'], dtype=object) == 'Active').tolist()
+
+    return list(zip(
+        cols['customer_id'], full_name, cols['first_name'], cols['last_name'],
+        cols['email'], cols['phone'], cols['date_of_birth'],
+        with_nulls(age, has_birth_date), age_groups(age, has_birth_date),
+        cols['gender'], cols['city'], cols['state'], cols['country'], cols['postal_code'],
+        cols['registration_date'], cols['status'],
+        with_nulls(years_as_customer, has_registration), is_active
+    ))
@@ -0,0 +1,32 @@
+-- =============================================
+-- Migration: fact_sales One Row per Order Line
+-- Adds uk_order_line to a warehouse created before it was part of
+-- 03_create_facts.sql, which only applies to new tables.
+-- Incremental sales loads upsert on this key; without it they insert duplicates.
+-- =============================================
+
+USE ecommerce_dw;
+
+-- Keep the most recently loaded row (highest sales_key) of each order line
+DELETE fs
+FROM fact_sales fs
+INNER JOIN fact_sales newer
+    ON newer.order_id = fs.order_id
+   AND newer.order_item_id = fs.order_item_id
+   AND newer.sales_key > fs.sales_key;
+
+-- Add the key unless it already exists, so the script can be re-run
+SET @has_uk_order_line = (
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE()
+      AND table_name = 'fact_sales'
+      AND index_name = 'uk_order_line'
+);
+SET @ddl = IF(
+    @has_uk_order_line = 0,
+    'ALTER TABLE fact_sales ADD UNIQUE KEY uk_order_line (order_id, order_item_id)',
+    'DO 0'
+);
+PREPARE add_uk_order_line FROM @ddl;
+EXECUTE add_uk_order_line;
+DEALLOCATE PREPARE add_uk_order_line;
@@ -0,0 +1,103 @@
+-- =============================================
+-- Migration: SCD Type 2 Row Hashes on dim_customer and dim_product
+-- Adds row_hash and the current-version indexes to a warehouse created before
+-- they were part of 02_create_dimensions.sql, then backfills the hash of current rows.
+-- Requires the OLTP database (ecommerce_oltp) on the same server.
+-- =============================================
+
+USE ecommerce_dw;
+
+-- Add each column and index unless it already exists, so the script can be re-run
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.columns
+     WHERE table_schema = DATABASE() AND table_name = 'dim_customer' AND column_name = 'row_hash') = 0,
+    'ALTER TABLE dim_customer ADD COLUMN row_hash CHAR(32) AFTER is_active',
+    'DO 0'
+);
+PREPARE migration_step FROM @ddl;
+EXECUTE migration_step;
+DEALLOCATE PREPARE migration_step;
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'dim_customer' AND index_name = 'idx_customer_current') = 0,
+    'ALTER TABLE dim_customer ADD INDEX idx_customer_current (is_current, customer_id)',
+    'DO 0'
+);
+PREPARE migration_step FROM @ddl;
+EXECUTE migration_step;
+DEALLOCATE PREPARE migration_step;
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.columns
+     WHERE table_schema = DATABASE() AND table_name = 'dim_product' AND column_name = 'row_hash') = 0,
+    'ALTER TABLE dim_product ADD COLUMN row_hash CHAR(32) AFTER product_status',
+    'DO 0'
+);
+PREPARE migration_step FROM @ddl;
+EXECUTE migration_step;
+DEALLOCATE PREPARE migration_step;
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'dim_product' AND index_name = 'idx_product_current') = 0,
+    'ALTER TABLE dim_product ADD INDEX idx_product_current (is_current, product_id)',
+    'DO 0'
+);
+PREPARE migration_step FROM @ddl;
+EXECUTE migration_step;
+DEALLOCATE PREPARE migration_step;
+
+-- Backfill: a current row gets the hash the ETL computes from its source row
+-- (02_ETL/etl_pipeline.py CUSTOMER_HASH_COLUMNS / PRODUCT_HASH_COLUMNS), but only
+-- when its tracked attributes still match the source. Rows that are out of date
+-- keep a NULL hash and get a new version on the next run, as they should.
+UPDATE dim_customer dc
+INNER JOIN ecommerce_oltp.customers c ON c.customer_id = dc.customer_id
+SET dc.row_hash = MD5(CONCAT_WS('|',
+    IFNULL(c.first_name, '<null>'), IFNULL(c.last_name, '<null>'), IFNULL(c.email, '<null>'),
+    IFNULL(c.phone, '<null>'), IFNULL(c.date_of_birth, '<null>'), IFNULL(c.gender, '<null>'),
+    IFNULL(c.city, '<null>'), IFNULL(c.state, '<null>'), IFNULL(c.country, '<null>'),
+    IFNULL(c.postal_code, '<null>'), IFNULL(c.registration_date, '<null>'), IFNULL(c.status, '<null>')))
+WHERE dc.is_current = TRUE
+  AND dc.row_hash IS NULL
+  AND dc.first_name <=> c.first_name
+  AND dc.last_name <=> c.last_name
+  AND dc.email <=> c.email
+  AND dc.phone <=> c.phone
+  AND dc.date_of_birth <=> c.date_of_birth
+  AND dc.gender <=> c.gender
+  AND dc.city <=> c.city
+  AND dc.state <=> c.state
+  AND dc.country <=> c.country
+  AND dc.postal_code <=> c.postal_code
+  AND dc.registration_date <=> DATE(c.registration_date)
+  AND dc.customer_status <=> c.status;
+
+UPDATE dim_product dp
+INNER JOIN ecommerce_oltp.products p ON p.product_id = dp.product_id
+LEFT JOIN ecommerce_oltp.categories c ON p.category_id = c.category_id
+LEFT JOIN ecommerce_oltp.categories pc ON c.parent_category_id = pc.category_id
+LEFT JOIN ecommerce_oltp.suppliers s ON p.supplier_id = s.supplier_id
+SET dp.row_hash = MD5(CONCAT_WS('|',
+    IFNULL(p.product_code, '<null>'), IFNULL(p.product_name, '<null>'), IFNULL(p.description, '<null>'),
+    IFNULL(p.category_id, '<null>'), IFNULL(c.category_name, '<null>'), IFNULL(c.parent_category_id, '<null>'),
+    IFNULL(pc.category_name, '<null>'), IFNULL(p.supplier_id, '<null>'), IFNULL(s.supplier_name, '<null>'),
+    IFNULL(p.unit_price, '<null>'), IFNULL(p.cost_price, '<null>'), IFNULL(p.weight_kg, '<null>'),
+    IFNULL(p.dimensions, '<null>'), IFNULL(p.status, '<null>')))
+WHERE dp.is_current = TRUE
+  AND dp.row_hash IS NULL
+  AND dp.product_code <=> p.product_code
+  AND dp.product_name <=> p.product_name
+  AND dp.description <=> p.description
+  AND dp.category_id <=> p.category_id
+  AND dp.category_name <=> c.category_name
+  AND dp.parent_category_id <=> c.parent_category_id
+  AND dp.parent_category_name <=> pc.category_name
+  AND dp.supplier_id <=> p.supplier_id
+  AND dp.supplier_name <=> s.supplier_name
+  AND dp.unit_price <=> p.unit_price
+  AND dp.cost_price <=> p.cost_price
+  AND dp.weight_kg <=> p.weight_kg
+  AND dp.dimensions <=> p.dimensions
+  AND dp.product_status <=> p.status;
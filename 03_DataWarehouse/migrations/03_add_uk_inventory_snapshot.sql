@@ -0,0 +1,27 @@
+-- =============================================
+-- Migration: fact_inventory One Row per Product per Snapshot Day
+-- Adds uk_inventory_snapshot to a warehouse created before it was part of
+-- 03_create_facts.sql, which only applies to new tables.
+-- Same-day snapshot refreshes upsert on this key; without it they insert duplicates.
+-- =============================================
+
+USE ecommerce_dw;
+
+-- Keep the most recently loaded row (highest inventory_key) of each product and day
+DELETE fi
+FROM fact_inventory fi
+INNER JOIN fact_inventory newer
+    ON newer.date_key = fi.date_key
+   AND newer.product_id = fi.product_id
+   AND newer.inventory_key > fi.inventory_key;
+
+-- Add the key unless it already exists, so the script can be re-run
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'fact_inventory' AND index_name = 'uk_inventory_snapshot') = 0,
+    'ALTER TABLE fact_inventory ADD UNIQUE KEY uk_inventory_snapshot (date_key, product_id)',
+    'DO 0'
+);
+PREPARE migration_step FROM @ddl;
+EXECUTE migration_step;
+DEALLOCATE PREPARE migration_step;
@@ -0,0 +1,26 @@
+-- =============================================
+-- Migration: fact_inventory_transactions One Row per Source Transaction
+-- Adds uk_transaction to a warehouse created before it was part of
+-- 03_create_facts.sql, which only applies to new tables.
+-- Reloads upsert on this key; without it they insert duplicates.
+-- =============================================
+
+USE ecommerce_dw;
+
+-- Keep the most recently loaded row (highest transaction_key) of each transaction
+DELETE ft
+FROM fact_inventory_transactions ft
+INNER JOIN fact_inventory_transactions newer
+    ON newer.transaction_id = ft.transaction_id
+   AND newer.transaction_key > ft.transaction_key;
+
+-- Add the key unless it already exists, so the script can be re-run
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'fact_inventory_transactions' AND index_name = 'uk_transaction') = 0,
+    'ALTER TABLE fact_inventory_transactions ADD UNIQUE KEY uk_transaction (transaction_id)',
+    'DO 0'
+);
+PREPARE migration_step FROM @ddl;
+EXECUTE migration_step;
+DEALLOCATE PREPARE migration_step;
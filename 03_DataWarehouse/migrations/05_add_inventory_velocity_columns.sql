@@ -0,0 +1,50 @@
+-- =============================================
+-- Migration: Sales Velocity Columns on fact_inventory
+-- Adds units_sold_7d/30d/90d and inventory_turnover to a warehouse created
+-- before they were part of 03_create_facts.sql, which only applies to new tables.
+-- load_fact_inventory writes these columns; without them every inventory load fails.
+-- Existing rows keep NULL velocity until their product's next snapshot.
+-- =============================================
+
+USE ecommerce_dw;
+
+-- Add each column unless it already exists, so the script can be re-run
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.columns
+     WHERE table_schema = DATABASE() AND table_name = 'fact_inventory' AND column_name = 'units_sold_7d') = 0,
+    'ALTER TABLE fact_inventory ADD COLUMN units_sold_7d INT AFTER days_of_supply',
+    'DO 0'
+);
+PREPARE migration_step FROM @ddl;
+EXECUTE migration_step;
+DEALLOCATE PREPARE migration_step;
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.columns
+     WHERE table_schema = DATABASE() AND table_name = 'fact_inventory' AND column_name = 'units_sold_30d') = 0,
+    'ALTER TABLE fact_inventory ADD COLUMN units_sold_30d INT AFTER units_sold_7d',
+    'DO 0'
+);
+PREPARE migration_step FROM @ddl;
+EXECUTE migration_step;
+DEALLOCATE PREPARE migration_step;
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.columns
+     WHERE table_schema = DATABASE() AND table_name = 'fact_inventory' AND column_name = 'units_sold_90d') = 0,
+    'ALTER TABLE fact_inventory ADD COLUMN units_sold_90d INT AFTER units_sold_30d',
+    'DO 0'
+);
+PREPARE migration_step FROM @ddl;
+EXECUTE migration_step;
+DEALLOCATE PREPARE migration_step;
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.columns
+     WHERE table_schema = DATABASE() AND table_name = 'fact_inventory' AND column_name = 'inventory_turnover') = 0,
+    'ALTER TABLE fact_inventory ADD COLUMN inventory_turnover DECIMAL(10, 2) AFTER units_sold_90d',
+    'DO 0'
+);
+PREPARE migration_step FROM @ddl;
+EXECUTE migration_step;
+DEALLOCATE PREPARE migration_step;
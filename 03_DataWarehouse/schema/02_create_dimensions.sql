@@ -53,10 +53,12 @@ CREATE TABLE IF NOT EXISTS dim_customer (
     customer_status VARCHAR(20),
     years_as_customer DECIMAL(5, 2),
     is_active BOOLEAN,
+    row_hash CHAR(32), -- MD5 of tracked source attributes (SCD Type 2 change detection)
     valid_from TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     valid_to TIMESTAMP NULL,
     is_current BOOLEAN DEFAULT TRUE,
     INDEX idx_customer_id (customer_id),
+    INDEX idx_customer_current (is_current, customer_id),
     INDEX idx_email (email),
     INDEX idx_location (country, state, city)
 ) ENGINE=InnoDB;
@@ -83,10 +85,12 @@ CREATE TABLE IF NOT EXISTS dim_product (
     weight_kg DECIMAL(8, 2),
     dimensions VARCHAR(100),
     product_status VARCHAR(20),
+    row_hash CHAR(32), -- MD5 of tracked source attributes (SCD Type 2 change detection)
     valid_from TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     valid_to TIMESTAMP NULL,
     is_current BOOLEAN DEFAULT TRUE,
     INDEX idx_product_id (product_id),
+    INDEX idx_product_current (is_current, product_id),
     INDEX idx_product_code (product_code),
     INDEX idx_category (category_name),
     INDEX idx_supplier (supplier_name)
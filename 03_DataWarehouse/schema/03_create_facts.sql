@@ -45,13 +45,16 @@ CREATE TABLE IF NOT EXISTS fact_sales (
     FOREIGN KEY (product_key) REFERENCES dim_product(product_key),
     FOREIGN KEY (supplier_key) REFERENCES dim_supplier(supplier_key),
     FOREIGN KEY (location_key) REFERENCES dim_location(location_key),
+    -- One row per source order line (enables upserts of changed orders)
+    UNIQUE KEY uk_order_line (order_id, order_item_id),
     -- Indexes
     INDEX idx_date (date_key),
     INDEX idx_customer (customer_key),
     INDEX idx_product (product_key),
     INDEX idx_order (order_id),
     INDEX idx_order_date (order_date),
-    INDEX idx_status (order_status, payment_status)
+    INDEX idx_status (order_status, payment_status),
+    INDEX idx_updated_at (updated_at) -- Changed rows for incremental aggregate refreshes
 ) ENGINE=InnoDB;
 
 -- =============================================
@@ -71,7 +74,11 @@ CREATE TABLE IF NOT EXISTS fact_inventory (
     reorder_level INT NOT NULL,
     reorder_quantity INT NOT NULL,
     quantity_available INT NOT NULL, -- quantity_on_hand - reserved
-    days_of_supply INT, -- Calculated based on average daily sales
+    days_of_supply INT, -- quantity_on_hand / average daily units sold over the velocity window
+    units_sold_7d INT, -- Units sold in the trailing 7 days
+    units_sold_30d INT, -- Units sold in the trailing 30 days
+    units_sold_90d INT, -- Units sold in the trailing 90 days
+    inventory_turnover DECIMAL(10, 2), -- Annualized: average daily units sold * 365 / quantity_on_hand
     stock_value DECIMAL(12, 2) NOT NULL, -- quantity_on_hand * cost_price
     -- Status Flags
     is_low_stock BOOLEAN NOT NULL, -- quantity_on_hand <= reorder_level
@@ -88,14 +95,54 @@ CREATE TABLE IF NOT EXISTS fact_inventory (
     FOREIGN KEY (product_key) REFERENCES dim_product(product_key),
     FOREIGN KEY (supplier_key) REFERENCES dim_supplier(supplier_key),
     FOREIGN KEY (location_key) REFERENCES dim_location(location_key),
+    -- One row per product per snapshot day (enables same-day refreshes)
+    UNIQUE KEY uk_inventory_snapshot (date_key, product_id),
     -- Indexes
     INDEX idx_date (date_key),
     INDEX idx_product (product_key),
     INDEX idx_snapshot_date (snapshot_date),
+    INDEX idx_product_snapshot (product_id, date_key), -- Latest / as-of row per product
+    INDEX idx_date_stock_value (date_key, stock_value), -- Dashboard pages of a snapshot by stock value
+    INDEX idx_date_quantity (date_key, quantity_on_hand), -- Dashboard pages of a snapshot by quantity
     INDEX idx_low_stock (is_low_stock, snapshot_date),
     INDEX idx_out_of_stock (is_out_of_stock, snapshot_date)
 ) ENGINE=InnoDB;
 
+-- =============================================
+-- Fact_Inventory_Current - Latest Inventory Row per Product
+-- =============================================
+-- Copy of each product's newest fact_inventory row, kept by the ETL in delta
+-- snapshot mode, so current-stock pages are index ranges instead of a
+-- latest-row search over the whole snapshot history
+CREATE TABLE IF NOT EXISTS fact_inventory_current (
+    product_id INT PRIMARY KEY,
+    inventory_key BIGINT NOT NULL, -- fact_inventory row this is a copy of
+    date_key INT NOT NULL,
+    product_key INT NOT NULL,
+    supplier_key INT NOT NULL,
+    location_key INT NOT NULL,
+    quantity_on_hand INT NOT NULL DEFAULT 0,
+    reorder_level INT NOT NULL,
+    reorder_quantity INT NOT NULL,
+    quantity_available INT NOT NULL,
+    days_of_supply INT,
+    units_sold_7d INT,
+    units_sold_30d INT,
+    units_sold_90d INT,
+    inventory_turnover DECIMAL(10, 2),
+    stock_value DECIMAL(12, 2) NOT NULL,
+    is_low_stock BOOLEAN NOT NULL,
+    is_out_of_stock BOOLEAN NOT NULL,
+    is_overstocked BOOLEAN NOT NULL,
+    warehouse_location VARCHAR(100),
+    last_restocked_date DATE,
+    snapshot_date DATE NOT NULL,
+    UNIQUE KEY uk_inventory_key (inventory_key),
+    INDEX idx_product (product_key),
+    INDEX idx_stock_value (stock_value, inventory_key), -- Dashboard pages by stock value
+    INDEX idx_quantity (quantity_on_hand, inventory_key) -- Dashboard pages by quantity
+) ENGINE=InnoDB;
+
 -- =============================================
 -- Fact_Inventory_Transactions - Inventory Movement Fact
 -- =============================================
@@ -125,6 +172,8 @@ CREATE TABLE IF NOT EXISTS fact_inventory_transactions (
     FOREIGN KEY (product_key) REFERENCES dim_product(product_key),
     FOREIGN KEY (supplier_key) REFERENCES dim_supplier(supplier_key),
     FOREIGN KEY (location_key) REFERENCES dim_location(location_key),
+    -- One row per source transaction (enables upserts on reload)
+    UNIQUE KEY uk_transaction (transaction_id),
     -- Indexes
     INDEX idx_date (date_key),
     INDEX idx_product (product_key),
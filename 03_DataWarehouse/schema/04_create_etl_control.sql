@@ -0,0 +1,49 @@
+-- =============================================
+-- ETL Control Tables Creation Script
+-- Load state and bookkeeping for the ETL pipeline
+-- =============================================
+
+USE ecommerce_dw;
+
+-- =============================================
+-- ETL_State - Per-Source High-Water Marks
+-- =============================================
+CREATE TABLE IF NOT EXISTS etl_state (
+    source_name VARCHAR(100) PRIMARY KEY, -- e.g. 'fact_sales'
+    watermark_ts TIMESTAMP NULL, -- Last processed source updated_at
+    watermark_id BIGINT NOT NULL DEFAULT 0, -- Tie-breaker within watermark_ts (e.g. order_item_id)
+    rows_processed BIGINT NOT NULL DEFAULT 0, -- Rows applied by the last run
+    last_run_at TIMESTAMP NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
+
+-- =============================================
+-- ETL_Run - One Row per Pipeline Run
+-- =============================================
+CREATE TABLE IF NOT EXISTS etl_run (
+    run_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    status VARCHAR(20) NOT NULL DEFAULT 'running', -- running, failed, success
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    resumed_at TIMESTAMP NULL, -- Last time a failed run was resumed
+    finished_at TIMESTAMP NULL,
+    error_message TEXT,
+    INDEX idx_status (status, run_id)
+) ENGINE=InnoDB;
+
+-- =============================================
+-- ETL_Checkpoint - Per-Step Progress of a Run
+-- =============================================
+-- Fact loads update their row with every committed batch, in the same
+-- transaction as the batch, so a resumed run continues after it
+CREATE TABLE IF NOT EXISTS etl_checkpoint (
+    run_id BIGINT NOT NULL,
+    step_name VARCHAR(100) NOT NULL, -- e.g. 'load_fact_sales' or 'load_fact_sales[1-2500]'
+    status VARCHAR(20) NOT NULL DEFAULT 'running', -- running, completed
+    position_ts TIMESTAMP NULL, -- Last committed source updated_at
+    position_id BIGINT NOT NULL DEFAULT 0, -- Last committed tie-breaker (e.g. order_item_id)
+    batches_committed INT NOT NULL DEFAULT 0,
+    rows_committed BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_id, step_name),
+    FOREIGN KEY (run_id) REFERENCES etl_run(run_id)
+) ENGINE=InnoDB;
@@ -0,0 +1,46 @@
+-- =============================================
+-- Inventory Snapshot Views
+-- As-of views over fact_inventory that work for both full daily snapshots
+-- and delta snapshots (a row only when a product's stock position changed).
+-- With delta snapshots, the velocity columns of vw_inventory_current are those of the
+-- day the row was written; fact_inventory_current carries today's figures
+-- =============================================
+
+USE ecommerce_dw;
+
+-- =============================================
+-- VW_Inventory_Current - Latest Snapshot Row per Product
+-- =============================================
+CREATE OR REPLACE VIEW vw_inventory_current AS
+SELECT fi.*
+FROM fact_inventory fi
+WHERE fi.date_key = (
+    SELECT MAX(latest.date_key)
+    FROM fact_inventory latest
+    WHERE latest.product_id = fi.product_id
+);
+
+-- =============================================
+-- VW_Inventory_Snapshot_Ranges - Validity Range of each Snapshot Row
+-- =============================================
+-- A row is valid from its snapshot_date until the product's next row (exclusive)
+CREATE OR REPLACE VIEW vw_inventory_snapshot_ranges AS
+SELECT
+    fi.*,
+    LEAD(fi.snapshot_date) OVER (PARTITION BY fi.product_id ORDER BY fi.date_key) AS valid_to_date
+FROM fact_inventory fi;
+
+-- =============================================
+-- VW_Inventory_Daily - Full Daily Picture Rebuilt with a Range Join
+-- =============================================
+-- One row per product per day, from its first snapshot up to today
+CREATE OR REPLACE VIEW vw_inventory_daily AS
+SELECT
+    d.date_key AS as_of_date_key,
+    d.full_date AS as_of_date,
+    r.*
+FROM vw_inventory_snapshot_ranges r
+INNER JOIN dim_date d
+    ON d.full_date >= r.snapshot_date
+   AND (r.valid_to_date IS NULL OR d.full_date < r.valid_to_date)
+   AND d.full_date <= CURDATE();
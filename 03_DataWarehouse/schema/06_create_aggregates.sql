@@ -0,0 +1,66 @@
+-- =============================================
+-- Aggregate Tables Creation Script
+-- Sales rollups maintained incrementally by the ETL (02_ETL/sales_aggregates.py)
+-- =============================================
+
+USE ecommerce_dw;
+
+-- =============================================
+-- Agg_Sales_Daily_Product - Sales per Day and Product Version
+-- =============================================
+CREATE TABLE IF NOT EXISTS agg_sales_daily_product (
+    date_key INT NOT NULL,
+    product_key INT NOT NULL,
+    -- Measures
+    order_lines INT NOT NULL,
+    total_quantity BIGINT NOT NULL,
+    total_revenue DECIMAL(15, 2) NOT NULL, -- SUM(line_total)
+    total_cost DECIMAL(15, 2) NOT NULL,
+    total_profit DECIMAL(15, 2) NOT NULL,
+    total_discount DECIMAL(15, 2) NOT NULL,
+    -- Primary Key and Indexes
+    PRIMARY KEY (date_key, product_key),
+    FOREIGN KEY (date_key) REFERENCES dim_date(date_key),
+    FOREIGN KEY (product_key) REFERENCES dim_product(product_key),
+    INDEX idx_product (product_key)
+) ENGINE=InnoDB;
+
+-- =============================================
+-- Agg_Sales_Daily_Location - Sales per Day and Location
+-- =============================================
+-- An order has a single date and location, so order_count adds up across rows
+CREATE TABLE IF NOT EXISTS agg_sales_daily_location (
+    date_key INT NOT NULL,
+    location_key INT NOT NULL,
+    -- Measures
+    order_count INT NOT NULL, -- COUNT(DISTINCT order_id)
+    order_lines INT NOT NULL,
+    total_quantity BIGINT NOT NULL,
+    total_revenue DECIMAL(15, 2) NOT NULL,
+    total_cost DECIMAL(15, 2) NOT NULL,
+    total_profit DECIMAL(15, 2) NOT NULL,
+    profit_margin_sum DECIMAL(15, 2) NOT NULL, -- SUM(profit_margin_percent), for averages
+    profit_margin_lines INT NOT NULL, -- Lines with a profit_margin_percent
+    -- Primary Key and Indexes
+    PRIMARY KEY (date_key, location_key),
+    FOREIGN KEY (date_key) REFERENCES dim_date(date_key),
+    FOREIGN KEY (location_key) REFERENCES dim_location(location_key),
+    INDEX idx_location (location_key)
+) ENGINE=InnoDB;
+
+-- =============================================
+-- Agg_Sales_Monthly_Category - Sales per Month and Product Category
+-- =============================================
+CREATE TABLE IF NOT EXISTS agg_sales_monthly_category (
+    month_key INT NOT NULL, -- YYYYMM
+    category_name VARCHAR(100) NOT NULL, -- 'Uncategorized' for products without a category
+    -- Measures
+    order_lines INT NOT NULL,
+    total_quantity BIGINT NOT NULL,
+    total_revenue DECIMAL(15, 2) NOT NULL,
+    total_cost DECIMAL(15, 2) NOT NULL,
+    total_profit DECIMAL(15, 2) NOT NULL,
+    -- Primary Key and Indexes
+    PRIMARY KEY (month_key, category_name),
+    INDEX idx_category (category_name)
+) ENGINE=InnoDB;
@@ -0,0 +1,404 @@
+"""
+In-Memory Analytics Engine for the BI Dashboard
+Keeps fact_sales as compact NumPy columns with categorical product and location
+attributes, refreshed incrementally from the warehouse or its Parquet export,
+and answers the dashboard's sales aggregates without querying the warehouse
+"""
+
+import calendar
+import glob
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Only needed to read the Parquet export
+    pq = None
+
+# fact_sales columns held in memory and their in-memory dtypes
+FACT_COLUMNS = {
+    'sales_key': np.int64,
+    'date_key': np.int32,
+    'customer_key': np.int32,
+    'product_key': np.int32,
+    'location_key': np.int32,
+    'order_id': np.int64,
+    'quantity': np.int32,
+    'line_total': np.int64,  # cents
+    'profit_amount': np.int64,  # cents
+    'profit_margin_percent': np.float64,  # NaN for NULL
+}
+MONEY_COLUMNS = ('line_total', 'profit_amount')
+
+# Rows fetched per round trip while loading facts
+FETCH_SIZE = 50000
+
+
+def to_cents(values) -> np.ndarray:
+    """Convert DECIMAL money values to int64 cents"""
+    return np.round(pd.to_numeric(pd.Series(values, dtype=object)).to_numpy(dtype=np.float64) * 100).astype(np.int64)
+
+
+class Dimension:
+    """Attributes of a small dimension as categorical codes indexed by surrogate key"""
+
+    def __init__(self, attributes):
+        """Initialize an empty dimension with the given attribute names"""
+        self.attributes = attributes
+        self.max_key = 0
+        self.categories = {name: pd.Index([], dtype=object) for name in attributes}
+        self.codes = {name: np.full(1, -1, dtype=np.int32) for name in attributes}
+
+    def merge(self, rows):
+        """Add (key, *attributes) rows for surrogate keys not seen before"""
+        if not rows:
+            return
+        frame = pd.DataFrame(rows, columns=['key', *self.attributes])
+        keys = frame['key'].to_numpy(dtype=np.int64)
+        size = int(keys.max()) + 1
+        for name in self.attributes:
+            categories = self.categories[name].append(
+                pd.Index(frame[name].dropna().unique()).difference(self.categories[name]))
+            codes = np.full(size, -1, dtype=np.int32)
+            codes[:len(self.codes[name])] = self.codes[name]
+            codes[keys] = categories.get_indexer(frame[name])
+            self.categories[name] = categories
+            self.codes[name] = codes
+        self.max_key = max(self.max_key, size - 1)
+
+    def lookup(self, name: str, keys: np.ndarray) -> np.ndarray:
+        """Attribute codes for a column of surrogate keys (-1 for NULL or unknown keys)"""
+        codes = self.codes[name]
+        inside = keys < len(codes)
+        return np.where(inside, codes[np.minimum(keys, len(codes) - 1)], -1)
+
+    def code_of(self, name: str, value) -> int:
+        """Code of an attribute value (-1 when no row has it)"""
+        return int(self.categories[name].get_indexer([value])[0])
+
+    def values(self, name: str, codes: np.ndarray) -> np.ndarray:
+        """Attribute values for a column of codes (None for -1)"""
+        values = np.append(self.categories[name].to_numpy(dtype=object), None)
+        return values[codes]
+
+
+class SalesEngine:
+    """Columnar in-memory copy of fact_sales answering the dashboard sales aggregates"""
+
+    def __init__(self, connection_factory: Callable, refresh_seconds: float = 30,
+                 parquet_dir: Optional[str] = None):
+        """Initialize an empty engine; facts are loaded on first use
+
+        connection_factory returns a warehouse connection (closed after each
+        refresh). With parquet_dir, data is read from the ETL's Parquet export
+        (02_ETL/parquet_export.py) instead. Refreshes happen at most every
+        refresh_seconds.
+        """
+        if parquet_dir and pq is None:
+            raise ImportError("Reading the Parquet export requires pyarrow (pip install pyarrow)")
+        self.connection_factory = connection_factory
+        self.refresh_seconds = refresh_seconds
+        self.parquet_dir = parquet_dir
+        self.file_mtimes = {}  # Parquet path -> modification time when read
+        self.partitions = {}  # fact_sales partition path -> columns
+        self.columns = {name: np.empty(0, dtype=dtype) for name, dtype in FACT_COLUMNS.items()}
+        self.products = Dimension(['product_name', 'category_name'])
+        self.locations = Dimension(['region', 'country'])
+        self.max_sales_key = 0
+        self.max_updated_at = None
+        self.refreshed_at = None
+        self.lock = threading.Lock()
+
+    def ensure_fresh(self):
+        """Refresh the engine if refresh_seconds have passed since the last refresh
+
+        A failed refresh is reported and the previously loaded data is served.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.refreshed_at is not None and now - self.refreshed_at < self.refresh_seconds:
+                return
+            self.refreshed_at = now
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Analytics engine refresh failed: {e}")
+
+    def refresh(self) -> int:
+        """Pull dimension rows and fact_sales rows appended or updated since the last refresh
+
+        Returns the number of fact rows read.
+        """
+        if self.parquet_dir:
+            return self.refresh_from_parquet()
+
+        conn = self.connection_factory()
+        if conn is None:
+            return 0
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT MIN(sales_key), COALESCE(MAX(sales_key), 0), MAX(updated_at) FROM fact_sales")
+            table_min_key, table_max_key, table_max_updated_at = cursor.fetchone()
+            if self.is_replaced(table_min_key, table_max_key):
+                # fact_sales was truncated or rebuilt: start over
+                self.columns = {name: np.empty(0, dtype=dtype) for name, dtype in FACT_COLUMNS.items()}
+                self.max_sales_key = 0
+                self.max_updated_at = None
+
+            cursor.execute("""
+                SELECT product_key, product_name, category_name FROM dim_product
+                WHERE product_key > %s
+            """, (self.products.max_key,))
+            self.products.merge(cursor.fetchall())
+            cursor.execute("""
+                SELECT location_key, region, country FROM dim_location
+                WHERE location_key > %s
+            """, (self.locations.max_key,))
+            self.locations.merge(cursor.fetchall())
+
+            select_list = ', '.join(FACT_COLUMNS)
+            rows_read = 0
+            # Upserted order lines keep their sales_key; replace them in place
+            if self.max_updated_at is not None and self.max_sales_key:
+                cursor.execute(f"""
+                    SELECT {select_list} FROM fact_sales
+                    WHERE updated_at >= %s AND sales_key <= %s
+                """, (self.max_updated_at, self.max_sales_key))
+                rows_read += self.apply_updates(cursor)
+
+            cursor.execute(f"""
+                SELECT {select_list} FROM fact_sales
+                WHERE sales_key > %s
+                ORDER BY sales_key
+            """, (self.max_sales_key,))
+            rows_read += self.append_rows(cursor)
+            cursor.close()
+
+            self.max_updated_at = table_max_updated_at
+            return rows_read
+        finally:
+            conn.close()
+
+    def is_replaced(self, table_min_key: Optional[int], table_max_key: int) -> bool:
+        """Whether fact_sales no longer holds the rows loaded so far
+
+        A swap rebuild (merge_mode 'swap') copies the table's AUTO_INCREMENT, so
+        its rows get new sales_keys above every loaded one; the first loaded
+        sales_key then no longer exists and the table's MIN(sales_key) moves.
+        A truncated table is also caught by its MAX(sales_key) falling back.
+        """
+        if not self.max_sales_key:
+            return False
+        return table_min_key != int(self.columns['sales_key'][0]) or table_max_key < self.max_sales_key
+
+    def refresh_from_parquet(self) -> int:
+        """Re-read the dimension files and the fact_sales partitions rewritten since the last refresh
+
+        Returns the number of fact rows read.
+        """
+        for table, dimension, columns in (
+            ('dim_product', 'products', ['product_key', 'product_name', 'category_name']),
+            ('dim_location', 'locations', ['location_key', 'region', 'country']),
+        ):
+            path = os.path.join(self.parquet_dir, table, f"{table}.parquet")
+            if os.path.exists(path) and self.file_mtimes.get(path) != os.path.getmtime(path):
+                self.file_mtimes[path] = os.path.getmtime(path)
+                rows = pq.read_table(path, columns=columns).to_pandas().itertuples(index=False, name=None)
+                # Rebuilt rather than merged: existing SCD rows may have changed
+                rebuilt = Dimension(columns[1:])
+                rebuilt.merge(list(rows))
+                setattr(self, dimension, rebuilt)
+
+        paths = sorted(glob.glob(os.path.join(self.parquet_dir, 'fact_sales', 'year=*', 'month=*', '*.parquet')))
+        changed = [path for path in paths if self.file_mtimes.get(path) != os.path.getmtime(path)]
+        removed = set(self.partitions) - set(paths)
+        if not changed and not removed:
+            return 0
+
+        rows_read = 0
+        for path in changed:
+            self.file_mtimes[path] = os.path.getmtime(path)
+            frame = pq.read_table(path, columns=list(FACT_COLUMNS)).to_pandas()
+            self.partitions[path] = self.typed_columns(frame)
+            rows_read += len(frame)
+        for path in removed:
+            del self.partitions[path]
+            self.file_mtimes.pop(path, None)
+
+        partitions = [self.partitions[path] for path in paths]
+        self.columns = {
+            name: np.concatenate([partition[name] for partition in partitions]) if partitions
+            else np.empty(0, dtype=dtype)
+            for name, dtype in FACT_COLUMNS.items()
+        }
+        return rows_read
+
+    def typed_columns(self, frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Convert fact columns to their in-memory dtypes (money to cents)"""
+        columns = {}
+        for name, dtype in FACT_COLUMNS.items():
+            if name in MONEY_COLUMNS:
+                columns[name] = to_cents(frame[name])
+            elif dtype is np.float64:
+                columns[name] = pd.to_numeric(frame[name]).to_numpy(dtype=np.float64)
+            else:
+                columns[name] = frame[name].to_numpy(dtype=dtype)
+        return columns
+
+    def fetch_columns(self, cursor) -> Optional[Dict[str, np.ndarray]]:
+        """Read the next FETCH_SIZE rows of a fact query as typed columns"""
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            return None
+        return self.typed_columns(pd.DataFrame(rows, columns=list(FACT_COLUMNS)))
+
+    def append_rows(self, cursor) -> int:
+        """Append newly inserted fact rows (read in sales_key order)"""
+        chunks = []
+        while True:
+            chunk = self.fetch_columns(cursor)
+            if chunk is None:
+                break
+            chunks.append(chunk)
+        if not chunks:
+            return 0
+
+        self.columns = {
+            name: np.concatenate([self.columns[name], *(chunk[name] for chunk in chunks)])
+            for name in FACT_COLUMNS
+        }
+        self.max_sales_key = int(self.columns['sales_key'][-1])
+        return sum(len(chunk['sales_key']) for chunk in chunks)
+
+    def apply_updates(self, cursor) -> int:
+        """Overwrite already loaded fact rows with their updated values"""
+        rows_read = 0
+        while True:
+            chunk = self.fetch_columns(cursor)
+            if chunk is None:
+                break
+            positions = np.searchsorted(self.columns['sales_key'], chunk['sales_key'])
+            positions = np.minimum(positions, len(self.columns['sales_key']) - 1)
+            found = self.columns['sales_key'][positions] == chunk['sales_key']
+            for name in FACT_COLUMNS:
+                self.columns[name][positions[found]] = chunk[name][found]
+            rows_read += len(chunk['sales_key'])
+        return rows_read
+
+    def filtered(self, filters: Optional[Dict]) -> Dict[str, np.ndarray]:
+        """Fact columns restricted to the dashboard filters"""
+        filters = filters or {}
+        columns = self.columns
+        mask = np.ones(len(columns['sales_key']), dtype=bool)
+        if filters.get('date_from'):
+            mask &= columns['date_key'] >= filters['date_from']
+        if filters.get('date_to'):
+            mask &= columns['date_key'] <= filters['date_to']
+        if filters.get('category'):
+            code = self.products.code_of('category_name', filters['category'])
+            mask &= self.products.lookup('category_name', columns['product_key']) == code
+        if filters.get('region'):
+            code = self.locations.code_of('region', filters['region'])
+            mask &= self.locations.lookup('region', columns['location_key']) == code
+        if mask.all():
+            return columns
+        return {name: values[mask] for name, values in columns.items()}
+
+    def sales_frame(self, filters: Optional[Dict], *names: str) -> pd.DataFrame:
+        """Filtered fact columns as a DataFrame, with money back in currency units"""
+        self.ensure_fresh()
+        with self.lock:
+            columns = self.filtered(filters)
+            frame = pd.DataFrame({name: columns[name] for name in names})
+        for name in MONEY_COLUMNS:
+            if name in frame:
+                frame[name] = frame[name] / 100
+        return frame
+
+    def sales_by_month(self, filters: Optional[Dict] = None) -> pd.DataFrame:
+        """Orders, quantity, revenue, profit and average margin per month"""
+        frame = self.sales_frame(filters, 'date_key', 'order_id', 'quantity', 'line_total',
+                                 'profit_amount', 'profit_margin_percent')
+        frame['month_key'] = frame['date_key'] // 100
+        result = frame.groupby('month_key').agg(
+            total_orders=('order_id', 'nunique'),
+            total_quantity_sold=('quantity', 'sum'),
+            total_revenue=('line_total', 'sum'),
+            total_profit=('profit_amount', 'sum'),
+            avg_profit_margin=('profit_margin_percent', 'mean'),
+        ).reset_index().sort_values('month_key')
+
+        result.insert(0, 'year_number', result['month_key'] // 100)
+        result.insert(1, 'month_number', result['month_key'] % 100)
+        result.insert(2, 'month_name', [calendar.month_name[month] for month in result['month_number']])
+        result.insert(3, 'year_month', [f"{year}-{month:02d}" for year, month
+                                        in zip(result['year_number'], result['month_number'])])
+        return result.drop(columns='month_key').reset_index(drop=True)
+
+    def top_products(self, filters: Optional[Dict] = None, limit: int = 10) -> pd.DataFrame:
+        """Products (SCD versions) with the highest revenue"""
+        frame = self.sales_frame(filters, 'product_key', 'quantity', 'line_total', 'profit_amount')
+        result = frame.groupby('product_key').agg(
+            total_quantity_sold=('quantity', 'sum'),
+            total_revenue=('line_total', 'sum'),
+            total_profit=('profit_amount', 'sum'),
+        ).nlargest(limit, 'total_revenue').reset_index()
+
+        keys = result['product_key'].to_numpy()
+        result.insert(0, 'product_name',
+                      self.products.values('product_name', self.products.lookup('product_name', keys)))
+        result.insert(1, 'category_name',
+                      self.products.values('category_name', self.products.lookup('category_name', keys)))
+        return result.drop(columns='product_key')
+
+    def sales_by_category(self, filters: Optional[Dict] = None) -> pd.DataFrame:
+        """Quantity, revenue and profit per product category"""
+        frame = self.sales_frame(filters, 'product_key', 'quantity', 'line_total', 'profit_amount')
+        frame['category_code'] = self.products.lookup('category_name', frame['product_key'].to_numpy())
+        result = frame.groupby('category_code').agg(
+            total_quantity_sold=('quantity', 'sum'),
+            total_revenue=('line_total', 'sum'),
+            total_profit=('profit_amount', 'sum'),
+        ).reset_index()
+
+        result.insert(0, 'category_name',
+                      self.products.values('category_name', result['category_code'].to_numpy()))
+        return result.drop(columns='category_code').sort_values(
+            'total_revenue', ascending=False).reset_index(drop=True)
+
+    def customer_segments(self, filters: Optional[Dict] = None) -> pd.DataFrame:
+        """Customer counts and average lifetime value per value segment"""
+        frame = self.sales_frame(filters, 'customer_key', 'line_total')
+        lifetime_value = frame.groupby('customer_key')['line_total'].sum()
+        segments = np.select(
+            [lifetime_value >= 1000, lifetime_value >= 500, lifetime_value >= 200],
+            ['VIP', 'High Value', 'Medium Value'],
+            default='Low Value',
+        )
+        result = pd.DataFrame({'customer_segment': segments, 'lifetime_value': lifetime_value.to_numpy()})
+        return result.groupby('customer_segment').agg(
+            customer_count=('lifetime_value', 'size'),
+            avg_lifetime_value=('lifetime_value', 'mean'),
+        ).reset_index().sort_values('avg_lifetime_value', ascending=False).reset_index(drop=True)
+
+    def sales_by_region(self, filters: Optional[Dict] = None) -> pd.DataFrame:
+        """Orders, revenue and profit per region and country"""
+        frame = self.sales_frame(filters, 'location_key', 'order_id', 'line_total', 'profit_amount')
+        location_keys = frame['location_key'].to_numpy()
+        frame['region_code'] = self.locations.lookup('region', location_keys)
+        frame['country_code'] = self.locations.lookup('country', location_keys)
+        result = frame.groupby(['region_code', 'country_code']).agg(
+            total_orders=('order_id', 'nunique'),
+            total_revenue=('line_total', 'sum'),
+            total_profit=('profit_amount', 'sum'),
+        ).reset_index()
+
+        result.insert(0, 'region', self.locations.values('region', result['region_code'].to_numpy()))
+        result.insert(1, 'country', self.locations.values('country', result['country_code'].to_numpy()))
+        return result.drop(columns=['region_code', 'country_code']).sort_values(
+            'total_revenue', ascending=False).reset_index(drop=True)
@@ -4,17 +4,47 @@ Interactive dashboard using Dash and Plotly
 """
 
 import dash
-from dash import dcc, html, Input, Output, dash_table
+from dash import dcc, html, Input, Output, State, dash_table
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
 import json
+import math
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import os
 
+from analytics_engine import SalesEngine
+from query_cache import QueryCache
+
+try:
+    import diskcache
+except ImportError:  # Background callbacks need dash[diskcache]
+    diskcache = None
+
+# Result cache settings
+CACHE_TTL_SECONDS = 300  # Matches the dashboard refresh interval
+CACHE_MAX_ENTRIES = 128
+ETL_MARKER_CHECK_SECONDS = 30  # How often etl_run is polled for a finished run
+CACHE_DIR = 'cache'  # Disk cache shared with background callback processes
+CACHE_SIZE_LIMIT_BYTES = 256 * 1024 * 1024
+
+# 'sql' queries the warehouse per panel; 'memory' answers the sales panels
+# from an in-process columnar copy of fact_sales (analytics_engine.py), and
+# 'parquet' builds that copy from the ETL's Parquet export instead of MySQL
+ANALYTICS_ENGINE = 'sql'
+ENGINE_REFRESH_SECONDS = 30
+PARQUET_DIR = '../exports/parquet'  # parquet_export.output_dir of the ETL config
+
+# Connections shared by all callbacks; queries run on as many threads as
+# there are pooled connections, so a free connection is always available
+DB_POOL_SIZE = 6
+
 # Load database configuration
 def load_db_config():
     """Load database configuration from ETL config"""
@@ -32,104 +62,299 @@ def load_db_config():
             'password': 'your_password_here'
         }
 
+def load_inventory_snapshot_mode():
+    """Load the ETL's fact_inventory snapshot mode ('full' or 'delta')"""
+    try:
+        with open('../02_ETL/etl_config.json', 'r') as f:
+            config = json.load(f)
+        return config.get('etl_settings', {}).get('inventory_snapshot_mode', 'full')
+    except (OSError, ValueError):
+        return 'full'
+
+DB_CONFIG = load_db_config()
+INVENTORY_SNAPSHOT_MODE = load_inventory_snapshot_mode()
+
+# Background callbacks run in processes forked from this one
+MAIN_PID = os.getpid()
+
+connection_pool = None
+connection_pool_lock = threading.Lock()
+query_executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix='dashboard-query')
+
 # Database connection
 def get_db_connection():
-    """Create database connection"""
-    config = load_db_config()
+    """Get a pooled database connection (close() returns it to the pool)"""
+    global connection_pool
     try:
-        conn = mysql.connector.connect(
-            host=config['host'],
-            port=config['port'],
-            database=config['database'],
-            user=config['user'],
-            password=config['password']
-        )
-        return conn
+        if os.getpid() != MAIN_PID:
+            # A background callback process must not share the parent's pooled sockets
+            return mysql.connector.connect(
+                host=DB_CONFIG['host'],
+                port=DB_CONFIG['port'],
+                database=DB_CONFIG['database'],
+                user=DB_CONFIG['user'],
+                password=DB_CONFIG['password']
+            )
+        with connection_pool_lock:
+            if connection_pool is None:
+                connection_pool = pooling.MySQLConnectionPool(
+                    pool_name='dashboard',
+                    pool_size=DB_POOL_SIZE,
+                    pool_reset_session=True,
+                    host=DB_CONFIG['host'],
+                    port=DB_CONFIG['port'],
+                    database=DB_CONFIG['database'],
+                    user=DB_CONFIG['user'],
+                    password=DB_CONFIG['password']
+                )
+        return connection_pool.get_connection()
     except Error as e:
         print(f"Database connection error: {e}")
         return None
 
-# Load data functions
-def load_sales_by_month():
-    """Load sales data by month"""
+def read_query(query, params=()):
+    """Run a query on a pooled connection and return its result as a DataFrame"""
     conn = get_db_connection()
     if not conn:
         return pd.DataFrame()
+    try:
+        return pd.read_sql(query, conn, params=params or None)
+    finally:
+        conn.close()
+
+def load_etl_marker():
+    """Finish time of the last ETL run; changes whenever the warehouse was reloaded"""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(finished_at) FROM etl_run")
+        marker = cursor.fetchone()[0]
+        cursor.close()
+        return marker
+    except Error as e:
+        print(f"Could not read ETL run marker: {e}")
+        return None
+    finally:
+        conn.close()
+
+# Panels compute in background processes when the disk cache is available;
+# query results then live on disk so every process shares them
+background_callback_manager = None
+query_store = None
+# The in-memory engine answers in the server process; forked background
+# callbacks could not keep its refreshed arrays
+if diskcache is not None and ANALYTICS_ENGINE == 'sql':
+    try:
+        background_callback_manager = dash.DiskcacheManager(diskcache.Cache(os.path.join(CACHE_DIR, 'callbacks')))
+        query_store = diskcache.Cache(os.path.join(CACHE_DIR, 'query_results'), size_limit=CACHE_SIZE_LIMIT_BYTES)
+    except ImportError as e:
+        print(f"Background callbacks disabled: {e}")
+
+# Query results shared by every browser tab until they expire or an ETL run finishes
+query_cache = QueryCache(ttl_seconds=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES,
+                         marker_loader=load_etl_marker, marker_check_seconds=ETL_MARKER_CHECK_SECONDS,
+                         store=query_store)
+
+def run_query(query, params=()):
+    """Run a dashboard query through the shared result cache"""
+    return query_cache.get_or_load(query, tuple(params), lambda: read_query(query, params))
+
+# Optional in-memory engine for the sales panels
+analytics_engine = None
+if ANALYTICS_ENGINE in ('memory', 'parquet'):
+    analytics_engine = SalesEngine(get_db_connection, ENGINE_REFRESH_SECONDS,
+                                   PARQUET_DIR if ANALYTICS_ENGINE == 'parquet' else None)
+
+def load_data(loader):
+    """Run a loader on the pool-sized query threads, so concurrent panels never exhaust the pool"""
+    if os.getpid() != MAIN_PID:
+        return loader()
+    return query_executor.submit(loader).result()
+
+# Dashboard filters
+def make_filters(start_date=None, end_date=None, category=None, region=None):
+    """Build the filter dict passed to the loaders from the filter controls"""
+    def to_date_key(value):
+        return int(value[:10].replace('-', '')) if value else None
+    
+    return {
+        'date_from': to_date_key(start_date),
+        'date_to': to_date_key(end_date),
+        'category': category or None,
+        'region': region or None,
+    }
+
+def filter_clause(filters, alias, dimensions=('date', 'product', 'location')):
+    """Push the dashboard filters down as bound conditions on date_key, product_key and location_key
+    
+    Returns (WHERE clause, params); dimensions lists the keys the table has.
+    """
+    conditions, params = filter_conditions(filters, alias, dimensions)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+def filter_conditions(filters, alias, dimensions=('date', 'product', 'location')):
+    """Dashboard filter conditions and their bound parameters, as (conditions, params)"""
+    filters = filters or {}
+    conditions, params = [], []
+    if 'date' in dimensions and filters.get('date_from'):
+        conditions.append(f"{alias}.date_key >= %s")
+        params.append(filters['date_from'])
+    if 'date' in dimensions and filters.get('date_to'):
+        conditions.append(f"{alias}.date_key <= %s")
+        params.append(filters['date_to'])
+    if 'product' in dimensions and filters.get('category'):
+        conditions.append(f"{alias}.product_key IN (SELECT product_key FROM dim_product WHERE category_name = %s)")
+        params.append(filters['category'])
+    if 'location' in dimensions and filters.get('region'):
+        conditions.append(f"{alias}.location_key IN (SELECT location_key FROM dim_location WHERE region = %s)")
+        params.append(filters['region'])
+    
+    return conditions, tuple(params)
+
+# Load data functions
+# Each loader reads the smallest aggregate table that has the keys its filters
+# need, and falls back to fact_sales only when none has them
+def load_sales_by_month(filters=None):
+    """Load sales data by month"""
+    if analytics_engine is not None:
+        return analytics_engine.sales_by_month(filters)
+    filters = filters or {}
+    if filters.get('category'):
+        # Order counts are not additive across products, so count from the facts
+        where, params = filter_clause(filters, 'fs')
+        query = f"""
+        SELECT 
+            d.year_number,
+            d.month_number,
+            d.month_name,
+            CONCAT(d.year_number, '-', LPAD(d.month_number, 2, '0')) as year_month,
+            COUNT(DISTINCT fs.order_id) as total_orders,
+            SUM(fs.quantity) as total_quantity_sold,
+            SUM(fs.line_total) as total_revenue,
+            SUM(fs.profit_amount) as total_profit,
+            AVG(fs.profit_margin_percent) as avg_profit_margin
+        FROM fact_sales fs
+        INNER JOIN dim_date d ON fs.date_key = d.date_key
+        {where}
+        GROUP BY d.year_number, d.month_number, d.month_name
+        ORDER BY d.year_number, d.month_number
+        """
+        return run_query(query, params)
     
-    query = """
+    where, params = filter_clause(filters, 'a', ('date', 'location'))
+    query = f"""
     SELECT 
         d.year_number,
         d.month_number,
         d.month_name,
         CONCAT(d.year_number, '-', LPAD(d.month_number, 2, '0')) as year_month,
-        COUNT(DISTINCT fs.order_id) as total_orders,
-        SUM(fs.quantity) as total_quantity_sold,
-        SUM(fs.line_total) as total_revenue,
-        SUM(fs.profit_amount) as total_profit,
-        AVG(fs.profit_margin_percent) as avg_profit_margin
-    FROM fact_sales fs
-    INNER JOIN dim_date d ON fs.date_key = d.date_key
+        SUM(a.order_count) as total_orders,
+        SUM(a.total_quantity) as total_quantity_sold,
+        SUM(a.total_revenue) as total_revenue,
+        SUM(a.total_profit) as total_profit,
+        SUM(a.profit_margin_sum) / NULLIF(SUM(a.profit_margin_lines), 0) as avg_profit_margin
+    FROM agg_sales_daily_location a
+    INNER JOIN dim_date d ON a.date_key = d.date_key
+    {where}
     GROUP BY d.year_number, d.month_number, d.month_name
     ORDER BY d.year_number, d.month_number
     """
     
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
+    return run_query(query, params)
 
-def load_top_products():
+def load_top_products(filters=None):
     """Load top products by revenue"""
-    conn = get_db_connection()
-    if not conn:
-        return pd.DataFrame()
+    if analytics_engine is not None:
+        return analytics_engine.top_products(filters)
+    filters = filters or {}
+    if filters.get('region'):
+        where, params = filter_clause(filters, 'fs')
+        source = f"""
+        SELECT fs.product_key, fs.quantity, fs.line_total as revenue, fs.profit_amount as profit
+        FROM fact_sales fs
+        {where}
+        """
+    else:
+        where, params = filter_clause(filters, 'a', ('date', 'product'))
+        source = f"""
+        SELECT a.product_key, a.total_quantity as quantity, a.total_revenue as revenue, a.total_profit as profit
+        FROM agg_sales_daily_product a
+        {where}
+        """
     
-    query = """
+    query = f"""
     SELECT 
         dp.product_name,
         dp.category_name,
-        SUM(fs.quantity) as total_quantity_sold,
-        SUM(fs.line_total) as total_revenue,
-        SUM(fs.profit_amount) as total_profit
-    FROM fact_sales fs
-    INNER JOIN dim_product dp ON fs.product_key = dp.product_key
+        SUM(s.quantity) as total_quantity_sold,
+        SUM(s.revenue) as total_revenue,
+        SUM(s.profit) as total_profit
+    FROM ({source}) s
+    INNER JOIN dim_product dp ON s.product_key = dp.product_key
     GROUP BY dp.product_key, dp.product_name, dp.category_name
     ORDER BY total_revenue DESC
     LIMIT 10
     """
     
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
+    return run_query(query, params)
 
-def load_sales_by_category():
+def load_sales_by_category(filters=None):
     """Load sales by product category"""
-    conn = get_db_connection()
-    if not conn:
-        return pd.DataFrame()
-    
-    query = """
-    SELECT 
-        dp.category_name,
-        SUM(fs.quantity) as total_quantity_sold,
-        SUM(fs.line_total) as total_revenue,
-        SUM(fs.profit_amount) as total_profit
-    FROM fact_sales fs
-    INNER JOIN dim_product dp ON fs.product_key = dp.product_key
-    GROUP BY dp.category_name
-    ORDER BY total_revenue DESC
-    """
+    if analytics_engine is not None:
+        return analytics_engine.sales_by_category(filters)
+    filters = filters or {}
+    if filters.get('region'):
+        where, params = filter_clause(filters, 'fs')
+        query = f"""
+        SELECT 
+            dp.category_name,
+            SUM(fs.quantity) as total_quantity_sold,
+            SUM(fs.line_total) as total_revenue,
+            SUM(fs.profit_amount) as total_profit
+        FROM fact_sales fs
+        INNER JOIN dim_product dp ON fs.product_key = dp.product_key
+        {where}
+        GROUP BY dp.category_name
+        ORDER BY total_revenue DESC
+        """
+    elif filters.get('date_from') or filters.get('date_to') or filters.get('category'):
+        where, params = filter_clause(filters, 'a', ('date', 'product'))
+        query = f"""
+        SELECT 
+            dp.category_name,
+            SUM(a.total_quantity) as total_quantity_sold,
+            SUM(a.total_revenue) as total_revenue,
+            SUM(a.total_profit) as total_profit
+        FROM agg_sales_daily_product a
+        INNER JOIN dim_product dp ON a.product_key = dp.product_key
+        {where}
+        GROUP BY dp.category_name
+        ORDER BY total_revenue DESC
+        """
+    else:
+        params = ()
+        query = """
+        SELECT 
+            category_name,
+            SUM(total_quantity) as total_quantity_sold,
+            SUM(total_revenue) as total_revenue,
+            SUM(total_profit) as total_profit
+        FROM agg_sales_monthly_category
+        GROUP BY category_name
+        ORDER BY total_revenue DESC
+        """
     
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
+    return run_query(query, params)
 
-def load_customer_segments():
-    """Load customer segmentation data"""
-    conn = get_db_connection()
-    if not conn:
-        return pd.DataFrame()
-    
-    query = """
+def load_customer_segments(filters=None):
+    """Load customer segmentation data (customer value within the filtered sales)"""
+    if analytics_engine is not None:
+        return analytics_engine.customer_segments(filters)
+    where, params = filter_clause(filters, 'fs')
+    query = f"""
     SELECT 
         CASE 
             WHEN lifetime_value >= 1000 THEN 'VIP'
@@ -145,23 +370,116 @@ def load_customer_segments():
             SUM(fs.line_total) as lifetime_value
         FROM fact_sales fs
         INNER JOIN dim_customer dc ON fs.customer_key = dc.customer_key
+        {where}
         GROUP BY dc.customer_key
     ) customer_metrics
     GROUP BY customer_segment
     ORDER BY avg_lifetime_value DESC
     """
     
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
+    return run_query(query, params)
 
-def load_inventory_status():
-    """Load current inventory status"""
-    conn = get_db_connection()
-    if not conn:
-        return pd.DataFrame()
+# Inventory table columns and the SQL expression each one sorts and filters on
+INVENTORY_COLUMNS = {
+    'product_name': 'dp.product_name',
+    'category_name': "COALESCE(dp.category_name, '')",  # Never NULL, so pages can seek on it
+    'quantity_on_hand': 'fi.quantity_on_hand',
+    'reorder_level': 'fi.reorder_level',
+    'stock_value': 'fi.stock_value',
+    'is_low_stock': 'fi.is_low_stock',
+    'is_out_of_stock': 'fi.is_out_of_stock',
+}
+INVENTORY_PAGE_SIZE = 20
+
+# One DataTable filter_query term, e.g. {stock_value} >= 100 or {product_name} contains "usb"
+FILTER_TERM = re.compile(r'^\{(?P<column>\w+)\} (?P<operator>s?(?:contains|datestartswith|[<>!]?=|<|>|eq|ne|lt|le|gt|ge)) (?P<value>.+)$')
+FILTER_OPERATORS = {'=': '=', 'eq': '=', '!=': '<>', 'ne': '<>', '<': '<', 'lt': '<',
+                    '<=': '<=', 'le': '<=', '>': '>', 'gt': '>', '>=': '>=', 'ge': '>='}
+
+def table_filter_conditions(filter_query):
+    """Translate a DataTable filter_query into bound SQL conditions on INVENTORY_COLUMNS
+    
+    Terms on unknown columns or with unsupported operators are ignored.
+    """
+    conditions, params = [], []
+    for term in (filter_query or '').split(' && '):
+        match = FILTER_TERM.match(term.strip())
+        if not match or match.group('column') not in INVENTORY_COLUMNS:
+            continue
+        column = INVENTORY_COLUMNS[match.group('column')]
+        operator = match.group('operator').lstrip('s')
+        value = match.group('value').strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+            value = value[1:-1]
+        
+        if operator in ('contains', 'datestartswith'):
+            escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            pattern = f"%{escaped}%" if operator == 'contains' else f"{escaped}%"
+            conditions.append(f"{column} LIKE %s")
+            params.append(pattern)
+        else:
+            if value.lower() in ('true', 'false'):
+                # Boolean flags are stored as TINYINT
+                value = int(value.lower() == 'true')
+            conditions.append(f"{column} {FILTER_OPERATORS[operator]} %s")
+            params.append(value)
+    return conditions, tuple(params)
+
+def inventory_query_parts(filters, filter_query):
+    """FROM/WHERE clause of the latest inventory snapshot with all filters applied, as (sql, conditions, params)
+    
+    Full snapshots hold every product on the latest date_key, read through the
+    (date_key, sort column) indexes. Delta snapshots read fact_inventory_current,
+    the latest row per product kept by the ETL, through its sort column indexes.
+    """
+    if INVENTORY_SNAPSHOT_MODE == 'delta':
+        source = "fact_inventory_current fi"
+        conditions = []
+    else:
+        source = "fact_inventory fi"
+        conditions = ["fi.date_key = (SELECT MAX(date_key) FROM fact_inventory)"]
+    
+    category_conditions, category_params = filter_conditions(filters, 'fi', ('product',))
+    table_conditions, table_params = table_filter_conditions(filter_query)
+    conditions += category_conditions + table_conditions
     
-    query = """
+    return f"""
+    FROM {source}
+    INNER JOIN dim_product dp ON fi.product_key = dp.product_key
+    """, conditions, category_params + table_params
+
+def inventory_sort(sort_by):
+    """SQL expression and direction ('ASC'/'DESC') of the table's sort (stock value, descending by default)"""
+    for sort in sort_by or []:
+        if sort.get('column_id') in INVENTORY_COLUMNS:
+            return INVENTORY_COLUMNS[sort['column_id']], 'ASC' if sort.get('direction') == 'asc' else 'DESC'
+    return INVENTORY_COLUMNS['stock_value'], 'DESC'
+
+def load_inventory_status(filters=None, sort_by=None, filter_query='', limit=INVENTORY_PAGE_SIZE,
+                          offset=0, anchor=None, inclusive=False, reverse=False):
+    """Load one page of the current inventory status (only the category filter applies)
+    
+    Rows are ordered by the sort column, then inventory_key. A page seeks past
+    anchor, the (sort value, inventory_key) of a known row, so it reads only
+    offset + limit index entries; inclusive also returns the anchor row itself.
+    reverse reads backwards from the anchor (or from the end) and returns the
+    rows in table order. Each row carries its sort_value and inventory_key.
+    """
+    from_clause, conditions, params = inventory_query_parts(filters, filter_query)
+    sort_column, direction = inventory_sort(sort_by)
+    if reverse:
+        direction = 'ASC' if direction == 'DESC' else 'DESC'
+    
+    if anchor is not None:
+        # Seek: rows after the anchor in read order, as a range on the sort column
+        after = '<' if direction == 'DESC' else '>'
+        last_key = f"{after}=" if inclusive else after
+        conditions = conditions + [f"{sort_column} {after}= %s AND ({sort_column} {after} %s "
+                                   f"OR fi.inventory_key {last_key} %s)"]
+        params = params + (anchor[0], anchor[0], anchor[1])
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    
+    query = f"""
     SELECT 
         dp.product_name,
         dp.category_name,
@@ -169,45 +487,118 @@ def load_inventory_status():
         fi.reorder_level,
         fi.stock_value,
         fi.is_low_stock,
-        fi.is_out_of_stock
-    FROM fact_inventory fi
-    INNER JOIN dim_product dp ON fi.product_key = dp.product_key
-    WHERE fi.snapshot_date = (SELECT MAX(snapshot_date) FROM fact_inventory)
-    ORDER BY fi.stock_value DESC
-    LIMIT 20
+        fi.is_out_of_stock,
+        {sort_column} as sort_value,
+        fi.inventory_key
+    {from_clause}
+    {where}
+    ORDER BY {sort_column} {direction}, fi.inventory_key {direction}
+    LIMIT %s OFFSET %s
     """
     
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
+    df = run_query(query, params + (int(limit), int(offset)))
+    return df.iloc[::-1].reset_index(drop=True) if reverse else df
 
-def load_sales_by_region():
+def count_inventory_status(filters=None, filter_query=''):
+    """Count the current inventory rows matching the filters (for the table's page count)"""
+    from_clause, conditions, params = inventory_query_parts(filters, filter_query)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    df = run_query(f"SELECT COUNT(*) as row_count {from_clause} {where}", params)
+    return int(df['row_count'].iloc[0]) if not df.empty else 0
+
+def plan_inventory_page(page, page_size, row_count, state):
+    """Cheapest way to read a table page, as load_inventory_status keyword arguments
+    
+    state holds the page shown last and the (sort value, inventory_key) of its
+    first and last rows. The next, previous and same page are single seeks;
+    other pages skip whole pages from the nearest known position: the start,
+    the end or the page shown last.
+    """
+    page_start = page * page_size
+    page_rows = max(0, min(page_size, row_count - page_start))
+    plans = [
+        (page_start, {'offset': page_start}),
+        (row_count - page_start - page_rows, {'offset': row_count - page_start - page_rows,
+                                              'limit': page_rows, 'reverse': True}),
+    ]
+    if state and state.get('first') and state.get('last'):
+        shown = state['page']
+        if page == shown:
+            plans.append((0, {'anchor': state['first'], 'inclusive': True}))
+        elif page > shown:
+            skip = (page - shown - 1) * page_size
+            plans.append((skip, {'anchor': state['last'], 'offset': skip}))
+        else:
+            skip = (shown - page - 1) * page_size
+            plans.append((skip, {'anchor': state['first'], 'offset': skip, 'reverse': True}))
+    
+    _, plan = min(plans, key=lambda candidate: candidate[0])
+    return {'limit': page_size, **plan}
+
+def row_position(df, index):
+    """(sort value, inventory_key) of a loaded inventory row, as JSON-safe values"""
+    values = (df['sort_value'].iloc[index], df['inventory_key'].iloc[index])
+    return [value.item() if hasattr(value, 'item') else value for value in values]
+
+def load_sales_by_region(filters=None):
     """Load sales by geographic region"""
-    conn = get_db_connection()
-    if not conn:
-        return pd.DataFrame()
+    if analytics_engine is not None:
+        return analytics_engine.sales_by_region(filters)
+    filters = filters or {}
+    if filters.get('category'):
+        where, params = filter_clause(filters, 'fs')
+        query = f"""
+        SELECT 
+            dl.region,
+            dl.country,
+            COUNT(DISTINCT fs.order_id) as total_orders,
+            SUM(fs.line_total) as total_revenue,
+            SUM(fs.profit_amount) as total_profit
+        FROM fact_sales fs
+        INNER JOIN dim_location dl ON fs.location_key = dl.location_key
+        {where}
+        GROUP BY dl.region, dl.country
+        ORDER BY total_revenue DESC
+        """
+        return run_query(query, params)
     
-    query = """
+    where, params = filter_clause(filters, 'a', ('date', 'location'))
+    query = f"""
     SELECT 
         dl.region,
         dl.country,
-        COUNT(DISTINCT fs.order_id) as total_orders,
-        SUM(fs.line_total) as total_revenue,
-        SUM(fs.profit_amount) as total_profit
-    FROM fact_sales fs
-    INNER JOIN dim_location dl ON fs.location_key = dl.location_key
+        SUM(a.order_count) as total_orders,
+        SUM(a.total_revenue) as total_revenue,
+        SUM(a.total_profit) as total_profit
+    FROM agg_sales_daily_location a
+    INNER JOIN dim_location dl ON a.location_key = dl.location_key
+    {where}
     GROUP BY dl.region, dl.country
     ORDER BY total_revenue DESC
     """
     
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
+    return run_query(query, params)
+
+def load_filter_options():
+    """Load the category and region choices of the filter controls"""
+    categories = run_query("""
+    SELECT DISTINCT category_name FROM dim_product
+    WHERE category_name IS NOT NULL
+    ORDER BY category_name
+    """)
+    regions = run_query("""
+    SELECT DISTINCT region FROM dim_location
+    WHERE region IS NOT NULL
+    ORDER BY region
+    """)
+    return categories, regions
 
 # Initialize Dash app
-app = dash.Dash(__name__)
+app = dash.Dash(__name__, background_callback_manager=background_callback_manager)
 app.title = "E-Commerce Analytics Dashboard"
 
+KEY_METRICS_STYLE = {'display': 'flex', 'justifyContent': 'space-around', 'marginBottom': '30px'}
+
 # Define app layout
 app.layout = html.Div([
     html.Div([
@@ -215,9 +606,25 @@ app.layout = html.Div([
                 style={'textAlign': 'center', 'color': '#2c3e50', 'marginBottom': '30px'}),
     ]),
     
+    # Filters Row
+    html.Div([
+        html.Div([
+            html.Label("Date Range"),
+            dcc.DatePickerRange(id='date-filter', clearable=True, display_format='YYYY-MM-DD'),
+        ], style={'display': 'inline-block', 'marginRight': '20px', 'verticalAlign': 'top'}),
+        html.Div([
+            html.Label("Category"),
+            dcc.Dropdown(id='category-filter', placeholder="All categories"),
+        ], style={'display': 'inline-block', 'width': '250px', 'marginRight': '20px', 'verticalAlign': 'top'}),
+        html.Div([
+            html.Label("Region"),
+            dcc.Dropdown(id='region-filter', placeholder="All regions"),
+        ], style={'display': 'inline-block', 'width': '250px', 'verticalAlign': 'top'}),
+    ], style={'marginBottom': '30px', 'padding': '20px', 'backgroundColor': '#f8f9fa', 'borderRadius': '10px'}),
+    
     # Key Metrics Row
     html.Div([
-        html.Div(id='key-metrics', style={'display': 'flex', 'justifyContent': 'space-around', 'marginBottom': '30px'}),
+        html.Div(id='key-metrics', style=KEY_METRICS_STYLE),
     ]),
     
     # Sales Trend Chart
@@ -252,10 +659,36 @@ app.layout = html.Div([
         ], style={'width': '48%', 'display': 'inline-block', 'padding': '20px', 'backgroundColor': '#f8f9fa', 'borderRadius': '10px'}),
     ], style={'marginBottom': '40px'}),
     
-    # Inventory Status Table
+    # Inventory Status Table (paged, sorted and filtered in SQL)
     html.Div([
-        html.H3("Current Inventory Status (Top 20)", style={'marginBottom': '20px'}),
-        html.Div(id='inventory-table'),
+        html.H3("Current Inventory Status", style={'marginBottom': '20px'}),
+        dash_table.DataTable(
+            id='inventory-table',
+            columns=[{'name': column, 'id': column} for column in INVENTORY_COLUMNS],
+            page_current=0,
+            page_size=INVENTORY_PAGE_SIZE,
+            page_action='custom',
+            sort_action='custom',
+            sort_mode='single',
+            filter_action='custom',
+            filter_query='',
+            style_cell={'textAlign': 'left', 'padding': '10px'},
+            style_header={'backgroundColor': '#3498db', 'color': 'white', 'fontWeight': 'bold'},
+            style_data_conditional=[
+                {
+                    'if': {'filter_query': '{is_out_of_stock} == True'},
+                    'backgroundColor': '#e74c3c',
+                    'color': 'white',
+                },
+                {
+                    'if': {'filter_query': '{is_low_stock} == True'},
+                    'backgroundColor': '#f39c12',
+                    'color': 'white',
+                }
+            ],
+        ),
+        # Page shown last and its first/last rows, where the next page seeks from
+        dcc.Store(id='inventory-page-state'),
     ], style={'marginBottom': '40px', 'padding': '20px', 'backgroundColor': '#f8f9fa', 'borderRadius': '10px'}),
     
     # Refresh button
@@ -273,29 +706,43 @@ app.layout = html.Div([
 ])
 
 # Callbacks
+PANEL_TRIGGERS = [Input('refresh-btn', 'n_clicks'), Input('interval-component', 'n_intervals'),
+                  Input('date-filter', 'start_date'), Input('date-filter', 'end_date'),
+                  Input('category-filter', 'value'), Input('region-filter', 'value')]
+
 @app.callback(
-    [Output('sales-trend-chart', 'figure'),
-     Output('top-products-chart', 'figure'),
-     Output('category-chart', 'figure'),
-     Output('customer-segment-chart', 'figure'),
-     Output('region-chart', 'figure'),
-     Output('inventory-table', 'children'),
-     Output('key-metrics', 'children')],
-    [Input('refresh-btn', 'n_clicks'),
-     Input('interval-component', 'n_intervals')]
+    [Output('category-filter', 'options'),
+     Output('region-filter', 'options')],
+    [Input('interval-component', 'n_intervals')]
 )
-def update_dashboard(n_clicks, n_intervals):
-    """Update all dashboard components"""
+def update_filter_options(n_intervals):
+    """Update the category and region filter choices"""
+    categories, regions = load_data(load_filter_options)
+    category_options = categories['category_name'].tolist() if not categories.empty else []
+    region_options = regions['region'].tolist() if not regions.empty else []
+    return category_options, region_options
+
+def panel_callback(output, style=None, extra_inputs=(), style_prop='style'):
+    """Register an independent callback for one panel
     
-    # Load data
-    sales_df = load_sales_by_month()
-    top_products_df = load_top_products()
-    category_df = load_sales_by_category()
-    customer_seg_df = load_customer_segments()
-    region_df = load_sales_by_region()
-    inventory_df = load_inventory_status()
+    output is one Output or a list of Outputs of the same component. With the
+    disk cache available it runs as a background callback, and the panel keeps
+    showing its last output, dimmed through style_prop, while it recomputes.
+    """
+    inputs = PANEL_TRIGGERS + list(extra_inputs)
+    if background_callback_manager is None:
+        return app.callback(output, inputs)
+    component_id = (output[0] if isinstance(output, list) else output).component_id
+    style = style or {}
+    return app.callback(output, inputs, background=True,
+                        running=[(Output(component_id, style_prop), {**style, 'opacity': 0.5}, style)])
+
+@panel_callback(Output('sales-trend-chart', 'figure'))
+def update_sales_trend(n_clicks, n_intervals, start_date, end_date, category, region):
+    """Update the monthly sales trend chart"""
+    filters = make_filters(start_date, end_date, category, region)
+    sales_df = load_data(lambda: load_sales_by_month(filters))
     
-    # Sales Trend Chart
     if not sales_df.empty:
         fig_trend = make_subplots(specs=[[{"secondary_y": True}]])
         fig_trend.add_trace(
@@ -317,7 +764,14 @@ def update_dashboard(n_clicks, n_intervals):
         fig_trend = go.Figure()
         fig_trend.add_annotation(text="No data available", xref="paper", yref="paper", x=0.5, y=0.5)
     
-    # Top Products Chart
+    return fig_trend
+
+@panel_callback(Output('top-products-chart', 'figure'))
+def update_top_products(n_clicks, n_intervals, start_date, end_date, category, region):
+    """Update the top products chart"""
+    filters = make_filters(start_date, end_date, category, region)
+    top_products_df = load_data(lambda: load_top_products(filters))
+    
     if not top_products_df.empty:
         fig_products = px.bar(top_products_df, x='total_revenue', y='product_name',
                              orientation='h', color='category_name',
@@ -328,7 +782,14 @@ def update_dashboard(n_clicks, n_intervals):
     else:
         fig_products = go.Figure()
     
-    # Category Chart
+    return fig_products
+
+@panel_callback(Output('category-chart', 'figure'))
+def update_category(n_clicks, n_intervals, start_date, end_date, category, region):
+    """Update the sales by category chart"""
+    filters = make_filters(start_date, end_date, category, region)
+    category_df = load_data(lambda: load_sales_by_category(filters))
+    
     if not category_df.empty:
         fig_category = px.pie(category_df, values='total_revenue', names='category_name',
                              title="Revenue Distribution by Category",
@@ -337,7 +798,14 @@ def update_dashboard(n_clicks, n_intervals):
     else:
         fig_category = go.Figure()
     
-    # Customer Segment Chart
+    return fig_category
+
+@panel_callback(Output('customer-segment-chart', 'figure'))
+def update_customer_segments(n_clicks, n_intervals, start_date, end_date, category, region):
+    """Update the customer segmentation chart"""
+    filters = make_filters(start_date, end_date, category, region)
+    customer_seg_df = load_data(lambda: load_customer_segments(filters))
+    
     if not customer_seg_df.empty:
         fig_segment = px.bar(customer_seg_df, x='customer_segment', y='customer_count',
                             color='avg_lifetime_value', color_continuous_scale='Viridis',
@@ -349,7 +817,14 @@ def update_dashboard(n_clicks, n_intervals):
     else:
         fig_segment = go.Figure()
     
-    # Region Chart
+    return fig_segment
+
+@panel_callback(Output('region-chart', 'figure'))
+def update_region(n_clicks, n_intervals, start_date, end_date, category, region):
+    """Update the sales by region chart"""
+    filters = make_filters(start_date, end_date, category, region)
+    region_df = load_data(lambda: load_sales_by_region(filters))
+    
     if not region_df.empty:
         fig_region = px.bar(region_df, x='region', y='total_revenue', color='country',
                            title="Sales by Geographic Region",
@@ -359,31 +834,46 @@ def update_dashboard(n_clicks, n_intervals):
     else:
         fig_region = go.Figure()
     
-    # Inventory Table
+    return fig_region
+
+@panel_callback([Output('inventory-table', 'data'), Output('inventory-table', 'page_count'),
+                 Output('inventory-table', 'page_current'), Output('inventory-page-state', 'data')],
+                extra_inputs=[Input('inventory-table', 'page_current'), Input('inventory-table', 'page_size'),
+                              Input('inventory-table', 'sort_by'), Input('inventory-table', 'filter_query'),
+                              State('inventory-page-state', 'data')],
+                style_prop='style_table')
+def update_inventory_table(n_clicks, n_intervals, start_date, end_date, category, region,
+                           page_current, page_size, sort_by, filter_query, page_state):
+    """Update the inventory status table with the requested page only
+    
+    A new sort, table filter or dashboard filter starts again from the first page.
+    """
+    filters = make_filters(start_date, end_date, category, region)
+    page_size = page_size or INVENTORY_PAGE_SIZE
+    query_state = json.dumps([filters, sort_by, filter_query, page_size], sort_keys=True, default=str)
+    if not page_state or page_state.get('query') != query_state:
+        page_state = None
+        page_current = 0
+    
+    row_count = load_data(lambda: count_inventory_status(filters, filter_query))
+    page_count = max(1, math.ceil(row_count / page_size))
+    page = min(page_current or 0, page_count - 1)
+    
+    plan = plan_inventory_page(page, page_size, row_count, page_state)
+    inventory_df = load_data(lambda: load_inventory_status(filters, sort_by, filter_query, **plan))
+    
+    new_state = {'query': query_state, 'page': page, 'first': None, 'last': None}
     if not inventory_df.empty:
-        inventory_table = dash_table.DataTable(
-            data=inventory_df.to_dict('records'),
-            columns=[{'name': i, 'id': i} for i in inventory_df.columns],
-            style_cell={'textAlign': 'left', 'padding': '10px'},
-            style_header={'backgroundColor': '#3498db', 'color': 'white', 'fontWeight': 'bold'},
-            style_data_conditional=[
-                {
-                    'if': {'filter_query': '{is_out_of_stock} == True'},
-                    'backgroundColor': '#e74c3c',
-                    'color': 'white',
-                },
-                {
-                    'if': {'filter_query': '{is_low_stock} == True'},
-                    'backgroundColor': '#f39c12',
-                    'color': 'white',
-                }
-            ],
-            page_size=10
-        )
-    else:
-        inventory_table = html.Div("No inventory data available")
+        new_state.update(first=row_position(inventory_df, 0), last=row_position(inventory_df, -1))
+    rows = inventory_df.drop(columns=['sort_value', 'inventory_key'], errors='ignore').to_dict('records')
+    return rows, page_count, page, new_state
+
+@panel_callback(Output('key-metrics', 'children'), KEY_METRICS_STYLE)
+def update_key_metrics(n_clicks, n_intervals, start_date, end_date, category, region):
+    """Update the key metrics row (shares the cached monthly sales query with the trend chart)"""
+    filters = make_filters(start_date, end_date, category, region)
+    sales_df = load_data(lambda: load_sales_by_month(filters))
     
-    # Key Metrics
     if not sales_df.empty:
         total_revenue = sales_df['total_revenue'].sum()
         total_orders = sales_df['total_orders'].sum()
@@ -415,7 +905,7 @@ def update_dashboard(n_clicks, n_intervals):
     else:
         metrics = [html.Div("No data available")]
     
-    return fig_trend, fig_products, fig_category, fig_segment, fig_region, inventory_table, metrics
+    return metrics
 
 if __name__ == '__main__':
     print("Starting E-Commerce Analytics Dashboard...")
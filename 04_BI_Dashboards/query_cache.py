@@ -0,0 +1,114 @@
+"""
+Query Result Cache for the BI Dashboard
+Shares loader results across browser tabs, refreshes and background callback
+processes, expiring them after a TTL and dropping them all once a new ETL run
+has finished
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+import pandas as pd
+
+
+# Key of the last seen ETL run marker in a shared store
+MARKER_KEY = '__etl_marker__'
+
+
+class QueryCache:
+    """Thread-safe LRU cache of query results with a TTL and an ETL run marker"""
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 128,
+                 marker_loader: Optional[Callable[[], Hashable]] = None,
+                 marker_check_seconds: float = 30, store=None):
+        """Initialize an empty cache
+
+        marker_loader returns a value that changes whenever the warehouse has
+        been reloaded (e.g. the finish time of the last ETL run); it is polled
+        at most every marker_check_seconds. store is an optional
+        diskcache.Cache shared between processes, used instead of memory; its
+        own size_limit then bounds the cache.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.marker_loader = marker_loader
+        self.marker_check_seconds = marker_check_seconds
+        self.store = store
+        self.entries = OrderedDict()  # key -> (stored_at, DataFrame)
+        self.marker = None
+        self.marker_checked_at = None
+        self.lock = threading.Lock()
+
+        if hasattr(os, 'register_at_fork'):
+            # A process forked while another thread held the lock would deadlock on it
+            os.register_at_fork(after_in_child=self._reset_lock)
+
+    def _reset_lock(self):
+        """Give a forked child process its own unlocked lock"""
+        self.lock = threading.Lock()
+
+    def get_or_load(self, query: str, params: tuple, loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Get a cached result for a query and its parameters, running loader on a miss
+
+        Empty results are not cached, so a failed connection is retried on the
+        next call.
+        """
+        self.check_marker()
+        key = (query, params)
+        if self.store is not None:
+            df = self.store.get(key)
+            if df is None:
+                df = loader()
+                if not df.empty:
+                    self.store.set(key, df, expire=self.ttl_seconds)
+            return df.copy()
+
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                self.entries.move_to_end(key)
+                return entry[1].copy()
+
+        df = loader()
+        if not df.empty:
+            with self.lock:
+                self.entries[key] = (time.monotonic(), df)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        return df.copy()
+
+    def check_marker(self):
+        """Drop every entry once the ETL run marker has changed"""
+        if self.marker_loader is None:
+            return
+        now = time.monotonic()
+        with self.lock:
+            if self.marker_checked_at is not None and now - self.marker_checked_at < self.marker_check_seconds:
+                return
+            self.marker_checked_at = now
+
+        marker = self.marker_loader()
+        if marker is None:
+            # Marker unavailable: fall back to the TTL alone
+            return
+        if self.store is not None:
+            if self.store.get(MARKER_KEY) != marker:
+                self.store.clear()
+                self.store.set(MARKER_KEY, marker)
+            return
+        with self.lock:
+            if marker != self.marker:
+                self.entries.clear()
+                self.marker = marker
+
+    def clear(self):
+        """Drop every cached result"""
+        if self.store is not None:
+            self.store.clear()
+        with self.lock:
+            self.entries.clear()